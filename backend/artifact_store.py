@@ -0,0 +1,279 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ---------------- Config ----------------
+ARTIFACT_BACKEND = os.getenv("ARTIFACT_BACKEND", "local")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+ARTIFACT_TTL_SECONDS = int(os.getenv("ARTIFACT_TTL_SECONDS", str(24 * 3600)))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(1024 * 1024 * 1024)))
+ARTIFACT_EVICT_INTERVAL_SECONDS = int(os.getenv("ARTIFACT_EVICT_INTERVAL_SECONDS", "300"))
+# Temp files of writes that never finished (crashed process) are removed once this old
+ARTIFACT_STALE_TMP_SECONDS = int(os.getenv("ARTIFACT_STALE_TMP_SECONDS", "3600"))
+
+_CHUNK_SIZE = 64 * 1024
+# Content-addressed names only: sha256 hex digest plus a short extension
+_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,8}$")
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class ArtifactInfo:
+    name: str
+    size: int
+    mtime: float
+
+    @property
+    def etag(self) -> str:
+        # The name is the content hash, so it is a strong validator
+        return self.name.split(".", 1)[0]
+
+
+class ArtifactBackend(ABC):
+    """
+    Storage for immutable, content-addressed blobs. Implementations only deal
+    with bytes; naming, TTL and size policy live in ArtifactStore.
+    """
+
+    @abstractmethod
+    def put(self, name: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def touch(self, name: str):
+        """Marks an existing artifact as recently written (resets its TTL)."""
+
+    @abstractmethod
+    def stat(self, name: str) -> Optional[ArtifactInfo]:
+        ...
+
+    @abstractmethod
+    def read(self, name: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Returns an iterator over bytes [start, end] inclusive; end=None means to the end.
+        Raises FileNotFoundError right away, not while iterating, when the artifact is gone.
+        """
+
+    @abstractmethod
+    def delete(self, name: str):
+        ...
+
+    @abstractmethod
+    def list(self) -> List[ArtifactInfo]:
+        ...
+
+    def remove_stale_writes(self, older_than: float) -> int:
+        """Removes leftovers of writes that never completed; returns how many."""
+        return 0
+
+
+class LocalFSBackend(ArtifactBackend):
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def put(self, name: str, data: bytes):
+        # Write then rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def touch(self, name: str):
+        os.utime(self._path(name))
+
+    def stat(self, name: str) -> Optional[ArtifactInfo]:
+        try:
+            st = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return ArtifactInfo(name=name, size=st.st_size, mtime=st.st_mtime)
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        # Opened before returning, so a missing file fails before any response is sent.
+        # Once open, the data stays readable even if eviction deletes the file meanwhile.
+        f = open(self._path(name), "rb")
+        return self._chunks(f, start, end)
+
+    @staticmethod
+    def _chunks(f, start: int, end: Optional[int]) -> Iterator[bytes]:
+        with f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(_CHUNK_SIZE if remaining is None else min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> List[ArtifactInfo]:
+        infos = []
+        for name in os.listdir(self.root):
+            if _NAME.match(name):
+                info = self.stat(name)
+                if info is not None:
+                    infos.append(info)
+        return infos
+
+    def remove_stale_writes(self, older_than: float) -> int:
+        removed = 0
+        for name in os.listdir(self.root):
+            if not name.endswith(".tmp"):
+                continue
+            path = self._path(name)
+            try:
+                if os.stat(path).st_mtime < older_than:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class ArtifactStore:
+    """
+    Content-addressed artifact store with TTL and total-size eviction.
+    Identical PDFs are stored once; saving an existing one refreshes its TTL.
+    """
+
+    def __init__(self, backend: ArtifactBackend, ttl_seconds: int = ARTIFACT_TTL_SECONDS,
+                 max_bytes: int = ARTIFACT_MAX_BYTES):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def is_valid_name(name: str) -> bool:
+        return bool(_NAME.match(name))
+
+    def save(self, data: bytes, extension: str = "pdf") -> str:
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        if self.backend.stat(name) is not None:
+            try:
+                self.backend.touch(name)
+                return name
+            except FileNotFoundError:
+                pass  # Evicted since stat(); write it again
+        self.backend.put(name, data)
+        return name
+
+    def stat(self, name: str) -> Optional[ArtifactInfo]:
+        if not self.is_valid_name(name):
+            return None
+        info = self.backend.stat(name)
+        if info is None or time.time() - info.mtime > self.ttl_seconds:
+            return None
+        return info
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        return self.backend.read(name, start, end)
+
+    def evict(self) -> int:
+        """
+        Deletes expired artifacts, then the oldest ones until the store fits in max_bytes,
+        and the temp files of writes that crashed. Returns the number of files removed.
+        """
+        now = time.time()
+        removed = self.backend.remove_stale_writes(now - ARTIFACT_STALE_TMP_SECONDS)
+        live = []
+        for info in self.backend.list():
+            if now - info.mtime > self.ttl_seconds:
+                self.backend.delete(info.name)
+                removed += 1
+            else:
+                live.append(info)
+
+        total = sum(info.size for info in live)
+        for info in sorted(live, key=lambda i: i.mtime):
+            if total <= self.max_bytes:
+                break
+            self.backend.delete(info.name)
+            total -= info.size
+            removed += 1
+        return removed
+
+    def start_background_eviction(self, interval: int = ARTIFACT_EVICT_INTERVAL_SECONDS):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    removed = self.evict()
+                    if removed:
+                        logger.info("Evicted %s artifacts", removed)
+                except Exception:
+                    logger.exception("Artifact eviction failed")
+
+        self._thread = threading.Thread(target=loop, name="artifact-eviction", daemon=True)
+        self._thread.start()
+
+    def stop_background_eviction(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def _create_backend() -> ArtifactBackend:
+    if ARTIFACT_BACKEND == "local":
+        return LocalFSBackend(ARTIFACT_DIR)
+    raise ValueError(f"Unknown ARTIFACT_BACKEND: {ARTIFACT_BACKEND}")
+
+
+def parse_range_header(header: Optional[str], size: int):
+    """
+    Parses a single-range "bytes=" header into an inclusive (start, end).
+    Returns None when there is no usable Range header (serve the whole body): none at
+    all, a syntactically invalid one such as "bytes=5-2", or several ranges, which are
+    not supported. Raises ValueError when the range is valid but cannot be satisfied:
+    it starts past the end, or it is an empty suffix ("bytes=-0").
+    """
+    match = _BYTE_RANGE.match(header.strip()) if header else None
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
+artifact_store = ArtifactStore(_create_backend())
@@ -1,4 +1,5 @@
 from passlib.context import CryptContext
+from executors import run_blocking
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -7,3 +8,9 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
+
+async def ahash_password(password: str) -> str:
+    return await run_blocking("bcrypt", hash_password, password)
+
+async def averify_password(password: str, hashed: str) -> bool:
+    return await run_blocking("bcrypt", verify_password, password, hashed)
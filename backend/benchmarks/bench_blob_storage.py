@@ -0,0 +1,89 @@
+"""
+Builds a database.db with resumes and customizations stored the old way (JSON strings
+in JSON columns), migrates it to json_blobs and reports the space saved.
+
+Customizations are produced by the local skill ranker, so they are near-identical
+copies of their resume, like the LLM ones; users re-upload the same resume now and then.
+
+Usage (from backend/):
+    python -m benchmarks.bench_blob_storage --users 20 --customizations 30
+"""
+import argparse
+import json
+import os
+
+from benchmarks.common import use_scratch_workdir
+
+use_scratch_workdir()
+
+from sqlalchemy import text  # noqa: E402
+
+from benchmarks.synthetic import SAMPLE_JOB_POSTS, sample_resume  # noqa: E402
+from blob_store import migrate_legacy_rows, storage_report  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import upgrade_schema  # noqa: E402
+from models import User, Resume, ResumeCustomization  # noqa: E402
+from skill_ranker import rank_resume_skills  # noqa: E402
+
+
+def _file_size() -> int:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    return os.path.getsize("database.db")
+
+
+def build_legacy(users: int, customizations: int):
+    db = SessionLocal()
+    try:
+        for u in range(users):
+            user = User(username=f"user-{u}", password="x")
+            db.add(user)
+            db.flush()
+            resume = sample_resume(skill_count=20 + u % 15)
+            resume["name"] = f"Candidate {u}"
+            resume_json = json.dumps(resume)
+            # Every third user uploaded the same file twice
+            for _ in range(2 if u % 3 == 0 else 1):
+                row = Resume(filename="resume.pdf", extracted_data=resume_json, user_id=user.id)
+                db.add(row)
+                db.flush()
+            for i in range(customizations):
+                post = SAMPLE_JOB_POSTS[i % len(SAMPLE_JOB_POSTS)] + f" Team {i % 7}."
+                customized, _ = rank_resume_skills(resume_json, post)
+                db.add(ResumeCustomization(job_post_text=post, customized_data=customized,
+                                           resume_id=row.id, user_id=user.id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--customizations", type=int, default=30, help="customizations per user")
+    args = parser.parse_args()
+
+    upgrade_schema(engine)
+    build_legacy(args.users, args.customizations)
+    before = _file_size()
+
+    db = SessionLocal()
+    try:
+        migrated = migrate_legacy_rows(db)
+        report = storage_report(db)
+    finally:
+        db.close()
+    after = _file_size()
+
+    print(f"{args.users} users x {args.customizations} customizations")
+    print(f"  migrated rows      : {migrated['resumes']} resumes, {migrated['customizations']} customizations")
+    print(f"  inline JSON columns: {migrated['legacy_bytes']:10d} bytes (double-encoded)")
+    print(f"  canonical JSON     : {report['logical_bytes']:10d} bytes ({report['unique_bytes']} unique)")
+    print(f"  json_blobs         : {report['stored_bytes']:10d} bytes in {report['blobs']} blobs "
+          f"({migrated['legacy_bytes'] / max(report['stored_bytes'], 1):.1f}x smaller)")
+    print(f"  database.db        : {before:10d} -> {after} bytes after VACUUM")
+
+
+if __name__ == "__main__":
+    main_cli()
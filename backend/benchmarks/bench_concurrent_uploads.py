@@ -0,0 +1,88 @@
+"""
+Fires N concurrent /upload_resume requests against the app with a fake extraction
+model that takes a fixed time to answer, and compares the wall time of the async
+pipeline with the old behaviour of calling the sync extractor inside the handler.
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrent_uploads --requests 10 --latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import SAMPLE_RESUME_PDF, use_scratch_workdir
+
+os.environ["EXTRACTION_CACHE_ENABLED"] = "0"
+use_scratch_workdir()
+
+import httpx  # noqa: E402
+
+import extract_resume_data  # noqa: E402
+import main  # noqa: E402
+from resume_models import ResumeExtractionData  # noqa: E402
+
+
+class SlowFakeExtractor:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return ResumeExtractionData(name="Benchmark User")
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        return ResumeExtractionData(name="Benchmark User")
+
+
+async def _blocking_process_resume(file_path: str):
+    # What the endpoint did before: a sync LLM call straight on the event loop
+    return main.process_resume(file_path)
+
+
+async def run_uploads(n: int) -> float:
+    pdf_bytes = SAMPLE_RESUME_PDF.read_bytes()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.post("/register", data={"username": "bench", "password": "bench"})
+        login = await client.post("/login", data={"username": "bench", "password": "bench"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        async def upload(i: int):
+            res = await client.post(
+                "/upload_resume",
+                headers=headers,
+                files={"file": (f"resume-{i}.pdf", pdf_bytes, "application/pdf")},
+            )
+            res.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(i) for i in range(n)))
+        return time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM latency in seconds")
+    args = parser.parse_args()
+
+    extract_resume_data.extraction_model = SlowFakeExtractor(args.latency)
+    serial_estimate = args.requests * args.latency
+
+    async_pipeline = main.aprocess_resume
+    main.aprocess_resume = _blocking_process_resume
+    blocking_time = asyncio.run(run_uploads(args.requests))
+
+    main.aprocess_resume = async_pipeline
+    async_time = asyncio.run(run_uploads(args.requests))
+
+    print(f"{args.requests} concurrent uploads, fake LLM latency {args.latency:.2f}s")
+    print(f"  fully serialized estimate : {serial_estimate:8.2f}s")
+    print(f"  sync call in async handler: {blocking_time:8.2f}s")
+    print(f"  async pipeline            : {async_time:8.2f}s  ({blocking_time / async_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main_cli()
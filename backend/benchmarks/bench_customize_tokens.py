@@ -0,0 +1,62 @@
+"""
+Compares the tokens sent to and returned by the model for a customization in
+"full" mode (whole resume in, whole resume out) and "delta" mode (skills in,
+skills out). Offline runs use the character-based estimate from tokens.py;
+--live calls Gemini and reports the provider's usage_metadata instead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_customize_tokens [--live]
+"""
+import argparse
+import json
+
+from benchmarks.common import use_scratch_workdir
+from benchmarks.synthetic import SAMPLE_JOB_POSTS, sample_resume
+
+use_scratch_workdir()
+
+import change_resume_json as crj  # noqa: E402
+from resume_models import ResumeExtractionData  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+def estimate(mode: str, resume: ResumeExtractionData, job_post: str):
+    prompt = crj._build_prompt(mode, resume, job_post)
+    # Assume the model returns a skills list as long as the one it was given
+    output = resume.model_dump_json() if mode == "full" else json.dumps({"skills": resume.skills})
+    return estimate_tokens(prompt.to_string()), estimate_tokens(output)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="call the real model and use reported usage")
+    args = parser.parse_args()
+
+    resume_json = json.dumps(sample_resume())
+    resume = ResumeExtractionData.model_validate_json(resume_json)
+
+    if args.live:
+        for job_post in SAMPLE_JOB_POSTS:
+            for mode in ("full", "delta"):
+                crj.change_resume_json(resume_json, job_post, mode=mode)
+        report = crj.token_usage.snapshot()
+        totals = {mode: (report[mode]["avg_input_tokens"], report[mode]["avg_output_tokens"])
+                  for mode in ("full", "delta")}
+        source = "reported by provider"
+    else:
+        totals = {}
+        for mode in ("full", "delta"):
+            pairs = [estimate(mode, resume, post) for post in SAMPLE_JOB_POSTS]
+            totals[mode] = (sum(p[0] for p in pairs) / len(pairs), sum(p[1] for p in pairs) / len(pairs))
+        source = "estimated, ~4 chars/token"
+
+    print(f"Average tokens per customization ({source}):")
+    print(f"{'mode':<8}{'input':>10}{'output':>10}{'total':>10}")
+    for mode, (inp, out) in totals.items():
+        print(f"{mode:<8}{inp:>10.0f}{out:>10.0f}{inp + out:>10.0f}")
+    full, delta = sum(totals["full"]), sum(totals["delta"])
+    print(f"delta mode saves {full - delta:.0f} tokens per call ({(1 - delta / full) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main_cli()
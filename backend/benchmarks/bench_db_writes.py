@@ -0,0 +1,126 @@
+"""
+Concurrent-write benchmark for the storage profile in database.py.
+
+Threads each run a stream of upload/customize-shaped transactions (a Resume with
+its extracted JSON, then a ResumeCustomization on it) against a fresh database,
+once with the old plain engine and once with the tuned profile. Reports
+throughput, commit latency percentiles and "database is locked" failures.
+
+Usage (from backend/):
+    python -m benchmarks.bench_db_writes --threads 8 --writes 200
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_db_writes --url-from-env
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from benchmarks.common import use_scratch_workdir
+
+workdir = use_scratch_workdir()
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from benchmarks.synthetic import SAMPLE_JOB_POSTS, sample_resume  # noqa: E402
+from database import Base, create_db_engine  # noqa: E402
+from models import User, Resume, ResumeCustomization  # noqa: E402
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def run_profile(url: str, tuned: bool, threads: int, writes: int) -> dict:
+    engine = create_db_engine(url, tuned=tuned)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        users = [User(username=f"bench-{i}", password="x") for i in range(threads)]
+        db.add_all(users)
+        db.commit()
+        user_ids = [u.id for u in users]
+
+    resume_json = sample_resume()
+    customized = json.dumps(resume_json)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def writer(n: int):
+        barrier.wait()
+        local_latencies, local_errors = [], 0
+        for i in range(writes):
+            start = time.perf_counter()
+            db = Session()
+            try:
+                resume = Resume(user_id=user_ids[n], filename=f"resume-{n}-{i}.pdf", extracted_data=resume_json)
+                db.add(resume)
+                db.commit()
+                db.add(ResumeCustomization(
+                    resume_id=resume.id,
+                    user_id=user_ids[n],
+                    job_post_text=SAMPLE_JOB_POSTS[i % len(SAMPLE_JOB_POSTS)],
+                    customized_data=customized,
+                ))
+                db.commit()
+                local_latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                db.rollback()
+                local_errors += 1
+            finally:
+                db.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    ordered = sorted(latencies)
+    return {
+        "elapsed": elapsed,
+        "ok": len(ordered),
+        "failed": sum(errors),
+        "throughput": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+    }
+
+
+def _print(label: str, r: dict):
+    print(f"  {label:<8} {r['elapsed']:7.2f}s  {r['throughput']:8.1f} tx/s  "
+          f"p50 {r['p50_ms']:7.1f}ms  p95 {r['p95_ms']:7.1f}ms  p99 {r['p99_ms']:7.1f}ms  "
+          f"ok {r['ok']:5d}  locked {r['failed']:4d}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="transactions per thread")
+    parser.add_argument("--url-from-env", action="store_true",
+                        help="benchmark DATABASE_URL (tuned profile only) instead of scratch SQLite files")
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.writes} upload+customize transactions")
+    if args.url_from_env:
+        url = os.environ["DATABASE_URL"]
+        _print("tuned", run_profile(url, True, args.threads, args.writes))
+        return
+
+    _print("legacy", run_profile(f"sqlite:///{workdir / 'legacy.db'}", False, args.threads, args.writes))
+    _print("tuned", run_profile(f"sqlite:///{workdir / 'tuned.db'}", True, args.threads, args.writes))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,63 @@
+"""
+Latency of one whole-document extraction call against the hybrid extractor (rules plus
+concurrent per-section calls), with fake models whose latency grows with the tokens they
+generate, like a real LLM: `--ttft` seconds to the first token, then `--tps` tokens/s.
+
+Usage (from backend/):
+    python -m benchmarks.bench_hybrid_extract --ttft 0.5 --tps 150
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import SAMPLE_RESUME_PDF, use_scratch_workdir
+from benchmarks.synthetic import make_messy_resume_pages, make_text_pdf
+
+workdir = use_scratch_workdir()
+
+import extract_resume_data  # noqa: E402
+from benchmarks.fakes import install_extraction_fakes  # noqa: E402
+from executors import shutdown_pools  # noqa: E402
+from pdf_text import extract_text_from_pdf  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ttft", type=float, default=0.5, help="fake time to first token, seconds")
+    parser.add_argument("--tps", type=float, default=150.0, help="fake output tokens per second")
+    args = parser.parse_args()
+    install_extraction_fakes(args.ttft, args.tps)
+
+    messy = workdir / "messy.pdf"
+    messy.write_bytes(make_text_pdf(make_messy_resume_pages(page_count=2)))
+    inputs = [("notebook/resume.pdf", SAMPLE_RESUME_PDF), ("synthetic 2 pages", messy)]
+
+    header = f"{'input':<22}{'single':>9}{'hybrid':>9}{'async':>9}  LLM sections"
+    print(f"fake LLM: {args.ttft:.2f}s to first token, {args.tps:.0f} tokens/s")
+    print(header)
+    print("-" * len(header))
+    for label, path in inputs:
+        text = extract_resume_data._compact(extract_text_from_pdf(str(path))).text
+        extract_resume_data.EXTRACT_MODE = "single"
+        t_single = timed(lambda: extract_resume_data._extract_text(text))
+        extract_resume_data.EXTRACT_MODE = "hybrid"
+        t_hybrid = timed(lambda: extract_resume_data._extract_text(text))
+        t_async = timed(lambda: asyncio.run(extract_resume_data._aextract_text(text)))
+        plan = extract_resume_data.plan_extraction(text)
+        sections = ", ".join(plan.llm_sections) if plan else "none (fallback)"
+        print(f"{label:<22}{t_single:>8.2f}s{t_hybrid:>8.2f}s{t_async:>8.2f}s  {sections}")
+
+    print("\nestimated tokens per call:")
+    for label, usage in sorted(extract_resume_data.extraction_token_usage.snapshot().items()):
+        print(f"  {label:<22} in {usage['avg_input_tokens']:>7.1f}  out {usage['avg_output_tokens']:>7.1f}")
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main_cli()
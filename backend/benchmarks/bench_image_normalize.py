@@ -0,0 +1,104 @@
+"""
+Payload and latency of sending a layout image to the vision model as uploaded versus
+normalized (downscaled, re-encoded, metadata stripped), for a 12 MP phone photo of a
+resume and a desktop screenshot.
+
+Normalization and base64 encoding are measured. Upload time at `--uplink-mbps` and
+image prefill at `--prefill-tps` tokens/s are modeled; image tokens follow Gemini's
+rule of 258 tokens per 768x768 tile (258 in total up to 384 px).
+
+Usage (from backend/):
+    python -m benchmarks.bench_image_normalize --uplink-mbps 20 --prefill-tps 5000
+"""
+import argparse
+import asyncio
+import base64
+import io
+import math
+import time
+
+from benchmarks.common import use_scratch_workdir
+
+use_scratch_workdir()
+
+from PIL import Image  # noqa: E402
+
+import image_normalizer  # noqa: E402
+from benchmarks.synthetic import make_layout_png  # noqa: E402
+
+_TILE_TOKENS = 258
+
+
+def phone_photo() -> bytes:
+    """The synthetic layout upscaled to 12 MP with sensor noise, as a camera JPEG with EXIF."""
+    layout = Image.open(io.BytesIO(make_layout_png(1))).convert("RGB").resize((3024, 4032), Image.Resampling.BICUBIC)
+    noise = Image.effect_noise(layout.size, 12).convert("RGB")
+    photo = Image.blend(layout, noise, 0.08)
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110] = "PhoneMaker", "Phone 12"
+    out = io.BytesIO()
+    photo.save(out, "JPEG", quality=92, exif=exif)
+    return out.getvalue()
+
+
+def screenshot() -> bytes:
+    layout = Image.open(io.BytesIO(make_layout_png(2))).convert("RGB").resize((1860, 2631), Image.Resampling.NEAREST)
+    out = io.BytesIO()
+    layout.save(out, "PNG")
+    return out.getvalue()
+
+
+def image_tokens(width: int, height: int) -> int:
+    if width <= 384 and height <= 384:
+        return _TILE_TOKENS
+    return math.ceil(width / 768) * math.ceil(height / 768) * _TILE_TOKENS
+
+
+def report(label: str, payload: bytes, size, local_s: float, args) -> float:
+    data_uri_bytes = len(base64.b64encode(payload))
+    upload_s = data_uri_bytes * 8 / (args.uplink_mbps * 1e6)
+    tokens = image_tokens(*size)
+    prefill_s = tokens / args.prefill_tps
+    total = local_s + upload_s + prefill_s
+    print(f"{label:<30}{data_uri_bytes / 1024:>10.0f} KiB{tokens:>8}{local_s * 1000:>10.1f}ms"
+          f"{upload_s * 1000:>10.0f}ms{prefill_s * 1000:>10.0f}ms{total * 1000:>10.0f}ms")
+    return total
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uplink-mbps", type=float, default=20.0, help="modeled upload bandwidth to the provider")
+    parser.add_argument("--prefill-tps", type=float, default=5000.0, help="modeled image-token prefill rate")
+    args = parser.parse_args()
+
+    print(f"modeled: uplink {args.uplink_mbps:.0f} Mbit/s, prefill {args.prefill_tps:.0f} tokens/s")
+    header = f"{'image / settings':<30}{'payload':>14}{'tokens':>8}{'local':>12}{'upload':>12}{'prefill':>12}{'total':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, source in (("phone photo", phone_photo()), ("screenshot", screenshot())):
+        start = time.perf_counter()
+        base64.b64encode(source)
+        raw_total = report(f"{name}: as uploaded", source, Image.open(io.BytesIO(source)).size,
+                           time.perf_counter() - start, args)
+
+        for image_format, grayscale in (("webp", False), ("jpeg", False), ("png", False), ("webp", True)):
+            image_normalizer.IMAGE_FORMAT, image_normalizer.IMAGE_GRAYSCALE = image_format, grayscale
+            start = time.perf_counter()
+            data, width, height, _ = image_normalizer._reencode(source)
+            base64.b64encode(data)
+            label = f"  {image_format}{' gray' if grayscale else ''} {image_normalizer.IMAGE_MAX_SIDE}px"
+            total = report(label, data, (width, height), time.perf_counter() - start, args)
+            print(f"{'':<30}payload {len(data) / len(source) - 1:+.0%}, total {total / raw_total - 1:+.0%}")
+
+        # Default settings through the cached path the renderer uses
+        image_normalizer.IMAGE_FORMAT, image_normalizer.IMAGE_GRAYSCALE = "webp", False
+        asyncio.run(image_normalizer.anormalize_image(source, "layout.jpg"))
+        start = time.perf_counter()
+        image = asyncio.run(image_normalizer.anormalize_image(source, "layout.jpg"))
+        total = report("  renderer (webp), cache hit", image.data, (image.width, image.height),
+                       time.perf_counter() - start, args)
+        print(f"{'':<30}payload {len(image.data) / len(source) - 1:+.0%}, total {total / raw_total - 1:+.0%}")
+
+
+if __name__ == "__main__":
+    main_cli()
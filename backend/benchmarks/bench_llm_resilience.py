@@ -0,0 +1,94 @@
+"""
+A 429 storm against the LLM client layer: the primary fake provider fails its first
+`--storm` calls with a transient error, then recovers. Compares a bare model (what every
+module had before llm_clients), jittered retries, and retries plus the circuit breaker
+routing to a slower fallback provider.
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_resilience --requests 50 --storm 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import use_scratch_workdir
+
+use_scratch_workdir()
+
+from fake_llm import FakeChatModel  # noqa: E402
+from llm_clients import TRANSIENT_ERRORS, CircuitBreaker, GuardedRunnable  # noqa: E402
+
+
+def _retried(runnable, args):
+    return runnable.with_retry(
+        retry_if_exception_type=TRANSIENT_ERRORS,
+        wait_exponential_jitter=True,
+        exponential_jitter_params={"initial": args.retry_initial, "max": args.retry_initial * 8},
+        stop_after_attempt=args.retries + 1,
+    )
+
+
+def build(scenario: str, args):
+    primary = FakeChatModel(latency_s=args.latency, fail_first=args.storm)
+    if scenario == "bare":
+        return primary, primary
+    if scenario == "retry":
+        return _retried(primary, args), primary
+    fallback = FakeChatModel(latency_s=args.latency * 3)
+    breaker = CircuitBreaker("primary", failures=5, reset_after=args.reset_after)
+    guarded = _retried(GuardedRunnable(primary, breaker, timeout=30), args)
+    return guarded.with_fallbacks([GuardedRunnable(fallback, CircuitBreaker("fallback"), timeout=30)]), primary
+
+
+async def run(scenario: str, args) -> dict:
+    runnable, primary = build(scenario, args)
+    latencies, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        # Requests arrive over time rather than all at once
+        await asyncio.sleep(i * args.interval)
+        start = time.perf_counter()
+        try:
+            await runnable.ainvoke(f"request {i}")
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    latencies.sort()
+    return {
+        "ok": len(latencies),
+        "failed": failures,
+        "primary_calls": primary._calls,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "wall": time.perf_counter() - start,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--storm", type=int, default=40, help="primary calls that fail before it recovers")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake primary latency, seconds")
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between request arrivals")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--retry-initial", type=float, default=0.1)
+    parser.add_argument("--reset-after", type=float, default=0.5, help="circuit open time, seconds")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, primary fails its first {args.storm} calls")
+    header = f"{'scenario':<24}{'ok':>5}{'failed':>8}{'primary calls':>15}{'p50':>9}{'p95':>9}"
+    print(header)
+    print("-" * len(header))
+    for scenario, label in (("bare", "bare model"), ("retry", "jittered retries"),
+                            ("breaker", "retries+breaker+fallback")):
+        r = asyncio.run(run(scenario, args))
+        print(f"{label:<24}{r['ok']:>5}{r['failed']:>8}{r['primary_calls']:>15}{r['p50']:>8.2f}s{r['p95']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main_cli()
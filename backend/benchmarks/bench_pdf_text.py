@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for PDF text extraction: the old single-threaded `text +=` loop
+against pdf_text's sequential, process-pool and streaming paths, over
+notebook/resume.pdf and synthetic multi-page PDFs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_text --pages 10 50 200 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.common import SAMPLE_RESUME_PDF, use_scratch_workdir
+from benchmarks.synthetic import make_resume_pages, make_text_pdf
+
+# Lift the budgets so the full document is extracted and timed
+os.environ.setdefault("PDF_MAX_PAGES", "1000")
+os.environ.setdefault("PDF_MAX_TEXT_CHARS", "100000000")
+workdir = use_scratch_workdir()
+
+from pypdf import PdfReader  # noqa: E402
+
+import pdf_text  # noqa: E402
+from executors import shutdown_pools  # noqa: E402
+
+
+def legacy_extract(file_path: str) -> str:
+    reader = PdfReader(file_path)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() or ""
+        text += "\n"
+    return text.strip()
+
+
+def first_page_latency(file_path: str, parallel: bool) -> str:
+    return next(pdf_text.iter_pdf_text(file_path, parallel=parallel))
+
+
+def timed(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), out
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = [("notebook/resume.pdf", str(SAMPLE_RESUME_PDF))]
+    for count in args.pages:
+        path = workdir / f"synthetic-{count}.pdf"
+        path.write_bytes(make_text_pdf(make_resume_pages(count)))
+        inputs.append((f"synthetic {count} pages", str(path)))
+
+    # Start the worker processes before timing anything
+    pdf_text.extract_text_from_pdf(inputs[-1][1], parallel=True)
+
+    header = f"{'input':<24}{'legacy':>10}{'sequential':>12}{'parallel':>10}{'1st page':>10}{'chars old/new':>18}"
+    print(header)
+    print("-" * len(header))
+    for label, path in inputs:
+        t_legacy, old_text = timed(lambda: legacy_extract(path), args.repeat)
+        t_seq, new_text = timed(lambda: pdf_text.extract_text_from_pdf(path, parallel=False), args.repeat)
+        t_par, _ = timed(lambda: pdf_text.extract_text_from_pdf(path, parallel=True), args.repeat)
+        t_first, _ = timed(lambda: first_page_latency(path, parallel=True), args.repeat)
+        print(f"{label:<24}{t_legacy * 1000:>8.1f}ms{t_seq * 1000:>10.1f}ms{t_par * 1000:>8.1f}ms"
+              f"{t_first * 1000:>8.1f}ms{len(old_text):>10}/{len(new_text)}")
+
+    print(f"\npdf_pages workers: {pdf_text.PDF_PAGES_WORKERS} (parallel speedup needs more than one core)")
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,123 @@
+"""
+Cold-start cost of the backend: time to `import main` in a fresh interpreter, then
+time until a freshly started uvicorn answers its first request and how long the
+first upload takes, with WARM_UP_ON_STARTUP off and blocking. Runs against the fake
+LLM provider so no API key or network is needed.
+
+Exits with status 1 when the median cold import time is over `--budget` seconds
+(IMPORT_TIME_BUDGET_S by default), so it can gate CI; tests/test_startup.py checks
+the same budget on every test run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 5 --budget 2.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, SAMPLE_RESUME_PDF, free_port
+
+# Seconds a cold `import main` may take; measured at about 1.7s on a laptop
+IMPORT_TIME_BUDGET_S = float(os.getenv("IMPORT_TIME_BUDGET_S", "3.0"))
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _env(**overrides) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")])),
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "benchmark-placeholder"),
+        "LLM_PROVIDER": "fake",
+        # Relative to the scratch directory each run starts in
+        "DATABASE_URL": "sqlite:///./database.db",
+        "EXTRACTION_CACHE_ENABLED": "0",
+        "JOB_API_WORKERS": "0",
+        "PDF_RENDER_WARM_ON_STARTUP": "0",
+    })
+    env.update(overrides)
+    return env
+
+
+def run_fresh(snippet: str) -> str:
+    """Runs Python code in a new interpreter in an empty directory and returns its stdout."""
+    # Nothing cached in sys.modules, and its own database.db
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as workdir:
+        out = subprocess.run(
+            [sys.executable, "-c", snippet], cwd=workdir, env=_env(),
+            capture_output=True, text=True, check=True,
+        )
+    return out.stdout
+
+
+def cold_import_s() -> float:
+    return float(run_fresh(_IMPORT_SNIPPET).strip().splitlines()[-1])
+
+
+def first_response(warm_up: str):
+    """
+    Starts uvicorn and returns (seconds until the first 200, seconds the first upload took).
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as workdir:
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=workdir, env=_env(WARM_UP_ON_STARTUP=warm_up),
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+                while True:
+                    try:
+                        if client.get("/llm/stats").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        time.sleep(0.01)
+                ready = time.perf_counter() - start
+
+                client.post("/register", data={"username": "bench", "password": "bench"})
+                token = client.post("/login", data={"username": "bench", "password": "bench"}).json()["access_token"]
+                pdf = {"file": ("resume.pdf", SAMPLE_RESUME_PDF.read_bytes(), "application/pdf")}
+                upload_start = time.perf_counter()
+                client.post("/upload_resume", files=pdf, headers={"Authorization": f"Bearer {token}"}).raise_for_status()
+                upload = time.perf_counter() - upload_start
+        finally:
+            server.terminate()
+            server.wait()
+    return ready, upload
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_S,
+                        help="fail when the median cold import takes longer, seconds (0 disables)")
+    args = parser.parse_args()
+
+    imports = [cold_import_s() for _ in range(args.runs)]
+    print(f"cold `import main`: median {statistics.median(imports):.3f}s, "
+          f"min {min(imports):.3f}s, max {max(imports):.3f}s ({args.runs} runs)")
+
+    header = f"{'WARM_UP_ON_STARTUP':<20}{'first response':>16}{'first upload':>14}"
+    print(header)
+    print("-" * len(header))
+    for warm_up in ("off", "blocking"):
+        runs = [first_response(warm_up) for _ in range(args.runs)]
+        ready = statistics.median(r for r, _ in runs)
+        upload = statistics.median(u for _, u in runs)
+        print(f"{warm_up:<20}{ready:>15.3f}s{upload:>13.3f}s")
+
+    median_import = statistics.median(imports)
+    if args.budget and median_import > args.budget:
+        print(f"FAIL: cold import {median_import:.3f}s is over the {args.budget:.3f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
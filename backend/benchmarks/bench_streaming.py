@@ -0,0 +1,107 @@
+"""
+Time to first byte and total time of the buffered upload/render endpoints against
+their server-sent-event variants, through a real uvicorn server (test clients buffer
+whole responses). The models are fakes that take `--ttft` seconds to the first token
+and then generate `--tps` tokens/s; PDF rendering is a fixed `--pdf-latency` sleep.
+
+Usage (from backend/):
+    python -m benchmarks.bench_streaming --ttft 1.0 --tps 100 --html-tokens 2000
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks.common import SAMPLE_RESUME_PDF, free_port, use_scratch_workdir
+
+use_scratch_workdir()
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+
+import extract_resume_data  # noqa: E402
+import main  # noqa: E402
+import vision_renderer  # noqa: E402
+from benchmarks.fakes import install_extraction_fakes  # noqa: E402
+
+_CHUNK_TOKENS = 20
+
+
+class FakeVisionModel:
+    def __init__(self, html_tokens: int, ttft: float, tps: float):
+        self.chunks = [f"<p>{'x' * (_CHUNK_TOKENS * 4 - 7)}</p>" for _ in range(html_tokens // _CHUNK_TOKENS)]
+        self.ttft, self.tps = ttft, tps
+
+    async def astream(self, messages):
+        await asyncio.sleep(self.ttft)
+        for chunk in self.chunks:
+            await asyncio.sleep(_CHUNK_TOKENS / self.tps)
+            yield AIMessageChunk(content=chunk)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.ttft + len(self.chunks) * _CHUNK_TOKENS / self.tps)
+        return AIMessage(content="".join(self.chunks))
+
+
+def measure(client: httpx.Client, path: str, **kwargs):
+    start = time.perf_counter()
+    first = None
+    with client.stream("POST", path, **kwargs) as res:
+        for chunk in res.iter_raw():
+            if first is None and chunk:
+                first = time.perf_counter() - start
+        res.raise_for_status()
+    return first, time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ttft", type=float, default=1.0, help="fake time to first token, seconds")
+    parser.add_argument("--tps", type=float, default=100.0, help="fake output tokens per second")
+    parser.add_argument("--html-tokens", type=int, default=2000, help="size of the fake rendered HTML")
+    parser.add_argument("--pdf-latency", type=float, default=1.0, help="fake HTML-to-PDF time, seconds")
+    args = parser.parse_args()
+
+    install_extraction_fakes(args.ttft, args.tps)
+    extract_resume_data.get_cached_extraction = lambda cache_key: None
+    vision_renderer.vision_model = FakeVisionModel(args.html_tokens, args.ttft, args.tps)
+
+    async def fake_pdf(html: str) -> bytes:
+        await asyncio.sleep(args.pdf_latency)
+        return b"%PDF-1.4 benchmark"
+
+    main.arender_pdf = fake_pdf
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        client.post("/register", data={"username": "bench", "password": "bench"})
+        token = client.post("/login", data={"username": "bench", "password": "bench"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        pdf = {"file": ("resume.pdf", SAMPLE_RESUME_PDF.read_bytes(), "application/pdf")}
+        image = {"file": ("layout.png", b"\x89PNG benchmark", "image/png")}
+
+        rows = [
+            ("upload", measure(client, "/upload_resume", files=pdf, headers=headers),
+             measure(client, "/upload_resume/stream", files=pdf, headers=headers)),
+            ("render (direct)", measure(client, "/render_resume_from_image", files=image, headers=headers),
+             measure(client, "/render_resume_from_image/stream", files=image, headers=headers)),
+        ]
+
+    print(f"fake LLM: {args.ttft:.1f}s to first token, {args.tps:.0f} tokens/s, "
+          f"{args.html_tokens} HTML tokens, PDF {args.pdf_latency:.1f}s")
+    header = f"{'endpoint':<18}{'buffered TTFB':>15}{'stream TTFB':>13}{'buffered total':>16}{'stream total':>14}"
+    print(header)
+    print("-" * len(header))
+    for label, (b_first, b_total), (s_first, s_total) in rows:
+        print(f"{label:<18}{b_first:>14.3f}s{s_first:>12.3f}s{b_total:>15.2f}s{s_total:>13.2f}s")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_cli()
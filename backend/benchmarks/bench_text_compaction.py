@@ -0,0 +1,72 @@
+"""
+Token reduction from text_compaction over a corpus of resumes: raw PyPDF text versus
+normalized text versus text fitted to the extraction token budget, plus the full
+extraction prompt (system prompt included) before and after.
+
+The corpus is notebook/resume.pdf, synthetic resumes with the usual PyPDF artefacts,
+and any PDFs in --corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_text_compaction --synthetic 10 --budget 300 --corpus ~/resumes
+"""
+import argparse
+from pathlib import Path
+
+from benchmarks.common import SAMPLE_RESUME_PDF, use_scratch_workdir
+from benchmarks.synthetic import make_messy_resume_pages, make_text_pdf
+
+workdir = use_scratch_workdir()
+
+from extract_resume_data import prompt_template  # noqa: E402
+from pdf_text import extract_text_from_pdf  # noqa: E402
+from text_compaction import EXTRACT_TOKEN_BUDGET, compact_resume_text  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+def prompt_tokens(text: str) -> int:
+    return estimate_tokens(prompt_template.invoke({"text": text}).to_string())
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=10, help="synthetic resumes to generate")
+    parser.add_argument("--budget", type=int, default=EXTRACT_TOKEN_BUDGET, help="token budget (0 = none)")
+    parser.add_argument("--corpus", type=Path, help="directory of extra resume PDFs")
+    args = parser.parse_args()
+
+    inputs = [("notebook/resume.pdf", SAMPLE_RESUME_PDF)]
+    for i in range(args.synthetic):
+        path = workdir / f"messy-{i}.pdf"
+        path.write_bytes(make_text_pdf(make_messy_resume_pages(page_count=1 + i % 3, seed=i)))
+        inputs.append((f"synthetic {i} ({1 + i % 3}p)", path))
+    if args.corpus:
+        inputs += [(path.name[:22], path) for path in sorted(args.corpus.glob("*.pdf"))]
+
+    header = f"{'input':<24}{'raw':>7}{'normalized':>12}{'budgeted':>10}{'prompt old/new':>17}  trimmed"
+    print(f"estimated tokens, budget {args.budget or 'off'}")
+    print(header)
+    print("-" * len(header))
+    totals = [0, 0, 0, 0, 0]
+    for label, path in inputs:
+        raw = extract_text_from_pdf(str(path))
+        result = compact_resume_text(raw, budget=args.budget)
+        old_prompt, new_prompt = prompt_tokens(raw), prompt_tokens(result.text)
+        trimmed = ", ".join(
+            [f"-{name}" for name in result.dropped_sections]
+            + [f"~{name}" for name in result.shortened_sections]
+            + (["truncated"] if result.truncated else [])
+        )
+        print(f"{label:<24}{result.raw_tokens:>7}{result.normalized_tokens:>12}{result.tokens:>10}"
+              f"{old_prompt:>10}/{new_prompt:<6}  {trimmed}")
+        for n, value in enumerate((result.raw_tokens, result.normalized_tokens, result.tokens, old_prompt, new_prompt)):
+            totals[n] += value
+
+    raw, normalized, budgeted, old_prompt, new_prompt = totals
+    print("-" * len(header))
+    print(f"{'total':<24}{raw:>7}{normalized:>12}{budgeted:>10}{old_prompt:>10}/{new_prompt:<6}")
+    print(f"\nresume text: -{1 - normalized / raw:.1%} from normalization, -{1 - budgeted / raw:.1%} with the budget")
+    print(f"full prompt: -{1 - new_prompt / old_prompt:.1%} ({len(inputs)} resumes)")
+
+
+if __name__ == "__main__":
+    main_cli()
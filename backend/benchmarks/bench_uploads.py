@@ -0,0 +1,73 @@
+"""
+Peak Python memory and time of storing one upload: the old `await file.read()` plus
+write against upload_store's chunked, hashed copy. Then the disk used by `--users`
+users uploading the same file, which the content-addressed store keeps once.
+
+Usage (from backend/):
+    python -m benchmarks.bench_uploads --size-mb 50 --users 5
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+import tracemalloc
+
+from benchmarks.common import use_scratch_workdir
+
+use_scratch_workdir()
+
+from fastapi import UploadFile  # noqa: E402
+
+import upload_store  # noqa: E402
+from extraction_cache import file_sha256  # noqa: E402
+
+
+async def read_all(file: UploadFile, path: str):
+    with open(path, "wb") as f:
+        f.write(await file.read())
+    file_sha256(path)  # the extraction cache then hashed the file again
+
+
+def measure(label: str, store, payload: bytes):
+    def fresh() -> UploadFile:
+        # A spooled file on disk, like Starlette hands over for large parts
+        spooled = io.BufferedRandom(io.FileIO("spooled.bin", "w+b"))
+        spooled.write(payload)
+        spooled.seek(0)
+        return UploadFile(spooled, size=len(payload), filename="resume.pdf")
+
+    file = fresh()
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(store(file))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28}{peak / 2**20:>10.1f} MiB{elapsed:>10.3f}s")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5)
+    args = parser.parse_args()
+    payload = os.urandom(args.size_mb * 2**20)
+
+    print(f"{'store one ' + str(args.size_mb) + ' MiB upload':<28}{'peak mem':>14}{'time':>11}")
+    measure("read() + write + rehash", lambda f: read_all(f, "legacy.pdf"), payload)
+    measure("upload_store (chunked)", lambda f: upload_store.store_upload(f, max_bytes=len(payload)), payload)
+
+    for user in range(args.users):
+        with open(f"user-{user}-resume.pdf", "wb") as f:
+            f.write(payload)  # old layout: one copy per upload (or overwritten on name clash)
+    for _ in range(args.users):
+        file = UploadFile(io.BytesIO(payload), size=len(payload), filename="resume.pdf")
+        asyncio.run(upload_store.store_upload(file, max_bytes=len(payload)))
+    stored = sum(entry.stat().st_size for entry in os.scandir(upload_store.UPLOAD_DIR))
+    print(f"{args.users} identical uploads on disk: per-upload files {args.users * len(payload) / 2**20:.0f} MiB, "
+          f"content-addressed {stored / 2**20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main_cli()
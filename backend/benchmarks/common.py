@@ -0,0 +1,29 @@
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = BACKEND_DIR.parent
+SAMPLE_RESUME_PDF = REPO_DIR / "notebook" / "resume.pdf"
+
+
+def use_scratch_workdir() -> Path:
+    """
+    Makes backend modules importable and moves into an empty temp directory,
+    so benchmarks get their own ./database.db and ./uploads instead of the real ones.
+    Call before importing any backend module.
+    """
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+    workdir = Path(tempfile.mkdtemp(prefix="resume-bench-"))
+    os.chdir(workdir)
+    return workdir
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,36 @@
+"""
+Fake chat models for offline benchmarks. Import after use_scratch_workdir().
+"""
+import asyncio
+import time
+
+import extract_resume_data
+from benchmarks.synthetic import sample_resume
+from hybrid_extractor import SECTION_SCHEMAS
+from resume_models import ResumeExtractionData
+from tokens import estimate_tokens
+
+
+class TokenPacedFakeModel:
+    """Returns `result` after ttft + output tokens / tps seconds, like a real LLM."""
+
+    def __init__(self, result, ttft: float, tps: float):
+        self.result = result
+        self.delay = ttft + estimate_tokens(result.model_dump_json()) / tps
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        return self.result
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def install_extraction_fakes(ttft: float, tps: float):
+    """Replaces the whole-document and per-section extraction models with token-paced fakes."""
+    full = ResumeExtractionData.model_validate(sample_resume())
+    extract_resume_data.extraction_model = TokenPacedFakeModel(full, ttft, tps)
+    for group, schema in SECTION_SCHEMAS.items():
+        fields = {name: getattr(full, name) for name in schema.model_fields if name in ResumeExtractionData.model_fields}
+        extract_resume_data.section_models[group] = TokenPacedFakeModel(schema(**fields), ttft, tps)
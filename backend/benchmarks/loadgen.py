@@ -0,0 +1,231 @@
+"""
+Offline load test. Starts the API with the fake LLM provider (canned replies from a
+recording, fixed latency per call) and drives `--users` concurrent virtual users
+through register, login, then `--iterations` rounds of upload, customize and render,
+with synthetic resume PDFs and layout images. Reports p50/p95/p99 latency and
+requests/s per endpoint.
+
+--save-baseline writes the report as JSON; --baseline compares against a saved report
+and exits with status 1 when an endpoint's p95 or throughput regressed by more than
+--tolerance. With --url the driver targets an already running server instead (its LLM
+provider is whatever it was started with).
+
+Usage (from backend/):
+    python -m benchmarks.loadgen --users 20 --iterations 3 --llm-latency 0.5
+    python -m benchmarks.loadgen --skip render --baseline benchmarks/baselines/loadgen_no_render.json
+
+A baseline only compares against runs with the same options and on similar hardware;
+re-record it with --save-baseline after an intended change.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, free_port
+from benchmarks.synthetic import SAMPLE_JOB_POSTS, fake_llm_recording, make_layout_png, make_resume_pdf
+
+ENDPOINTS = ("register", "login", "upload", "customize", "render")
+# Distinct layout images; renders of the same image reuse its cached template
+LAYOUT_IMAGES = 4
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.windows = {}
+
+    async def timed(self, endpoint: str, request):
+        start = time.perf_counter()
+        try:
+            res = await request
+            res.raise_for_status()
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            res = None
+        end = time.perf_counter()
+        self.samples[endpoint].append(end - start)
+        first, last = self.windows.get(endpoint, (start, end))
+        self.windows[endpoint] = (min(first, start), max(last, end))
+        return res
+
+    def report(self) -> dict:
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            ordered = sorted(self.samples.get(endpoint, []))
+            if not ordered:
+                continue
+            first, last = self.windows[endpoint]
+            endpoints[endpoint] = {
+                "count": len(ordered),
+                "errors": self.errors[endpoint],
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+                "rps": round(len(ordered) / max(last - first, 1e-9), 2),
+            }
+        return endpoints
+
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, user: int, args):
+    credentials = {"username": f"load-{user}-{os.getpid()}", "password": "load-test"}
+    await recorder.timed("register", client.post("/register", data=credentials))
+    res = await recorder.timed("login", client.post("/login", data=credentials))
+    if res is None:
+        return
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    for iteration in range(args.iterations):
+        seed = user * 1000 + iteration
+        if "upload" not in args.skip:
+            pdf = {"file": (f"resume-{seed}.pdf", make_resume_pdf(seed), "application/pdf")}
+            await recorder.timed("upload", client.post("/upload_resume", files=pdf, headers=headers))
+        if "customize" not in args.skip:
+            job_post = SAMPLE_JOB_POSTS[seed % len(SAMPLE_JOB_POSTS)] + f" (opening {seed})"
+            await recorder.timed("customize", client.post(
+                "/customize_resume", data={"job_post": job_post, "mode": "llm"}, headers=headers,
+            ))
+        if "render" not in args.skip:
+            image = {"file": ("layout.png", make_layout_png(seed % LAYOUT_IMAGES), "image/png")}
+            await recorder.timed("render", client.post(
+                "/render_resume_from_image", data={"mode": args.render_mode}, files=image, headers=headers,
+            ))
+
+
+async def drive(base_url: str, args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(client, recorder, user, args) for user in range(args.users)))
+        wall = time.perf_counter() - start
+    return {"wall_s": round(wall, 2), "endpoints": recorder.report()}
+
+
+def start_server(workdir: Path, args) -> tuple:
+    recording = workdir / "recording.json"
+    recording.write_text(json.dumps(fake_llm_recording()))
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")])),
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "benchmark-placeholder"),
+        "LLM_PROVIDER": "fake",
+        "LLM_FALLBACK_PROVIDER": "",
+        "FAKE_LLM_RECORDING": args.recording or str(recording),
+        "FAKE_LLM_LATENCY_S": str(args.llm_latency),
+        # Measure the app, not the provider quota
+        "LLM_REQUESTS_PER_SECOND": "0",
+        "JOB_API_WORKERS": "0",
+        "REQUEST_LOG_ENABLED": "0",
+    })
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/llm/stats").status_code == 200:
+                return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("API server did not start within 60s")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Prints the change against the baseline; returns the regressions."""
+    regressions = []
+    header = f"{'endpoint':<11}{'p95 base':>10}{'p95 now':>10}{'change':>9}{'rps base':>10}{'rps now':>9}{'change':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, now in report["endpoints"].items():
+        base = baseline["endpoints"].get(endpoint)
+        if base is None:
+            continue
+        p95_change = now["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = now["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        print(f"{endpoint:<11}{base['p95_ms']:>8.0f}ms{now['p95_ms']:>8.0f}ms{p95_change:>+9.0%}"
+              f"{base['rps']:>10.2f}{now['rps']:>9.2f}{rps_change:>+9.0%}")
+        if p95_change > tolerance:
+            regressions.append(f"{endpoint} p95 {p95_change:+.0%}")
+        if rps_change < -tolerance:
+            regressions.append(f"{endpoint} rps {rps_change:+.0%}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=3, help="upload/customize/render rounds per user")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM seconds per call")
+    parser.add_argument("--recording", default="", help="JSON of canned LLM replies (default: synthetic)")
+    parser.add_argument("--render-mode", choices=("direct", "template"), default="template")
+    parser.add_argument("--skip", nargs="*", default=[], choices=("upload", "customize", "render"))
+    parser.add_argument("--url", default="", help="load an already running server instead of starting one")
+    parser.add_argument("--save-baseline", default="", help="write the report to this JSON file")
+    parser.add_argument("--baseline", default="", help="compare against this saved report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95/rps regression, as a fraction")
+    args = parser.parse_args()
+
+    config = {
+        "users": args.users, "iterations": args.iterations, "llm_latency_s": args.llm_latency,
+        "render_mode": args.render_mode, "skip": sorted(args.skip),
+    }
+    if args.url:
+        report = asyncio.run(drive(args.url, args))
+    else:
+        with tempfile.TemporaryDirectory(prefix="resume-load-") as workdir:
+            server, base_url = start_server(Path(workdir), args)
+            try:
+                report = asyncio.run(drive(base_url, args))
+            finally:
+                server.terminate()
+                server.wait()
+    report = {"config": config, "python": platform.python_version(), **report}
+
+    print(f"{args.users} users x {args.iterations} iterations, fake LLM {args.llm_latency:.2f}s/call, "
+          f"wall {report['wall_s']:.2f}s")
+    header = f"{'endpoint':<11}{'count':>7}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in report["endpoints"].items():
+        print(f"{endpoint:<11}{row['count']:>7}{row['errors']:>8}{row['p50_ms']:>7.0f}ms"
+              f"{row['p95_ms']:>7.0f}ms{row['p99_ms']:>7.0f}ms{row['rps']:>9.2f}")
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["config"] != config:
+            print(f"warning: baseline was recorded with {baseline['config']}")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("FAIL: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,247 @@
+"""
+Dependency-free generators for synthetic benchmark inputs.
+"""
+import random
+import struct
+import zlib
+from typing import List
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages: List[List[str]]) -> bytes:
+    """
+    Builds a minimal valid PDF with one Helvetica text line per entry of each page.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        ops = ["BT /F1 10 Tf 12 TL 50 800 Td"]
+        ops += [f"({_escape(line)}) '" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return bytes(out)
+
+
+def make_resume_pages(page_count: int, lines_per_page: int = 55, seed: int = 0) -> List[List[str]]:
+    """
+    Resume-like pages with a repeated header and a numbered footer on every page.
+    """
+    pages = []
+    for p in range(page_count):
+        lines = ["Jane Doe - Senior Software Engineer - jane.doe@example.com"]
+        for i in range(lines_per_page):
+            n = seed + p * lines_per_page + i
+            lines.append(
+                f"Project {n}: built a data pipeline in Python and SQL serving {n % 97} teams, "
+                f"cut latency by {n % 60}% using caching and async IO"
+            )
+        lines.append(f"Page {p + 1} of {page_count}")
+        pages.append(lines)
+    return pages
+
+
+def make_messy_resume_pages(page_count: int = 2, seed: int = 0) -> List[List[str]]:
+    """
+    Resume pages with the artefacts PyPDF leaves in real exports: a header and
+    page number on every page, words hyphenated across lines, runs of spaces,
+    empty bullets, a URL split over two lines and long low-priority sections.
+    """
+    body = [
+        "Jane   Doe",
+        "jane.doe@example.com  |  +1 555 010 2030  |  linkedin.com/in/",
+        "jane-doe-engineer",
+        "Summary",
+        "Backend engineer with experience building data-inten-",
+        "sive services in Python.",
+        "Experience",
+    ]
+    for i in range(3 + seed % 3):
+        body += [
+            f"Software Engineer   |   Company {seed + i}   |   20{17 + i} - 20{18 + i}",
+            "*  Designed and shipped backend services handling mil-",
+            "lions of requests per day.",
+            "*  Reduced p95 latency by 40%   through query tuning and caching.",
+            "*",
+        ]
+    body += ["Skills", "Python, FastAPI, PostgreSQL, Redis, Docker, Kubernetes, AWS"]
+    body += ["Education", "B.Tech in Computer Engineering, State Technical University, 2016 - 2020"]
+    body += ["Projects"] + [
+        f"Project {i}: document ingestion service with an LLM extraction step and a REST API" for i in range(6)
+    ]
+    body += ["Certifications"] + [f"Certificate {i} in cloud architecture from Online Academy" for i in range(8)]
+    body += ["Achievements"] + [f"Hackathon {2015 + i}: finalist among {40 + i} teams" for i in range(8)]
+    body += ["Interests"] + [f"Hobby {i}: long-distance cycling, chess and amateur photography" for i in range(10)]
+    body += ["References", "Available   on   request", "-", "-"]
+
+    per_page = -(-len(body) // page_count)
+    pages = []
+    for p in range(page_count):
+        lines = ["Jane Doe  -  Curriculum Vitae  -  jane.doe@example.com"]
+        lines += body[p * per_page:(p + 1) * per_page]
+        lines.append(f"{p + 1}")
+        pages.append(lines)
+    return pages
+
+
+def make_resume_pdf(seed: int = 0) -> bytes:
+    """
+    A one-page resume PDF whose content depends on `seed`, so each one is a distinct upload.
+    """
+    resume = sample_resume()
+    lines = [resume["name"], f"{resume['email']} | {resume['phone']} | github.com/janedoe-{seed}", "Experience"]
+    for job in resume["experience"]:
+        lines.append(f"{job['job_title']} | {job['company']} | {job['start_date']} - {job['end_date']}")
+        lines += [f"- {item}" for item in job["responsibilities"]]
+    lines += ["Education"] + [f"{e['degree']}, {e['institution']}, {e['start_date']} - {e['end_date']}"
+                              for e in resume["education"]]
+    lines += ["Projects"] + [f"{p['project_name']}: {p['description'][:80]}" for p in resume["projects"]]
+    skills = random.Random(seed).sample(resume["skills"], 15)
+    lines += ["Skills", ", ".join(skills)]
+    return make_text_pdf([lines])
+
+
+def _png(width: int, height: int, rows: List[bytes]) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\x00" + row for row in rows)  # filter type 0 on every row
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+def make_layout_png(seed: int = 0, width: int = 620, height: int = 877) -> bytes:
+    """
+    A resume-layout screenshot as a PNG: a coloured header band, a sidebar and grey
+    bars for text lines. The accent colour and column split depend on `seed`.
+    """
+    rng = random.Random(seed)
+    white, text = (255, 255, 255), (90, 90, 90)
+    accent = tuple(rng.randrange(30, 200) for _ in range(3))
+    sidebar = rng.choice([0, width // 3])
+    header_height = height // 8
+
+    pixels = [[white] * width for _ in range(height)]
+    for y in range(header_height):
+        pixels[y] = [accent] * width
+    for y in range(header_height, height):
+        for x in range(sidebar):
+            pixels[y][x] = (235, 238, 242)
+    y = header_height + 20
+    while y < height - 20:
+        for column_start, column_end in ((10, sidebar - 10), (sidebar + 20, width - 20)):
+            if column_end - column_start < 40:
+                continue
+            line_end = column_start + rng.randrange((column_end - column_start) // 2, column_end - column_start)
+            for dy in range(6):
+                pixels[y + dy][column_start:line_end] = [text] * (line_end - column_start)
+        y += rng.choice([14, 14, 14, 28])
+
+    rows = [b"".join(struct.pack("BBB", *pixel) for pixel in row) for row in pixels]
+    return _png(width, height, rows)
+
+
+def fake_llm_recording() -> dict:
+    """
+    Canned replies for fake_llm.FakeChatModel.from_recording: a full extraction, every
+    per-section schema, a skills update and an HTML layout (also a valid template).
+    """
+    resume = sample_resume()
+    sections = ("education", "experience", "projects", "skills")
+    responses = {
+        "ResumeExtractionData": resume,
+        "ContactSection": {"name": resume["name"], "email": resume["email"], "phone": resume["phone"],
+                           "links": resume["other_info"]["links"]},
+        **{f"{name.capitalize()}Section": {name: resume[name]} for name in sections},
+        "SkillsUpdate": {"skills": resume["skills"][:12]},
+    }
+    reply = (
+        "<!DOCTYPE html><html><body style=\"font-family: sans-serif; margin: 1.5cm\">"
+        + "".join(f"<h2>Section {i}</h2><p>{'Lorem ipsum dolor sit amet. ' * 20}</p>" for i in range(6))
+        + "</body></html>"
+    )
+    return {"reply": reply, "responses": responses}
+
+
+SAMPLE_JOB_POSTS = [
+    "We are hiring a Backend Engineer (Python). You will build FastAPI services, design PostgreSQL "
+    "schemas, and run workloads on AWS with Docker and Kubernetes. Experience with Redis, Celery and "
+    "CI/CD pipelines is a plus. Strong communication skills and ownership mindset required.",
+    "Machine Learning Engineer: train and deploy NLP models with PyTorch and Hugging Face Transformers, "
+    "build retrieval-augmented generation pipelines with LangChain, and serve models behind REST APIs. "
+    "Familiarity with vector databases, MLOps and GCP Vertex AI preferred.",
+    "Frontend Developer: React, TypeScript, Next.js and Tailwind CSS. You will collaborate with designers "
+    "in Figma, write unit tests with Jest, and care about accessibility and web performance.",
+]
+
+
+def sample_resume(skill_count: int = 30) -> dict:
+    """
+    A realistic ResumeExtractionData-shaped dict for offline benchmarks.
+    """
+    skills = [
+        "Python", "FastAPI", "Django", "Flask", "SQL", "PostgreSQL", "MySQL", "SQLite", "Redis", "Docker",
+        "Kubernetes", "AWS", "GCP", "Git", "Linux", "REST APIs", "LangChain", "LangGraph", "PyTorch",
+        "TensorFlow", "scikit-learn", "Pandas", "NumPy", "NLP", "Hugging Face", "React", "JavaScript",
+        "HTML", "CSS", "Streamlit", "CI/CD", "Celery", "Machine Learning", "Data Analysis", "Communication",
+    ][:skill_count]
+    return {
+        "name": "Jane Doe",
+        "email": "jane.doe@example.com",
+        "phone": "+1 555 010 2030",
+        "education": [
+            {"degree": "B.Tech in Computer Engineering", "institution": "State Technical University",
+             "start_date": "2016", "end_date": "2020", "grade": "8.6 CGPA"},
+        ],
+        "projects": [
+            {"project_name": f"Project {i}",
+             "description": "Built an end-to-end service that ingests documents, extracts structured data "
+                            "with an LLM and exposes it through a REST API with caching and monitoring.",
+             "technologies": ["Python", "FastAPI", "PostgreSQL", "Docker"],
+             "link": f"https://github.com/janedoe/project-{i}"}
+            for i in range(4)
+        ],
+        "experience": [
+            {"job_title": "Software Engineer", "company": f"Company {i}", "location": "Remote",
+             "start_date": f"20{18 + i}", "end_date": f"20{19 + i}",
+             "responsibilities": [
+                 "Designed and shipped backend services handling millions of requests per day.",
+                 "Reduced p95 latency by 40% through query tuning and caching.",
+                 "Mentored junior engineers and led code reviews.",
+             ]}
+            for i in range(3)
+        ],
+        "skills": skills,
+        "other_info": {
+            "certifications": ["AWS Certified Developer"],
+            "languages": ["English", "Hindi"],
+            "achievements": ["Hackathon winner 2019"],
+            "links": {"linkedin": "https://linkedin.com/in/janedoe", "github": "https://github.com/janedoe",
+                      "portfolio": ""},
+        },
+    }
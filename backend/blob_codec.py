@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available
+    zstandard = None
+
+# ---------------- Config ----------------
+BLOB_CODEC = os.getenv("BLOB_CODEC", "zstd" if zstandard is not None else "zlib")
+# Smaller payloads are stored as plain JSON text; compression would not pay off
+BLOB_COMPRESS_MIN_BYTES = int(os.getenv("BLOB_COMPRESS_MIN_BYTES", "256"))
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "9"))
+
+CODECS = ("raw", "zlib", "zstd")
+
+
+def canonical_json(value) -> bytes:
+    """
+    Compact UTF-8 JSON for a dict/list or a JSON string. Values that are equal as JSON
+    but were serialized differently map to the same bytes, and so to the same hash.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        value = json.loads(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def encode_blob(raw: bytes, base: Optional[bytes] = None) -> Tuple[str, bytes]:
+    """
+    Compresses canonical JSON. `base` is an optional similar document (the resume a
+    customization was made from) used as a preset dictionary, so only the differences
+    cost space. Returns (codec, data); "raw" when compression does not help.
+    """
+    if len(raw) < BLOB_COMPRESS_MIN_BYTES or BLOB_CODEC == "raw":
+        return "raw", raw
+    if BLOB_CODEC == "zstd":
+        if zstandard is None:
+            raise RuntimeError("BLOB_CODEC=zstd requires the zstandard package")
+        dict_data = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT) if base else None
+        data = zstandard.ZstdCompressor(level=BLOB_COMPRESSION_LEVEL, dict_data=dict_data).compress(raw)
+    elif BLOB_CODEC == "zlib":
+        compressor = zlib.compressobj(BLOB_COMPRESSION_LEVEL, zdict=base) if base else zlib.compressobj(BLOB_COMPRESSION_LEVEL)
+        data = compressor.compress(raw) + compressor.flush()
+    else:
+        raise ValueError(f"Unknown BLOB_CODEC: {BLOB_CODEC}")
+    if len(data) >= len(raw):
+        return "raw", raw
+    return BLOB_CODEC, data
+
+
+def decode_blob(codec: str, data: bytes, base: Optional[bytes] = None) -> bytes:
+    if codec == "raw":
+        return data
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd blobs requires the zstandard package")
+        dict_data = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT) if base else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if codec == "zlib":
+        decompressor = zlib.decompressobj(zdict=base) if base else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    raise ValueError(f"Unknown blob codec: {codec}")
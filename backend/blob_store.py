@@ -0,0 +1,195 @@
+"""
+Deduplicated, compressed storage for resume and customization JSON.
+
+Documents are canonicalized, hashed and written once to json_blobs; rows point at
+them by hash. Customizations are compressed against their source resume, so a
+tailored copy only costs roughly the bytes that changed.
+
+Migrate rows written before json_blobs existed and print the space report:
+
+    python blob_store.py migrate --vacuum
+    python blob_store.py report
+"""
+import argparse
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from blob_codec import canonical_json, content_hash, encode_blob
+from database import SQLALCHEMY_DATABASE_URL, SessionLocal, engine, insert_or_ignore
+from migrations import upgrade_schema
+from models import JsonBlob, Resume, ResumeCustomization
+
+_MIGRATE_BATCH_SIZE = 200
+
+
+def put_json(db: Session, value, base_hash: Optional[str] = None) -> str:
+    """
+    Stores a JSON document (dict or JSON string) and returns its content hash.
+    Nothing is written when the same document is already stored. The caller commits.
+
+    Args:
+        db (Session): Database session.
+        value: The document, as a dict/list or JSON text.
+        base_hash (Optional[str]): Hash of a similar stored document to compress against.
+
+    Returns:
+        str: The content hash to store on the referencing row.
+    """
+    raw = canonical_json(value)
+    digest = content_hash(raw)
+    if db.get(JsonBlob, digest) is not None:
+        return digest
+
+    base = db.get(JsonBlob, base_hash) if base_hash else None
+    # Only one level of dictionaries, so reading a blob never chains
+    base_raw = base.raw_bytes if base is not None and base.base_hash is None else None
+    codec, data = encode_blob(raw, base_raw)
+    insert_or_ignore(db, JsonBlob, {
+        "content_hash": digest,
+        "codec": codec,
+        "data": data,
+        "raw_size": len(raw),
+        "stored_size": len(data),
+        "base_hash": base_hash if base_raw is not None and codec != "raw" else None,
+    }, ["content_hash"])
+    return digest
+
+
+def load_json_texts(db: Session, hashes: Iterable[str]) -> Dict[str, str]:
+    """Decodes many blobs with one query; returns {hash: JSON text}."""
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+    blobs = db.query(JsonBlob).filter(JsonBlob.content_hash.in_(hashes)).all()
+    return {blob.content_hash: blob.text for blob in blobs}
+
+
+def _legacy_size(value) -> int:
+    # What the JSON column held: the JSON string, encoded a second time
+    return len(json.dumps(value).encode("utf-8")) if value is not None else 0
+
+
+def migrate_legacy_rows(db: Session) -> dict:
+    """
+    Moves inline extracted_data / customized_data into json_blobs. Resumes go first so
+    customizations can be compressed against them. Safe to re-run.
+    """
+    stats = {"resumes": 0, "customizations": 0, "legacy_bytes": 0, "skipped": 0}
+
+    def migrate(model, data_attr, hash_attr, counter, base_for):
+        last_id = 0
+        while True:
+            rows = (
+                db.query(model)
+                .filter(getattr(model, hash_attr).is_(None), model.id > last_id)
+                .order_by(model.id)
+                .limit(_MIGRATE_BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                return
+            for row in rows:
+                last_id = row.id
+                value = getattr(row, data_attr)
+                if value is None:
+                    continue
+                try:
+                    digest = put_json(db, value, base_for(row))
+                except ValueError:
+                    # Not valid JSON; leave it inline
+                    stats["skipped"] += 1
+                    continue
+                stats["legacy_bytes"] += _legacy_size(value)
+                setattr(row, hash_attr, digest)
+                setattr(row, data_attr, None)
+                stats[counter] += 1
+            db.commit()
+
+    migrate(Resume, "extracted_data", "extracted_blob_hash", "resumes", lambda r: None)
+    migrate(ResumeCustomization, "customized_data", "customized_blob_hash", "customizations",
+            lambda c: c.resume.extracted_blob_hash if c.resume is not None else None)
+    return stats
+
+
+def storage_report(db: Session) -> dict:
+    """
+    Bytes the JSON documents would take inline (one copy per row) versus what json_blobs holds.
+    """
+    def logical_bytes(model, hash_column) -> int:
+        return int(
+            db.query(func.coalesce(func.sum(JsonBlob.raw_size), 0))
+            .select_from(model)
+            .join(JsonBlob, hash_column == JsonBlob.content_hash)
+            .scalar()
+        )
+
+    resume_logical = logical_bytes(Resume, Resume.extracted_blob_hash)
+    customization_logical = logical_bytes(ResumeCustomization, ResumeCustomization.customized_blob_hash)
+    blob_count, raw_total, stored_total = db.query(
+        func.count(JsonBlob.content_hash),
+        func.coalesce(func.sum(JsonBlob.raw_size), 0),
+        func.coalesce(func.sum(JsonBlob.stored_size), 0),
+    ).one()
+    legacy_rows = (
+        db.query(Resume).filter(Resume.extracted_blob_hash.is_(None), Resume.extracted_data.isnot(None)).count()
+        + db.query(ResumeCustomization).filter(ResumeCustomization.customized_blob_hash.is_(None)).count()
+    )
+
+    logical = resume_logical + customization_logical
+    return {
+        "blobs": blob_count,
+        "logical_bytes": logical,
+        "unique_bytes": int(raw_total),
+        "stored_bytes": int(stored_total),
+        "saved_bytes": logical - int(stored_total),
+        "ratio": round(logical / stored_total, 2) if stored_total else None,
+        "by_codec": {
+            codec: {"blobs": n, "stored_bytes": int(size)}
+            for codec, n, size in db.query(JsonBlob.codec, func.count(), func.sum(JsonBlob.stored_size))
+            .group_by(JsonBlob.codec)
+        },
+        "legacy_rows": legacy_rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate and report on JSON blob storage")
+    parser.add_argument("command", choices=["migrate", "report"])
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM a SQLite file after migrating")
+    args = parser.parse_args()
+
+    url = make_url(SQLALCHEMY_DATABASE_URL)
+    db_file = url.database if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") else None
+
+    def file_size():
+        if not db_file or not os.path.exists(db_file):
+            return None
+        # In WAL mode recent writes live in the -wal file until a checkpoint
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        return os.path.getsize(db_file)
+
+    upgrade_schema(engine)
+    size_before = file_size()
+    db = SessionLocal()
+    try:
+        if args.command == "migrate":
+            print("migrated:", json.dumps(migrate_legacy_rows(db)))
+        print("storage:", json.dumps(storage_report(db), indent=2))
+    finally:
+        db.close()
+
+    if args.command == "migrate" and args.vacuum and db_file:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+    if db_file:
+        print(f"{db_file}: {size_before} -> {file_size()} bytes")
+
+
+if __name__ == "__main__":
+    main()
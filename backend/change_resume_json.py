@@ -1,17 +1,25 @@
 from langchain_core.prompts import ChatPromptTemplate
+import hashlib
+import json
 import os
+from typing import List
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel, Field
 from resume_models import ResumeExtractionData
+from executors import limited
+from llm_clients import model_name, structured_model
+from tokens import TokenUsage
+from metrics import span
 
 # ---------------- Load env ----------------
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# "delta" sends only the skills and returns only the skills; "full" round-trips the whole resume
+CUSTOMIZE_MODE = os.getenv("CUSTOMIZE_MODE", "delta")
+if CUSTOMIZE_MODE not in ("delta", "full"):
+    raise ValueError(f"Invalid CUSTOMIZE_MODE: {CUSTOMIZE_MODE}")
 
-gemini_model = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash", api_key=GEMINI_API_KEY
-)
+CUSTOMIZE_MODEL_NAME = model_name()
 
 customize_prompt_template = ChatPromptTemplate.from_messages([
     (
@@ -24,10 +32,100 @@ customize_prompt_template = ChatPromptTemplate.from_messages([
     ("human", "Resume JSON:\n{resume_json}\n\nJob Post:\n{job_post}")
 ])
 
-def change_resume_json(resume_json: str, job_post: str) -> dict:
-    prompt = customize_prompt_template.invoke({
-        "resume_json": resume_json,
+skills_prompt_template = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """You are a resume customization assistant.
+        Rewrite the candidate's skills list for the provided job description:
+        keep skills relevant to the job first, drop irrelevant ones, and do not invent skills.
+        Return valid JSON only."""
+    ),
+    ("human", "Current skills:\n{skills_json}\n\nJob Post:\n{job_post}")
+])
+
+
+class SkillsUpdate(BaseModel):
+    skills: List[str] = Field(default_factory=list)
+
+
+customize_model = structured_model(ResumeExtractionData, include_raw=True)
+skills_model = structured_model(SkillsUpdate, include_raw=True)
+
+token_usage = TokenUsage("customize")
+
+
+def prompt_version(mode: str = None) -> str:
+    """
+    Identifies what an LLM customization was produced with. A stored customization is
+    only reused while the mode, prompt, output schema and model are all unchanged.
+    """
+    mode = mode or CUSTOMIZE_MODE
+    template, schema = (skills_prompt_template, SkillsUpdate) if mode == "delta" else \
+        (customize_prompt_template, ResumeExtractionData)
+    fingerprint = json.dumps([
+        mode,
+        CUSTOMIZE_MODEL_NAME,
+        [getattr(msg.prompt, "template", "") for msg in template.messages],
+        schema.model_json_schema(),
+    ], sort_keys=True)
+    return "llm:" + hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+CUSTOMIZE_PROMPT_VERSION = prompt_version()
+
+
+def _load_resume(resume_json) -> ResumeExtractionData:
+    if isinstance(resume_json, dict):
+        return ResumeExtractionData.model_validate(resume_json)
+    return ResumeExtractionData.model_validate_json(resume_json)
+
+
+def _parsed(mode: str, prompt, response: dict):
+    if response.get("parsed") is None:
+        raise ValueError(f"Model returned unparseable output: {response.get('parsing_error')}")
+    parsed = response["parsed"]
+    token_usage.record_message(mode, prompt.to_string(), parsed.model_dump_json(), response.get("raw"))
+    return parsed
+
+
+def _build_prompt(mode: str, resume: ResumeExtractionData, job_post: str):
+    if mode == "delta":
+        return skills_prompt_template.invoke({
+            "skills_json": json.dumps(resume.skills),
+            "job_post": job_post
+        })
+    if mode != "full":
+        raise ValueError(f"Unknown customization mode: {mode}")
+    return customize_prompt_template.invoke({
+        "resume_json": resume.model_dump_json(),
         "job_post": job_post
     })
-    response = gemini_model.with_structured_output(schema=ResumeExtractionData).invoke(prompt)
-    return response.model_dump_json()
\ No newline at end of file
+
+
+def _merge(mode: str, resume: ResumeExtractionData, parsed) -> str:
+    if mode == "delta":
+        # Only skills come back from the model; every other field stays exactly as stored
+        resume.skills = parsed.skills
+        return resume.model_dump_json()
+    return parsed.model_dump_json()
+
+
+def change_resume_json(resume_json: str, job_post: str, mode: str = None) -> dict:
+    mode = mode or CUSTOMIZE_MODE
+    resume = _load_resume(resume_json)
+    prompt = _build_prompt(mode, resume, job_post)
+    model = skills_model if mode == "delta" else customize_model
+    with span("llm_customize"):
+        response = model.invoke(prompt)
+    return _merge(mode, resume, _parsed(mode, prompt, response))
+
+
+async def achange_resume_json(resume_json: str, job_post: str, mode: str = None) -> str:
+    mode = mode or CUSTOMIZE_MODE
+    resume = _load_resume(resume_json)
+    prompt = _build_prompt(mode, resume, job_post)
+    model = skills_model if mode == "delta" else customize_model
+    async with limited("llm_customize"):
+        with span("llm_customize"):
+            response = await model.ainvoke(prompt)
+    return _merge(mode, resume, _parsed(mode, prompt, response))
@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+# ---------------- Config ----------------
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "4"))
+# Processes used to extract text from the pages of large PDFs in parallel
+PDF_PAGES_WORKERS = int(os.getenv("PDF_PAGES_WORKERS", str(os.cpu_count() or 2)))
+# Threads for the concurrent per-section LLM calls of synchronous hybrid extractions
+LLM_SECTION_WORKERS = int(os.getenv("LLM_SECTION_WORKERS", "8"))
+# Threads reserved for bcrypt so login bursts cannot take over the shared threadpool
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+# Threads that decode and re-encode layout images (Pillow releases the GIL while resizing)
+IMAGE_NORMALIZE_WORKERS = int(os.getenv("IMAGE_NORMALIZE_WORKERS", "2"))
+# WeasyPrint workers are owned by pdf_renderer.PdfRenderService
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+# "process" isolates WeasyPrint from the API process, "thread" keeps everything in-process
+PDF_RENDER_EXECUTOR = os.getenv("PDF_RENDER_EXECUTOR", "process")
+# How worker processes start. By the time a process pool starts, the API process already
+# runs threads (job workers, artifact eviction, thread pools), and a child forked from a
+# multi-threaded process can deadlock on a lock another thread held; "spawn" and
+# "forkserver" children start from a clean interpreter.
+PROCESS_START_METHOD = os.getenv("PROCESS_START_METHOD", "spawn")
+
+# Max in-flight work per pipeline stage; excess callers wait on the semaphore
+STAGE_LIMITS = {
+    "pdf_parse": int(os.getenv("PDF_PARSE_CONCURRENCY", str(PDF_PARSE_WORKERS))),
+    "pdf_render": int(os.getenv("PDF_RENDER_CONCURRENCY", str(PDF_RENDER_WORKERS))),
+    "llm_extract": int(os.getenv("LLM_EXTRACT_CONCURRENCY", "8")),
+    "llm_customize": int(os.getenv("LLM_CUSTOMIZE_CONCURRENCY", "8")),
+    "llm_render": int(os.getenv("LLM_RENDER_CONCURRENCY", "4")),
+    "bcrypt": BCRYPT_WORKERS,
+    "image_normalize": IMAGE_NORMALIZE_WORKERS,
+}
+
+_pools: dict[str, Executor] = {}
+# Semaphores bind to the event loop that first waits on them, so each loop gets its own
+# set (repeated asyncio.run calls in benchmarks and tests, worker threads running a loop)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores_lock = threading.Lock()
+
+
+def process_context():
+    return multiprocessing.get_context(PROCESS_START_METHOD)
+
+
+def get_pool(name: str) -> Executor:
+    """
+    Returns the shared executor for a blocking stage, creating it on first use.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        if name == "pdf_parse":
+            pool = ThreadPoolExecutor(max_workers=PDF_PARSE_WORKERS, thread_name_prefix="pdf-parse")
+        elif name == "bcrypt":
+            pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+        elif name == "image_normalize":
+            pool = ThreadPoolExecutor(max_workers=IMAGE_NORMALIZE_WORKERS, thread_name_prefix="image-normalize")
+        elif name == "llm_sections":
+            pool = ThreadPoolExecutor(max_workers=LLM_SECTION_WORKERS, thread_name_prefix="llm-sections")
+        elif name == "pdf_pages":
+            pool = ProcessPoolExecutor(max_workers=PDF_PAGES_WORKERS, mp_context=process_context())
+        else:
+            raise KeyError(f"Unknown executor pool: {name}")
+        _pools[name] = pool
+    return pool
+
+
+def stage_limit(stage: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphores = _semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(stage)
+        if semaphore is None:
+            semaphore = semaphores[stage] = asyncio.Semaphore(STAGE_LIMITS[stage])
+    return semaphore
+
+
+@asynccontextmanager
+async def limited(stage: str):
+    async with stage_limit(stage):
+        yield
+
+
+async def run_blocking(stage: str, fn, *args, **kwargs):
+    """
+    Runs a blocking function on the stage's pool without holding the event loop,
+    admitting at most STAGE_LIMITS[stage] calls at a time.
+    """
+    loop = asyncio.get_running_loop()
+    async with stage_limit(stage):
+        return await loop.run_in_executor(get_pool(stage), partial(fn, *args, **kwargs))
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
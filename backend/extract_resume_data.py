@@ -1,58 +1,245 @@
-from langgraph.graph import StateGraph, MessagesState
-from langgraph.constants import START, END
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.store.memory import InMemoryStore
-from langchain_google_genai import ChatGoogleGenerativeAI
-from pypdf import PdfReader
+from pdf_text import extract_text_from_pdf, TEXT_ENGINE_VERSION
 from resume_models import ResumeExtractionData
-from prompt import RESUME_EXTRACTOR_PROMPT
+from prompt import RESUME_EXTRACTOR_PROMPT, SECTION_EXTRACTOR_PROMPT
 from langchain_core.prompts import ChatPromptTemplate
+from extraction_cache import file_sha256, make_cache_key, get_cached_extraction, store_extraction
+from executors import get_pool, limited, run_blocking
+from llm_clients import model_name, structured_model
+from hybrid_extractor import HYBRID_VERSION, SECTION_SCHEMAS, merge_extraction, plan_extraction
+from text_compaction import CompactionResult, COMPACTION_VERSION, EXTRACT_TOKEN_BUDGET, compact_resume_text, compaction_stats
+from tokens import TokenUsage, estimate_tokens
+from metrics import observe_stage, span
 
     
 from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
 import os
+import time
+from typing import Optional
 
 # ---------------- Load env ----------------
 load_dotenv()
 
+# "hybrid": rules plus concurrent per-section LLM calls; "single": one whole-document call
+EXTRACT_MODE = os.getenv("EXTRACT_MODE", "hybrid")
+if EXTRACT_MODE not in ("hybrid", "single"):
+    raise ValueError(f"Invalid EXTRACT_MODE: {EXTRACT_MODE}")
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+EXTRACT_MODEL_NAME = model_name()
 
-gemini_model = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash", api_key=GEMINI_API_KEY
-)
+extraction_model = structured_model(ResumeExtractionData)
 
-extraction_model = gemini_model.with_structured_output(schema=ResumeExtractionData)
+prompt_template = ChatPromptTemplate.from_messages([
+    (
+        "system", RESUME_EXTRACTOR_PROMPT.strip()
+    ),
+    ("human", "Extract all possible information from the following resume text: {text}"),
+])
+
+# One small structured call per resume section the rules cannot handle
+section_models = {
+    group: structured_model(schema) for group, schema in SECTION_SCHEMAS.items()
+}
+
+section_prompt_template = ChatPromptTemplate.from_messages([
+    ("system", SECTION_EXTRACTOR_PROMPT.strip()),
+    ("human", "Extract the {section} section of a resume from the following text: {text}"),
+])
+
+
+def _short_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+# Any change to the prompt, the output schema or the model invalidates cached extractions
+PROMPT_VERSION = _short_hash(json.dumps(
+    [
+        [role, getattr(msg.prompt, "template", "")]
+        for template in (prompt_template, section_prompt_template)
+        for role, msg in zip(("system", "human"), template.messages)
+    ]
+    + [["text_engine", TEXT_ENGINE_VERSION], ["compaction", COMPACTION_VERSION, EXTRACT_TOKEN_BUDGET]]
+    + [["extract_mode", EXTRACT_MODE, HYBRID_VERSION]]
+))
+SCHEMA_VERSION = _short_hash(json.dumps(ResumeExtractionData.model_json_schema(), sort_keys=True))
+
+
+def extraction_cache_key(content_hash: str) -> str:
+    return make_cache_key(content_hash, PROMPT_VERSION, SCHEMA_VERSION, EXTRACT_MODEL_NAME)
+
+
+# Estimated tokens in and out of every extraction call, after compaction
+extraction_token_usage = TokenUsage("extract")
+
+
+def _compact(resume_text: str) -> CompactionResult:
+    with span("compaction"):
+        compacted = compact_resume_text(resume_text)
+    compaction_stats.record(compacted)
+    return compacted
+
+
+def _record_usage(label: str, prompt, extracted: str):
+    extraction_token_usage.record(label, estimate_tokens(prompt.to_string()), estimate_tokens(extracted))
+
+
+def _plan(text: str):
+    return plan_extraction(text) if EXTRACT_MODE == "hybrid" else None
+
+
+def _section_prompt(group: str, text: str):
+    return section_prompt_template.invoke({"section": group, "text": text})
+
+
+def _extract_section(group: str, text: str):
+    prompt = _section_prompt(group, text)
+    with span("llm_extract_section"):
+        result = section_models[group].invoke(prompt)
+    _record_usage(f"extract:{group}", prompt, result.model_dump_json())
+    return result
+
+
+def _extract_text(text: str) -> str:
+    plan = _plan(text)
+    if plan is None:
+        prompt = prompt_template.invoke({"text": text})
+        with span("llm_extract"):
+            extracted = extraction_model.invoke(prompt).model_dump_json()
+        _record_usage("extract", prompt, extracted)
+        return extracted
 
-def extract_text_from_pdf(file_path: str) -> str:
+    # All sections in flight at once: latency is that of the slowest section
+    pool = get_pool("llm_sections")
+    futures = {group: pool.submit(_extract_section, group, section) for group, section in plan.llm_sections.items()}
+    with span("llm_extract"):
+        results = {group: future.result() for group, future in futures.items()}
+    return merge_extraction(plan, results).model_dump_json()
+
+
+def _extract_data_uncached(file_path: str) -> str:
+    with span("pdf_text"):
+        resume_text = extract_text_from_pdf(file_path)
+    return _extract_text(_compact(resume_text).text)
+
+
+def extract_data_from_resume(file_path: str, content_hash: Optional[str] = None) -> dict:
     """
-    Extracts text from a PDF file.
-    
+    Extracts structured resume data from a PDF, reusing a cached result when the
+    same file content was already extracted with the current prompt, schema and model.
+
     Args:
         file_path (str): Path to the PDF file.
-        
+        content_hash (Optional[str]): SHA-256 of the file when already known (content-addressed uploads).
+
     Returns:
-        str: Extracted text from all pages.
+        str: ResumeExtractionData serialized as JSON.
     """
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""  # Some pages may return None
-        text += "\n"
-    return text.strip()
+    if content_hash is None:
+        with span("pdf_hash"):
+            content_hash = file_sha256(file_path)
+    cache_key = extraction_cache_key(content_hash)
+    with span("extraction_cache_lookup"):
+        cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
 
+    extracted = _extract_data_uncached(file_path)
+    with span("extraction_cache_store"):
+        store_extraction(cache_key, content_hash, extracted)
+    return extracted
 
-prompt_template = ChatPromptTemplate.from_messages([
-    (
-        "system", RESUME_EXTRACTOR_PROMPT.strip()
-    ),
-    ("human", "Extract all possible information from the following resume text: {text}"),
-])
 
-def extract_data_from_resume(file_path: str) -> dict:
-    resume_text = extract_text_from_pdf(file_path)
-    prompt = prompt_template.invoke({"text": resume_text})
-    response = extraction_model.invoke(prompt)
-    return response.model_dump_json()
+async def _aextract_section(group: str, text: str):
+    prompt = _section_prompt(group, text)
+    async with limited("llm_extract"):
+        with span("llm_extract_section"):
+            result = await section_models[group].ainvoke(prompt)
+    _record_usage(f"extract:{group}", prompt, result.model_dump_json())
+    return result
 
 
+async def _astream_text(text: str):
+    """
+    Yields ("section", ...) as each per-section call finishes, then ("extracted", JSON text).
+    """
+    plan = _plan(text)
+    if plan is None:
+        prompt = prompt_template.invoke({"text": text})
+        async with limited("llm_extract"):
+            with span("llm_extract"):
+                response = await extraction_model.ainvoke(prompt)
+        extracted = response.model_dump_json()
+        _record_usage("extract", prompt, extracted)
+        yield "extracted", extracted
+        return
+
+    async def named(group: str, section: str):
+        return group, await _aextract_section(group, section)
+
+    yield "rules", {"sections": list(plan.llm_sections), "data": plan.data.model_dump()}
+    # All sections in flight at once: latency is that of the slowest section
+    tasks = [asyncio.ensure_future(named(group, section)) for group, section in plan.llm_sections.items()]
+    results = {}
+    started = time.perf_counter()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            group, result = await next_done
+            finished = time.perf_counter()
+            results[group] = result
+            yield "section", {"section": group, "data": result.model_dump()}
+        # Not a span(): the consumer's time between yields would be counted too
+        observe_stage("llm_extract", finished - started if results else 0.0)
+    finally:
+        # The client went away or a section failed: stop paying for the rest
+        for task in tasks:
+            task.cancel()
+    yield "extracted", merge_extraction(plan, results).model_dump_json()
+
+
+async def _aextract_text(text: str) -> str:
+    async for event, data in _astream_text(text):
+        if event == "extracted":
+            return data
+
+
+async def astream_extract_data_from_resume(file_path: str, content_hash: Optional[str] = None):
+    """
+    Progress of an extraction as (event, data) pairs: "parsed" once the PDF text is
+    compacted, "rules" and one "section" per LLM call in hybrid mode, and finally
+    "extracted" with the ResumeExtractionData JSON. Cache hits go straight to "extracted".
+    """
+    if content_hash is None:
+        with span("pdf_hash"):
+            content_hash = await run_blocking("pdf_parse", file_sha256, file_path)
+    cache_key = extraction_cache_key(content_hash)
+    with span("extraction_cache_lookup"):
+        cached = await asyncio.to_thread(get_cached_extraction, cache_key)
+    if cached is not None:
+        yield "extracted", {"extracted_data": cached, "cached": True}
+        return
+
+    with span("pdf_text"):
+        resume_text = await run_blocking("pdf_parse", extract_text_from_pdf, file_path)
+    compacted = _compact(resume_text)
+    yield "parsed", {"chars": len(resume_text), "raw_tokens": compacted.raw_tokens, "tokens": compacted.tokens}
+
+    async for event, data in _astream_text(compacted.text):
+        if event != "extracted":
+            yield event, data
+            continue
+        with span("extraction_cache_store"):
+            await asyncio.to_thread(store_extraction, cache_key, content_hash, data)
+        yield "extracted", {"extracted_data": data, "cached": False}
+
+
+async def aextract_data_from_resume(file_path: str, content_hash: Optional[str] = None) -> str:
+    """
+    Async variant of extract_data_from_resume. PDF hashing and parsing run on
+    the bounded pdf_parse pool and the model is called with ainvoke, so the
+    event loop stays free while an extraction is in flight.
+    """
+    async for event, data in astream_extract_data_from_resume(file_path, content_hash):
+        if event == "extracted":
+            return data["extracted_data"]
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, update
+from database import SessionLocal, insert_or_ignore
+from models import ExtractionCacheEntry
+from metrics import record_cache
+
+# ---------------- Config ----------------
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "1") == "1"
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+EXTRACTION_CACHE_MAX_AGE_DAYS = float(os.getenv("EXTRACTION_CACHE_MAX_AGE_DAYS", "30"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _bump(counter: str, n: int = 1):
+    with _stats_lock:
+        _stats[counter] += n
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Returns the hex sha256 of a file's content, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash: str, prompt_version: str, schema_version: str, model_name: str) -> str:
+    raw = "\0".join([content_hash, prompt_version, schema_version, model_name])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _expiry_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=EXTRACTION_CACHE_MAX_AGE_DAYS)
+
+
+def get_cached_extraction(cache_key: str) -> Optional[str]:
+    """
+    Returns the cached extraction JSON for `cache_key`, or None on a miss.
+    Entries older than EXTRACTION_CACHE_MAX_AGE_DAYS count as misses.
+    """
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+
+    db = SessionLocal()
+    try:
+        entry = db.get(ExtractionCacheEntry, cache_key)
+        if entry is None or entry.created_at < _expiry_cutoff():
+            _bump("misses")
+            record_cache("extraction", False)
+            return None
+        entry.hit_count += 1
+        entry.last_accessed_at = datetime.utcnow()
+        db.commit()
+        _bump("hits")
+        record_cache("extraction", True)
+        return entry.extracted_data
+    finally:
+        db.close()
+
+
+def store_extraction(cache_key: str, content_hash: str, extracted_data: str):
+    if not EXTRACTION_CACHE_ENABLED:
+        return
+
+    db = SessionLocal()
+    try:
+        values = {
+            "extracted_data": extracted_data,
+            "size_bytes": len(extracted_data.encode("utf-8")),
+            "created_at": datetime.utcnow(),
+        }
+        values["last_accessed_at"] = values["created_at"]
+        # Concurrent extractions of the same file both get here; neither may fail on the key
+        insert_or_ignore(db, ExtractionCacheEntry, {"cache_key": cache_key, "content_hash": content_hash, **values},
+                         ["cache_key"])
+        db.execute(update(ExtractionCacheEntry).where(ExtractionCacheEntry.cache_key == cache_key).values(**values))
+        db.commit()
+        _evict(db)
+    finally:
+        db.close()
+
+
+def _evict(db):
+    """
+    Drops expired entries, then least recently used entries until the
+    cache fits in both EXTRACTION_CACHE_MAX_ENTRIES and EXTRACTION_CACHE_MAX_BYTES.
+    """
+    evicted = (
+        db.query(ExtractionCacheEntry)
+        .filter(ExtractionCacheEntry.created_at < _expiry_cutoff())
+        .delete(synchronize_session=False)
+    )
+
+    count, total_bytes = db.query(
+        func.count(ExtractionCacheEntry.cache_key),
+        func.coalesce(func.sum(ExtractionCacheEntry.size_bytes), 0),
+    ).one()
+
+    if count > EXTRACTION_CACHE_MAX_ENTRIES or total_bytes > EXTRACTION_CACHE_MAX_BYTES:
+        rows = (
+            db.query(ExtractionCacheEntry.cache_key, ExtractionCacheEntry.size_bytes)
+            .order_by(ExtractionCacheEntry.last_accessed_at.asc())
+            .all()
+        )
+        stale_keys = []
+        for key, size in rows:
+            if count <= EXTRACTION_CACHE_MAX_ENTRIES and total_bytes <= EXTRACTION_CACHE_MAX_BYTES:
+                break
+            stale_keys.append(key)
+            count -= 1
+            total_bytes -= size or 0
+        if stale_keys:
+            evicted += (
+                db.query(ExtractionCacheEntry)
+                .filter(ExtractionCacheEntry.cache_key.in_(stale_keys))
+                .delete(synchronize_session=False)
+            )
+
+    db.commit()
+    if evicted:
+        _bump("evictions", evicted)
+
+
+def cache_stats() -> dict:
+    db = SessionLocal()
+    try:
+        entries, total_bytes = db.query(
+            func.count(ExtractionCacheEntry.cache_key),
+            func.coalesce(func.sum(ExtractionCacheEntry.size_bytes), 0),
+        ).one()
+    finally:
+        db.close()
+
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["entries"] = entries
+    stats["size_bytes"] = total_bytes
+    return stats
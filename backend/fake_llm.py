@@ -0,0 +1,118 @@
+"""
+Offline chat model for tests, benchmarks and local development (LLM_PROVIDER=fake).
+
+Replies are canned: plain calls return `reply`, structured calls return the schema
+filled from `responses[schema.__name__]` (schema defaults when missing). Both can
+be loaded from a recording file (FAKE_LLM_RECORDING). Latency, streaming and
+transient failures can be simulated; token usage is estimated.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from tokens import estimate_tokens
+
+_STREAM_CHUNK_CHARS = 80
+
+
+class FakeProviderError(ConnectionError):
+    """Simulated transient provider failure (retried and counted by the circuit breaker)."""
+
+
+class FakeChatModel(BaseChatModel):
+    reply: str = "<!DOCTYPE html><html><body><p>Fake LLM reply</p></body></html>"
+    # Schema class name -> JSON-compatible value returned by structured calls
+    responses: Dict[str, Any] = {}
+    latency_s: float = 0.0
+    # The first `fail_first` calls raise FakeProviderError
+    fail_first: int = 0
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _next_call_fails(self) -> bool:
+        with self._lock:
+            self._calls += 1
+            return self._calls <= self.fail_first
+
+    def _reply(self, schema_name: Optional[str]) -> str:
+        if schema_name is None:
+            return self.reply
+        return json.dumps(self.responses.get(schema_name, {}))
+
+    def _message(self, messages: List[BaseMessage], schema_name: Optional[str]) -> AIMessage:
+        text = self._reply(schema_name)
+        prompt = "\n".join(str(m.content) for m in messages)
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return AIMessage(content=text, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None,
+                  fake_schema: Optional[str] = None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_s)
+        if self._next_call_fails():
+            raise FakeProviderError("Simulated provider failure")
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, fake_schema))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None,
+                         fake_schema: Optional[str] = None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_s)
+        if self._next_call_fails():
+            raise FakeProviderError("Simulated provider failure")
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, fake_schema))])
+
+    def _chunks(self, text: str) -> List[ChatGenerationChunk]:
+        return [
+            ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + _STREAM_CHUNK_CHARS]))
+            for i in range(0, len(text), _STREAM_CHUNK_CHARS)
+        ]
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None,
+                fake_schema: Optional[str] = None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        if self._next_call_fails():
+            raise FakeProviderError("Simulated provider failure")
+        chunks = self._chunks(self._reply(fake_schema))
+        for chunk in chunks:
+            time.sleep(self.latency_s / max(len(chunks), 1))
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None,
+                       fake_schema: Optional[str] = None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        if self._next_call_fails():
+            raise FakeProviderError("Simulated provider failure")
+        chunks = self._chunks(self._reply(fake_schema))
+        for chunk in chunks:
+            await asyncio.sleep(self.latency_s / max(len(chunks), 1))
+            yield chunk
+
+    @classmethod
+    def from_recording(cls, path: str, **kwargs) -> "FakeChatModel":
+        """
+        Loads canned replies from a JSON file: {"reply": "...", "responses": {"SchemaName": {...}}}.
+        """
+        with open(path, encoding="utf-8") as f:
+            recording = json.load(f)
+        return cls(reply=recording.get("reply", cls.model_fields["reply"].default),
+                   responses=recording.get("responses", {}), **kwargs)
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        def parse(message: AIMessage):
+            parsed = schema.model_validate_json(message.content)
+            return {"raw": message, "parsed": parsed, "parsing_error": None} if include_raw else parsed
+
+        return self.bind(fake_schema=schema.__name__) | RunnableLambda(parse)
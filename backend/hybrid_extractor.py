@@ -0,0 +1,239 @@
+"""
+Rule-based half of the hybrid resume extractor.
+
+Contact details and links are pulled out with regexes, list-like sections
+(skills, certifications, achievements, languages) are split line by line, and
+only the sections that need understanding (education, experience, projects,
+and anything the rules could not handle) are left for small per-section LLM
+calls, which extract_resume_data runs concurrently and merges back here.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from resume_models import EducationEntry, ExperienceEntry, Links, ProjectEntry, ResumeExtractionData
+from text_compaction import split_sections
+
+# Bump when the rules or the section split change, so cached extractions are invalidated
+HYBRID_VERSION = "2"
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_LINKEDIN = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/[^\s|,;]+", re.IGNORECASE)
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+", re.IGNORECASE)
+_URL = re.compile(
+    r"https?://[^\s|,;]+|www\.[^\s|,;]+|\b[\w-]+(?:\.[\w-]+)*\.(?:dev|io|me|site|app|com|net|org)(?:/[^\s|,;]*)?",
+    re.IGNORECASE,
+)
+# "Email:", "Phone -", "LinkedIn:" and similar labels in front of contact values
+_LABEL = re.compile(r"\b(e-?mail|phone|mobile|tel|linkedin|github|portfolio|website)\s*[:\-]\s*", re.IGNORECASE)
+_NAME = re.compile(r"^[^\W\d_][^\W\d_.'\- ]*(?:[ .'\-]+[^\W\d_][^\W\d_.'\-]*){1,4}\.?$")
+_LIST_SPLIT = re.compile(r"\s*[,;|•]\s*")
+_CATEGORY = re.compile(r"^[\w /&+#.-]{1,30}:\s+")
+_PHONE_MIN_DIGITS, _PHONE_MAX_DIGITS = 10, 15
+# Longer "skills" look like sentences, which the rules cannot split reliably
+_MAX_SKILL_CHARS = 40
+
+# Resume headings (as recognized by text_compaction) -> field group
+SECTION_GROUPS = {
+    "experience": "experience", "work experience": "experience",
+    "professional experience": "experience", "employment": "experience",
+    "education": "education",
+    "projects": "projects", "personal projects": "projects",
+    "skills": "skills", "technical skills": "skills",
+    "certifications": "certifications", "certificates": "certifications", "licenses": "certifications",
+    "achievements": "achievements", "awards": "achievements", "honors": "achievements",
+    "languages": "languages",
+}
+# Headings no extracted field holds; their text is left out in either mode
+IGNORED_SECTIONS = {"summary", "profile", "objective", "about", "interests", "hobbies", "references"}
+# A short line that names a section text_compaction does not know ("Work History",
+# "Relevant Experience"); its text would be merged into the section before it
+_HEADING_SHAPE = re.compile(r"^[^\W\d_][^\W\d_ &/-]*(?:[ &/-]+[^\W\d_][^\W\d_&/-]*){0,2}:?$")
+_HEADING_WORDS = {
+    "experience", "employment", "work", "career", "history", "internships", "positions",
+    "education", "academic", "qualifications", "training", "courses", "coursework",
+    "projects", "skills", "competencies", "expertise", "certifications", "awards",
+    "publications", "volunteering", "volunteer", "activities", "leadership",
+}
+
+
+class ContactSection(BaseModel):
+    name: Optional[str] = ""
+    email: Optional[str] = ""
+    phone: Optional[str] = ""
+    links: Links = Field(default_factory=Links)
+
+
+class EducationSection(BaseModel):
+    education: List[EducationEntry] = Field(default_factory=list)
+
+
+class ExperienceSection(BaseModel):
+    experience: List[ExperienceEntry] = Field(default_factory=list)
+
+
+class ProjectsSection(BaseModel):
+    projects: List[ProjectEntry] = Field(default_factory=list)
+
+
+class SkillsSection(BaseModel):
+    skills: List[str] = Field(default_factory=list)
+
+
+# Output schema of the LLM call for each group that can need one
+SECTION_SCHEMAS = {
+    "contact": ContactSection,
+    "education": EducationSection,
+    "experience": ExperienceSection,
+    "projects": ProjectsSection,
+    "skills": SkillsSection,
+}
+
+
+@dataclass
+class ExtractionPlan:
+    # Fields already filled in by the rules
+    data: ResumeExtractionData
+    # Group -> section text still to be sent to the LLM
+    llm_sections: Dict[str, str] = field(default_factory=dict)
+
+
+def _first(pattern: re.Pattern, text: str) -> str:
+    match = pattern.search(text)
+    return match.group(0).rstrip(".") if match else ""
+
+
+def _find_phone(text: str) -> str:
+    for match in _PHONE.finditer(text):
+        digits = sum(c.isdigit() for c in match.group(0))
+        if _PHONE_MIN_DIGITS <= digits <= _PHONE_MAX_DIGITS:
+            return match.group(0).strip()
+    return ""
+
+
+def _find_name(header: str) -> str:
+    for line in header.split("\n"):
+        # The name usually shares its line with contact details: "Jane Doe | jane@x.com"
+        candidate = re.split(r"\s+[|·•]\s+|\s{2,}|\s+-\s+", line.strip())[0]
+        candidate = _LABEL.split(candidate)[0].strip()
+        if _NAME.match(candidate) and not _EMAIL.search(candidate):
+            return candidate
+        if line.strip():
+            return ""
+    return ""
+
+
+def parse_contact(header: str, text: str) -> ContactSection:
+    """
+    Name, email, phone and links from the text above the first section heading;
+    links fall back to the whole resume.
+    """
+    linkedin = _first(_LINKEDIN, header) or _first(_LINKEDIN, text)
+    github = _first(_GITHUB, header) or _first(_GITHUB, text)
+    rest = _GITHUB.sub(" ", _LINKEDIN.sub(" ", _EMAIL.sub(" ", header)))
+    return ContactSection(
+        name=_find_name(header),
+        email=_first(_EMAIL, header) or _first(_EMAIL, text),
+        phone=_find_phone(header),
+        links=Links(linkedin=linkedin, github=github, portfolio=_first(_URL, rest)),
+    )
+
+
+def _list_items(text: str, split_commas: bool) -> List[str]:
+    items = []
+    for line in text.split("\n"):
+        line = re.sub(r"^-\s+", "", line.strip())
+        if not line or line.startswith("[") and line.endswith("omitted]"):
+            continue
+        if split_commas:
+            line = _CATEGORY.sub("", line)
+            items += [item.strip(" .") for item in _LIST_SPLIT.split(line) if item.strip(" .")]
+        else:
+            items.append(line)
+    return list(dict.fromkeys(items))
+
+
+def _is_unknown_heading(line: str) -> bool:
+    line = line.strip()
+    if not _HEADING_SHAPE.match(line):
+        return False
+    words = set(re.split(r"[ &/-]+", line.rstrip(":").lower()))
+    return bool(words & _HEADING_WORDS)
+
+
+def _has_unplaced_text(sections: List[Tuple[str, List[str]]]) -> bool:
+    """True when some text would reach no group, or the wrong one."""
+    for name, lines in sections:
+        if name == "header":
+            body = lines
+        elif name in SECTION_GROUPS or name in IGNORED_SECTIONS:
+            body = lines[1:]
+        else:
+            return True
+        if any(_is_unknown_heading(line) for line in body):
+            return True
+    return False
+
+
+def plan_extraction(text: str) -> Optional[ExtractionPlan]:
+    """
+    Fills what the rules can and lists the sections left for the LLM. Returns None when
+    no known section heading is found, or when some text falls outside the known groups
+    (an unrecognized heading, or a section like publications the groups do not cover),
+    so the caller falls back to one whole-document call.
+    """
+    sections = split_sections(text)
+    if _has_unplaced_text(sections):
+        return None
+    header = "\n".join("\n".join(lines) for name, lines in sections if name == "header")
+    grouped: Dict[str, List[str]] = {}
+    for name, lines in sections:
+        group = SECTION_GROUPS.get(name)
+        if group is not None:
+            # Drop the heading line; repeated headings are concatenated
+            grouped.setdefault(group, []).append("\n".join(lines[1:]).strip())
+    if not grouped.keys() & {"experience", "education", "projects", "skills"}:
+        return None
+    bodies = {group: "\n".join(parts).strip() for group, parts in grouped.items()}
+
+    contact = parse_contact(header, text)
+    data = ResumeExtractionData(name=contact.name, email=contact.email, phone=contact.phone)
+    data.other_info.links = contact.links
+    plan = ExtractionPlan(data=data)
+    if not contact.name:
+        plan.llm_sections["contact"] = header
+
+    for group in ("education", "experience", "projects"):
+        if bodies.get(group):
+            plan.llm_sections[group] = bodies[group]
+    if bodies.get("skills"):
+        skills = _list_items(bodies["skills"], split_commas=True)
+        if any(len(skill) > _MAX_SKILL_CHARS for skill in skills):
+            plan.llm_sections["skills"] = bodies["skills"]
+        else:
+            data.skills = skills
+    data.other_info.certifications = _list_items(bodies.get("certifications", ""), split_commas=False)
+    data.other_info.achievements = _list_items(bodies.get("achievements", ""), split_commas=False)
+    data.other_info.languages = _list_items(bodies.get("languages", ""), split_commas=True)
+    return plan
+
+
+def merge_extraction(plan: ExtractionPlan, results: Dict[str, BaseModel]) -> ResumeExtractionData:
+    """Copies the per-section LLM results into the rule-based data; rule values win for contact fields."""
+    data = plan.data.model_copy(deep=True)
+    contact = results.get("contact")
+    if contact is not None:
+        data.name = data.name or contact.name or ""
+        data.email = data.email or contact.email or ""
+        data.phone = data.phone or contact.phone or ""
+        links = data.other_info.links
+        for key in ("linkedin", "github", "portfolio"):
+            if not getattr(links, key):
+                setattr(links, key, getattr(contact.links, key) or "")
+    for group in ("education", "experience", "projects", "skills"):
+        if group in results:
+            setattr(data, group, getattr(results[group], group))
+    return data
@@ -0,0 +1,258 @@
+"""
+Shrinks layout images before they are sent inline to the vision model.
+
+A 12 MP phone photo, base64-encoded, is megabytes of request payload and thousands
+of image tokens, while the model only needs the layout. Images are turned upright
+from their EXIF orientation, downscaled to IMAGE_MAX_SIDE pixels on the long side,
+optionally made grayscale, and re-encoded as IMAGE_FORMAT with all metadata dropped.
+Results are cached in memory by source hash, so re-rendering the same layout image
+skips the work. Files Pillow cannot read, and small images a re-encode would only
+make bigger, are passed through unchanged.
+"""
+import hashlib
+import io
+import logging
+import math
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from executors import run_blocking
+from metrics import record_cache, span
+
+logger = logging.getLogger(__name__)
+
+# ---------------- Config ----------------
+IMAGE_NORMALIZE_ENABLED = os.getenv("IMAGE_NORMALIZE_ENABLED", "1") == "1"
+# Longest side in pixels after downscaling; layouts stay legible well below phone-camera sizes
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1600"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "webp")  # "webp", "jpeg" or "png"
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "0") == "1"
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Larger images are refused instead of decoded (decompression bombs)
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(60_000_000)))
+
+# Pillow format name and MIME type of each output format
+_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg"), "png": ("PNG", "image/png")}
+if IMAGE_FORMAT not in _FORMATS:
+    raise ValueError(f"Invalid IMAGE_FORMAT: {IMAGE_FORMAT}")
+
+# Encoder effort: WebP method 2 is within a few percent of the default size at under half the
+# time, and PNG optimize=True costs seconds on a camera-sized image for little gain
+_SAVE_OPTIONS = {
+    "WEBP": {"quality": IMAGE_QUALITY, "method": 2},
+    "JPEG": {"quality": IMAGE_QUALITY},
+    "PNG": {},
+}
+
+# Different settings send the model a different image, so this is part of downstream cache keys
+NORMALIZE_VERSION = (
+    f"1:{IMAGE_FORMAT}:{IMAGE_MAX_SIDE}:{IMAGE_QUALITY}:{'gray' if IMAGE_GRAYSCALE else 'color'}"
+    if IMAGE_NORMALIZE_ENABLED else "off"
+)
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class NormalizedImage:
+    data: bytes
+    mime: str
+    source_sha256: str
+    source_size: int
+    # False when the image is sent as uploaded (disabled, unreadable or already small)
+    normalized: bool
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+class _ImageCache:
+    """LRU cache of normalized images keyed by source sha256, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, NormalizedImage] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[NormalizedImage]:
+        with self._lock:
+            image = self._items.get(key)
+            if image is not None:
+                self._items.move_to_end(key)
+            return image
+
+    def put(self, key: str, image: NormalizedImage):
+        if len(image.data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = image
+            self._size += len(image.data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted.data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "size_bytes": self._size}
+
+
+class NormalizeStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"normalized": 0, "passthrough": 0, "cache_hits": 0, "source_bytes": 0, "output_bytes": 0}
+        self._seconds = 0.0
+
+    def record(self, image: NormalizedImage, seconds: float = 0.0, cache_hit: bool = False):
+        with self._lock:
+            self._counters["cache_hits" if cache_hit else "normalized" if image.normalized else "passthrough"] += 1
+            self._counters["source_bytes"] += image.source_size
+            self._counters["output_bytes"] += len(image.data)
+            self._seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            seconds = self._seconds
+        source = counters["source_bytes"]
+        return {
+            "settings": NORMALIZE_VERSION,
+            **counters,
+            "payload_reduction": round(1 - counters["output_bytes"] / source, 4) if source else 0.0,
+            "avg_normalize_ms": round(seconds / counters["normalized"] * 1000, 2) if counters["normalized"] else 0.0,
+            "cache": _cache.stats(),
+        }
+
+
+_cache = _ImageCache(IMAGE_CACHE_MAX_BYTES)
+image_stats = NormalizeStats()
+
+
+def _passthrough(image_bytes: bytes, filename: str, source_sha256: str) -> NormalizedImage:
+    mime, _ = mimetypes.guess_type(filename or "")
+    return NormalizedImage(
+        data=image_bytes, mime=mime or "image/png", source_sha256=source_sha256,
+        source_size=len(image_bytes), normalized=False,
+    )
+
+
+def _reencode(image_bytes: bytes) -> Tuple[bytes, int, int, bool]:
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        source = Image.open(io.BytesIO(image_bytes))
+    except Image.DecompressionBombError as e:
+        # Not an OSError, so it would otherwise end up as a failed render
+        raise ImageTooLargeError(str(e)) from e
+    with source:
+        source_size = source.size
+        # Pillow only refuses at twice MAX_IMAGE_PIXELS and warns in between
+        if source.width * source.height > IMAGE_MAX_PIXELS:
+            raise ImageTooLargeError(
+                f"Image is {source.width}x{source.height} pixels; the limit is {IMAGE_MAX_PIXELS} pixels"
+            )
+        scale = IMAGE_MAX_SIDE / max(source.size)
+        if scale < 1:
+            # JPEG only: decode at 1/2, 1/4 or 1/8 scale when that still covers the target size
+            source.draft(None, (math.ceil(source.width * scale), math.ceil(source.height * scale)))
+        image = ImageOps.exif_transpose(source)
+        if IMAGE_GRAYSCALE:
+            image = image.convert("L")
+        elif image.mode not in ("RGB", "L"):
+            # Flatten transparency onto white; every output format then takes the image as is
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, "white")
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        image.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE), Image.Resampling.LANCZOS)
+
+        pil_format, _ = _FORMATS[IMAGE_FORMAT]
+        out = io.BytesIO()
+        # No exif= or icc_profile= arguments: the output carries no metadata
+        image.save(out, pil_format, **_SAVE_OPTIONS[pil_format])
+        resized = image.size != source_size and image.size != source_size[::-1]
+        return out.getvalue(), image.width, image.height, resized
+
+
+def _cache_key(source_sha256: str) -> str:
+    return f"{source_sha256}:{NORMALIZE_VERSION}"
+
+
+def _cached(source_sha256: str) -> Optional[NormalizedImage]:
+    image = _cache.get(_cache_key(source_sha256))
+    record_cache("image", image is not None)
+    if image is not None:
+        image_stats.record(image, cache_hit=True)
+    return image
+
+
+def _normalize_uncached(image_bytes: bytes, filename: str, source_sha256: str) -> NormalizedImage:
+    start = time.perf_counter()
+    try:
+        data, width, height, resized = _reencode(image_bytes)
+    except OSError as e:
+        # Not an image Pillow can read; the model may still accept it as uploaded
+        logger.warning("Sending %s unnormalized: %s", filename, e)
+        image = _passthrough(image_bytes, filename, source_sha256)
+        image_stats.record(image)
+        return image
+    if not resized and len(data) >= len(image_bytes):
+        # Already small (a flat screenshot): re-encoding would only make the payload bigger
+        image = _passthrough(image_bytes, filename, source_sha256)
+        image.width, image.height = width, height
+        image_stats.record(image, time.perf_counter() - start)
+        _cache.put(_cache_key(source_sha256), image)
+        return image
+
+    image = NormalizedImage(
+        data=data, mime=_FORMATS[IMAGE_FORMAT][1], source_sha256=source_sha256,
+        source_size=len(image_bytes), normalized=True, width=width, height=height,
+    )
+    image_stats.record(image, time.perf_counter() - start)
+    _cache.put(_cache_key(source_sha256), image)
+    return image
+
+
+def normalize_image(image_bytes: bytes, filename: str, source_sha256: Optional[str] = None) -> NormalizedImage:
+    """
+    Returns the image to send to the vision model: downscaled, re-encoded and
+    stripped of metadata, or as uploaded when normalization is off or impossible.
+    Raises ImageTooLargeError for images over IMAGE_MAX_PIXELS.
+
+    Args:
+        image_bytes (bytes): The uploaded image.
+        filename (str): Upload file name, for the MIME type of passed-through images.
+        source_sha256 (Optional[str]): sha256 of image_bytes when the caller already has it.
+
+    Returns:
+        NormalizedImage: Bytes, MIME type and the hash of the source image.
+    """
+    source_sha256 = source_sha256 or hashlib.sha256(image_bytes).hexdigest()
+    if not IMAGE_NORMALIZE_ENABLED:
+        return _passthrough(image_bytes, filename, source_sha256)
+    cached = _cached(source_sha256)
+    if cached is not None:
+        return cached
+    with span("image_normalize"):
+        return _normalize_uncached(image_bytes, filename, source_sha256)
+
+
+async def anormalize_image(image_bytes: bytes, filename: str, source_sha256: Optional[str] = None) -> NormalizedImage:
+    """Async variant of normalize_image; decoding and re-encoding run on the image_normalize pool."""
+    source_sha256 = source_sha256 or hashlib.sha256(image_bytes).hexdigest()
+    if not IMAGE_NORMALIZE_ENABLED:
+        return _passthrough(image_bytes, filename, source_sha256)
+    cached = _cached(source_sha256)
+    if cached is not None:
+        return cached
+    with span("image_normalize"):
+        return await run_blocking("image_normalize", _normalize_uncached, image_bytes, filename, source_sha256)
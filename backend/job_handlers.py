@@ -0,0 +1,83 @@
+import os
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from jobs import PENDING_STATUSES, job_handler
+from models import Job, User
+from extract_resume_data import extract_data_from_resume
+from vision_renderer import render_html_from_image_and_json, render_html_from_template
+from pdf_renderer import render_pdf
+from resume_service import save_resume, customize_latest_resume, save_pdf
+
+
+def _get_user_id(db: Session, user_id: int) -> int:
+    if db.get(User, user_id) is None:
+        raise ValueError("User not found")
+    return user_id
+
+
+@job_handler("upload_resume")
+def handle_upload_resume(db: Session, payload: dict) -> dict:
+    user_id = _get_user_id(db, payload["user_id"])
+    extracted = extract_data_from_resume(payload["file_path"], payload.get("content_hash"))
+    resume = save_resume(db, user_id, payload["filename"], extracted)
+    return {"resume_id": resume.id, "extracted_data": extracted}
+
+
+@job_handler("customize_resume")
+def handle_customize_resume(db: Session, payload: dict) -> dict:
+    user_id = _get_user_id(db, payload["user_id"])
+    customization, used_mode, reused = customize_latest_resume(
+        db, user_id, payload["job_post"], payload.get("mode", "llm"), payload.get("warm_start", False)
+    )
+    return {
+        "customized_resume": customization.customized_json,
+        "customization_id": customization.id,
+        "mode": used_mode,
+        "reused": reused,
+    }
+
+
+def _remove_layout_image(payload: dict):
+    # Images are content-addressed: another pending job may have uploaded the same one
+    db = SessionLocal()
+    try:
+        pending = (
+            db.query(Job.payload)
+            .filter(Job.kind == "render_resume_from_image", Job.status.in_(PENDING_STATUSES))
+            .all()
+        )
+    finally:
+        db.close()
+    if any(other.get("image_path") == payload["image_path"] for (other,) in pending):
+        return
+    try:
+        os.remove(payload["image_path"])
+    except FileNotFoundError:
+        pass
+
+
+# The image is kept between attempts, and removed once the job succeeds or fails for good
+@job_handler("render_resume_from_image", cleanup=_remove_layout_image)
+def handle_render_resume(db: Session, payload: dict) -> dict:
+    user_id = _get_user_id(db, payload["user_id"])
+    with open(payload["image_path"], "rb") as f:
+        image_bytes = f.read()
+
+    render = render_html_from_template if payload.get("mode") == "template" else render_html_from_image_and_json
+    out = render(
+        db=db,
+        user_id=user_id,
+        image_bytes=image_bytes,
+        filename=payload["filename"],
+        source=payload["source"],
+        customization_id=payload.get("customization_id"),
+    )
+    pdf_url = save_pdf(render_pdf(out["html"]))
+
+    return {
+        "html": out["html"],
+        "pdf_url": pdf_url,
+        "source": out["source"],
+        "customization_id": out["customization_id"],
+        "template_cache_hit": out.get("template_cache_hit"),
+    }
@@ -0,0 +1,73 @@
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+from database import insert_or_ignore
+from models import JobPost, ResumeCustomization
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_job_post(text: str) -> str:
+    """
+    Canonical form used for dedup: Unicode NFKC, case-folded, whitespace collapsed.
+    A post pasted again from a different page usually differs only in these.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+def job_post_hash(text: str) -> str:
+    return hashlib.sha256(normalize_job_post(text).encode("utf-8")).hexdigest()
+
+
+def find_job_post(db: Session, text: str) -> Optional[JobPost]:
+    return db.query(JobPost).filter(JobPost.text_hash == job_post_hash(text)).first()
+
+
+def get_or_create_job_post(db: Session, text: str) -> JobPost:
+    """Returns the stored job post with the same normalized text, adding it if new. The caller commits."""
+    job_post = find_job_post(db, text)
+    if job_post is None:
+        text_hash = job_post_hash(text)
+        insert_or_ignore(db, JobPost, {"text_hash": text_hash, "text": text}, ["text_hash"])
+        job_post = db.query(JobPost).filter(JobPost.text_hash == text_hash).one()
+    return job_post
+
+
+def find_reusable_customizations(
+    db: Session, resume_id: int, job_posts: Sequence[str], versions: List[str]
+) -> Dict[int, ResumeCustomization]:
+    """
+    Maps the index of each job post that was already tailored for `resume_id` with one
+    of `versions` to its latest customization. Earlier entries in `versions` win.
+    """
+    if not job_posts or not versions:
+        return {}
+    hashes = [job_post_hash(text) for text in job_posts]
+    id_by_hash = dict(db.query(JobPost.text_hash, JobPost.id).filter(JobPost.text_hash.in_(set(hashes))).all())
+    if not id_by_hash:
+        return {}
+
+    rows = (
+        db.query(ResumeCustomization)
+        .filter(
+            ResumeCustomization.resume_id == resume_id,
+            ResumeCustomization.job_post_id.in_(set(id_by_hash.values())),
+            ResumeCustomization.prompt_version.in_(versions),
+        )
+        .order_by(ResumeCustomization.id.desc())
+        .all()
+    )
+    best: Dict[int, ResumeCustomization] = {}
+    for row in rows:
+        current = best.get(row.job_post_id)
+        if current is None or versions.index(row.prompt_version) < versions.index(current.prompt_version):
+            best[row.job_post_id] = row
+
+    return {
+        index: best[id_by_hash[text_hash]]
+        for index, text_hash in enumerate(hashes)
+        if text_hash in id_by_hash and id_by_hash[text_hash] in best
+    }
@@ -0,0 +1,281 @@
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+# ---------------- Config ----------------
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "200"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2.0"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# A running job whose worker has been silent this long is assumed dead and requeued
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+# How often a worker renews the lease of the job it is running; well under JOB_LEASE_SECONDS
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+
+PENDING_STATUSES = ("queued", "running")
+
+# Exception class names raised by the Gemini / HTTP clients that are worth retrying
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "ConnectError", "ReadTimeout", "RemoteProtocolError",
+}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class TransientJobError(Exception):
+    """Raise from a handler to request a retry with backoff."""
+
+
+JobHandler = Callable[[Session, dict], dict]
+JobCleanup = Callable[[dict], None]
+_handlers: dict[str, JobHandler] = {}
+_cleanups: dict[str, JobCleanup] = {}
+
+
+def job_handler(kind: str, cleanup: Optional[JobCleanup] = None):
+    """
+    Registers the handler of a job kind. `cleanup(payload)` runs once the job is done
+    for good (succeeded, or failed with no retry left), never between attempts.
+    """
+    def register(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        if cleanup is not None:
+            _cleanups[kind] = cleanup
+        return fn
+    return register
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TransientJobError, TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def submit_job(db: Session, kind: str, payload: dict, user_id: Optional[int] = None) -> Job:
+    """
+    Queues a job and returns it immediately.
+    Raises QueueFullError once JOB_QUEUE_MAX_DEPTH jobs are pending.
+    """
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    depth = db.query(Job).filter(Job.status.in_(PENDING_STATUSES)).count()
+    if depth >= JOB_QUEUE_MAX_DEPTH:
+        raise QueueFullError(f"Job queue is full ({depth} pending jobs)")
+
+    job = Job(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        status="queued",
+        payload=payload,
+        max_attempts=JOB_MAX_ATTEMPTS,
+        user_id=user_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _requeue_expired_leases(db: Session):
+    """
+    Requeues running jobs whose worker went silent. A job that has used all its attempts
+    fails instead: it may be what killed the worker, and would otherwise run forever.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    expired = Job.status == "running", Job.locked_at < cutoff
+    exhausted = db.query(Job).filter(*expired, Job.attempts >= Job.max_attempts).all()
+    for job in exhausted:
+        failed = db.execute(
+            update(Job)
+            .where(Job.id == job.id, *expired)
+            .values(status="failed", error="Lease expired: the worker stopped on the last attempt",
+                    locked_by=None, locked_at=None)
+        ).rowcount
+        db.commit()
+        if failed:
+            logger.error("Job %s (%s) failed: lease expired on attempt %s", job.id, job.kind, job.attempts)
+            _cleanup(job, dict(job.payload))
+
+    db.execute(update(Job).where(*expired).values(status="queued", locked_by=None, locked_at=None))
+    db.commit()
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """
+    Atomically moves the oldest runnable job from queued to running.
+    The conditional UPDATE makes this safe across threads and processes.
+    """
+    now = datetime.utcnow()
+    candidates = (
+        db.query(Job.id)
+        .filter(Job.status == "queued", Job.run_after <= now)
+        .order_by(Job.created_at.asc())
+        .limit(5)
+        .all()
+    )
+    for (job_id,) in candidates:
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def renew_lease(job_id: str, worker_id: str) -> bool:
+    """Moves a running job's locked_at to now, if `worker_id` still holds it."""
+    db = SessionLocal()
+    try:
+        renewed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+            .values(locked_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        return bool(renewed)
+    finally:
+        db.close()
+
+
+class LeaseHeartbeat:
+    """
+    Renews a job's lease every JOB_HEARTBEAT_SECONDS while its handler runs, so a
+    render that takes longer than JOB_LEASE_SECONDS is not requeued and run twice.
+    """
+
+    def __init__(self, job_id: str, worker_id: str, interval: float = JOB_HEARTBEAT_SECONDS):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not renew_lease(self.job_id, self.worker_id):
+                    logger.warning("Job %s lost its lease", self.job_id)
+                    return
+            except Exception:
+                logger.exception("Could not renew the lease of job %s", self.job_id)
+
+
+def _cleanup(job: Job, payload: dict):
+    cleanup = _cleanups.get(job.kind)
+    if cleanup is None:
+        return
+    try:
+        cleanup(payload)
+    except Exception:
+        logger.exception("Cleanup of job %s (%s) failed", job.id, job.kind)
+
+
+def run_job(db: Session, job: Job):
+    handler = _handlers.get(job.kind)
+    payload = dict(job.payload)
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind: {job.kind}")
+        with LeaseHeartbeat(job.id, job.locked_by):
+            result = handler(db, dict(payload))
+    except Exception as exc:
+        db.rollback()
+        if is_transient(exc) and job.attempts < job.max_attempts:
+            delay = JOB_RETRY_BASE_DELAY * (2 ** (job.attempts - 1)) * random.uniform(0.5, 1.5)
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning("Job %s (%s) attempt %s failed, retrying in %.1fs: %s",
+                           job.id, job.kind, job.attempts, delay, exc)
+        else:
+            job.status = "failed"
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.locked_by = None
+        job.locked_at = None
+        db.commit()
+        if job.status == "failed":
+            _cleanup(job, payload)
+        return
+
+    job.status = "succeeded"
+    job.result = result
+    job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    db.commit()
+    _cleanup(job, payload)
+
+
+class JobWorker:
+    """
+    Pool of threads that poll the jobs table and execute registered handlers.
+    Any number of workers, in the API process or in worker.py, can share one database.
+    """
+
+    def __init__(self, concurrency: int = 2, poll_interval: float = JOB_POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, args=(f"{self._name}:{i}",), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def run_once(self, worker_id: str) -> bool:
+        db = SessionLocal()
+        try:
+            _requeue_expired_leases(db)
+            job = claim_next_job(db, worker_id)
+            if job is None:
+                return False
+            run_job(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _loop(self, worker_id: str):
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once(worker_id)
+            except Exception:
+                logger.exception("Job worker %s crashed while polling", worker_id)
+                worked = False
+            if not worked:
+                self._stop.wait(self.poll_interval)
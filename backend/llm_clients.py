@@ -0,0 +1,351 @@
+"""
+Shared chat-model registry. Every feature that talks to an LLM gets its model from here:
+
+- one client per provider, reused by every caller, so connections stay pooled;
+- one token-bucket rate limiter across all endpoints for the hosted provider;
+- retries with jittered exponential backoff on transient errors (429, 503, timeouts);
+- a per-call deadline;
+- a circuit breaker per provider that, once open, sends calls straight to the
+  fallback provider (LLM_FALLBACK_PROVIDER, e.g. a local Ollama) instead of
+  letting every in-flight request wait out its retries.
+
+LLM_PROVIDER=fake swaps in fake_llm.FakeChatModel for tests and offline runs.
+"""
+import asyncio
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_core.runnables import Runnable
+
+# ---------------- Load env ----------------
+load_dotenv()
+
+# ---------------- Config ----------------
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # "gemini", "ollama" or "fake"
+# Provider used when the primary fails or its circuit is open; empty disables fallback
+LLM_FALLBACK_PROVIDER = os.getenv("LLM_FALLBACK_PROVIDER", "")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "models/gemini-2.5-flash")
+OLLAMA_MODEL_NAME = os.getenv("OLLAMA_MODEL_NAME", "gemma3n")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL") or None
+FAKE_LLM_LATENCY_S = float(os.getenv("FAKE_LLM_LATENCY_S", "0"))
+# JSON file of canned fake replies (see fake_llm.FakeChatModel.from_recording)
+FAKE_LLM_RECORDING = os.getenv("FAKE_LLM_RECORDING", "")
+# Shared token bucket for hosted providers; 0 disables rate limiting
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "5"))
+LLM_MAX_BURST = float(os.getenv("LLM_MAX_BURST", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_INITIAL_S = float(os.getenv("LLM_RETRY_INITIAL_S", "1"))
+LLM_RETRY_MAX_S = float(os.getenv("LLM_RETRY_MAX_S", "20"))
+# Deadline for one attempt at a call
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "120"))
+# Consecutive transient failures that open a provider's circuit, and how long it stays open
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+
+_PROVIDERS = ("gemini", "ollama", "fake")
+for _provider in filter(None, (LLM_PROVIDER, LLM_FALLBACK_PROVIDER)):
+    if _provider not in _PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {_provider}")
+
+
+def _transient_errors() -> tuple:
+    errors = [TimeoutError, ConnectionError]
+    try:
+        from google.api_core import exceptions as google_errors
+        errors += [
+            google_errors.ResourceExhausted,  # 429
+            google_errors.ServiceUnavailable,
+            google_errors.InternalServerError,
+            google_errors.DeadlineExceeded,
+            google_errors.TooManyRequests,
+        ]
+    except ImportError:
+        pass
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+TRANSIENT_ERRORS = _transient_errors()
+
+rate_limiter = InMemoryRateLimiter(
+    requests_per_second=LLM_REQUESTS_PER_SECOND or 1,
+    check_every_n_seconds=0.05,
+    max_bucket_size=LLM_MAX_BURST,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After `failures` consecutive transient errors it opens and
+    rejects calls for `reset_after` seconds, then lets a single trial call through
+    (half-open); its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failures: int = LLM_BREAKER_FAILURES, reset_after: float = LLM_BREAKER_RESET_S):
+        self.name = name
+        self.failures = failures
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._counters = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is not None:
+                if time.monotonic() - self._opened_at < self.reset_after or self._trial_in_flight:
+                    self._counters["rejected"] += 1
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self._trial_in_flight = True
+            self._counters["calls"] += 1
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive += 1
+            if self._trial_in_flight or (self._opened_at is None and self._consecutive >= self.failures):
+                self._opened_at = time.monotonic()
+                self._counters["opened"] += 1
+            self._trial_in_flight = False
+
+    def record_other(self):
+        # The call failed for a non-transient reason (bad request): the provider is up
+        with self._lock:
+            self._trial_in_flight = False
+
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_after else "open"
+
+    def stats(self) -> dict:
+        state = self.state()
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._consecutive, **self._counters}
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+class GuardedRunnable(Runnable):
+    """Runs one attempt against a provider under its circuit breaker and the call deadline."""
+
+    def __init__(self, runnable: Runnable, breaker: CircuitBreaker, timeout: float = LLM_TIMEOUT_S):
+        self.runnable = runnable
+        self.breaker = breaker
+        self.timeout = timeout
+
+    def _record(self, error: Optional[BaseException]):
+        if error is None:
+            self.breaker.record_success()
+        elif isinstance(error, TRANSIENT_ERRORS):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_other()
+
+    # Outcomes are recorded in `finally` and for BaseException too: a call cancelled or a
+    # stream closed by a disconnecting client must still release the half-open trial slot,
+    # or the breaker would reject every later call
+    def invoke(self, input, config=None, **kwargs):
+        # Sync calls are bounded by the client's own request timeout
+        self.breaker.before_call()
+        error = None
+        try:
+            return self.runnable.invoke(input, config, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(error)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.breaker.before_call()
+        error = None
+        try:
+            return await asyncio.wait_for(self.runnable.ainvoke(input, config, **kwargs), self.timeout)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(error)
+
+    def stream(self, input, config=None, **kwargs):
+        self.breaker.before_call()
+        error = None
+        try:
+            yield from self.runnable.stream(input, config, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(error)
+
+    async def astream(self, input, config=None, **kwargs):
+        self.breaker.before_call()
+        error = None
+        chunks = aiter(self.runnable.astream(input, config, **kwargs))
+        # The deadline covers the provider only, not the time the consumer spends between chunks
+        remaining = self.timeout
+        try:
+            while True:
+                start = time.monotonic()
+                try:
+                    async with asyncio.timeout(remaining):
+                        chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+                remaining -= time.monotonic() - start
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(error)
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+
+
+class LazyRunnable(Runnable):
+    """Builds the wrapped runnable on first use, so importing a feature module creates no client."""
+
+    def __init__(self, build):
+        self._build = build
+        self._runnable: Optional[Runnable] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Runnable:
+        if self._runnable is None:
+            with self._lock:
+                if self._runnable is None:
+                    self._runnable = self._build()
+        return self._runnable
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.get().invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.get().ainvoke(input, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        yield from self.get().stream(input, config, **kwargs)
+
+    async def astream(self, input, config=None, **kwargs):
+        async for chunk in self.get().astream(input, config, **kwargs):
+            yield chunk
+
+
+@lru_cache(maxsize=None)
+def provider_model(provider: str):
+    """The single shared base chat model (and HTTP client) of a provider."""
+    if provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL_NAME,
+            api_key=GEMINI_API_KEY,
+            timeout=LLM_TIMEOUT_S,
+            # One attempt per call; retries are done here, with jitter
+            max_retries=1,
+            rate_limiter=rate_limiter if LLM_REQUESTS_PER_SECOND > 0 else None,
+        )
+    if provider == "ollama":
+        from langchain_ollama import ChatOllama
+        return ChatOllama(model=OLLAMA_MODEL_NAME, base_url=OLLAMA_BASE_URL, disable_streaming=False)
+    if provider == "fake":
+        from fake_llm import FakeChatModel
+        settings = dict(
+            latency_s=FAKE_LLM_LATENCY_S,
+            rate_limiter=rate_limiter if LLM_REQUESTS_PER_SECOND > 0 else None,
+        )
+        if FAKE_LLM_RECORDING:
+            return FakeChatModel.from_recording(FAKE_LLM_RECORDING, **settings)
+        return FakeChatModel(**settings)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def model_name(provider: str = LLM_PROVIDER) -> str:
+    """Identifies the model behind a provider, for cache keys and prompt versions."""
+    return {"gemini": GEMINI_MODEL_NAME, "ollama": f"ollama/{OLLAMA_MODEL_NAME}", "fake": "fake"}[provider]
+
+
+def with_jittered_retry(runnable: Runnable) -> Runnable:
+    # CircuitOpenError is not transient, so an open circuit fails fast to the fallback
+    return runnable.with_retry(
+        retry_if_exception_type=TRANSIENT_ERRORS,
+        wait_exponential_jitter=True,
+        exponential_jitter_params={"initial": LLM_RETRY_INITIAL_S, "max": LLM_RETRY_MAX_S},
+        stop_after_attempt=LLM_MAX_RETRIES + 1,
+    )
+
+
+def _guarded(provider: str, build) -> Runnable:
+    # The breaker sees every attempt, so a storm of 429s opens it after a few calls
+    # instead of after every in-flight request has exhausted its retries
+    return with_jittered_retry(GuardedRunnable(build(provider_model(provider)), get_breaker(provider)))
+
+
+def _with_fallback(build, fallback: Optional[str]) -> Runnable:
+    primary = _guarded(LLM_PROVIDER, build)
+    if not fallback or fallback == LLM_PROVIDER:
+        return primary
+    return primary.with_fallbacks([_guarded(fallback, build)])
+
+
+def chat_model(fallback: Optional[str] = LLM_FALLBACK_PROVIDER) -> LazyRunnable:
+    """Plain chat model (messages in, AIMessage out; supports astream)."""
+    return LazyRunnable(lambda: _with_fallback(lambda model: model, fallback))
+
+
+def structured_model(schema, include_raw: bool = False, fallback: Optional[str] = LLM_FALLBACK_PROVIDER) -> LazyRunnable:
+    """Chat model whose output is parsed into `schema`, like with_structured_output."""
+    return LazyRunnable(lambda: _with_fallback(
+        lambda model: model.with_structured_output(schema=schema, include_raw=include_raw), fallback
+    ))
+
+
+def warm_up_clients(providers=None):
+    """Creates the provider clients now instead of on the first request."""
+    for provider in providers or filter(None, (LLM_PROVIDER, LLM_FALLBACK_PROVIDER)):
+        provider_model(provider)
+
+
+def llm_stats() -> dict:
+    with _breakers_lock:
+        breakers = {name: breaker.stats() for name, breaker in _breakers.items()}
+    return {
+        "provider": LLM_PROVIDER,
+        "model": model_name(),
+        "fallback": LLM_FALLBACK_PROVIDER or None,
+        "requests_per_second": LLM_REQUESTS_PER_SECOND,
+        "breakers": breakers,
+    }
@@ -1,19 +1,58 @@
+import json
+import logging
 import os
-from fastapi import FastAPI, Depends, HTTPException, Form, UploadFile, File, Body
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Depends, HTTPException, Form, UploadFile, File, Body, Request, Response, Header
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
-from database import SessionLocal, engine, Base
-from models import User, Resume, ResumeCustomization
-from auth import hash_password, verify_password
-from extract_resume_data import extract_data_from_resume
-from change_resume_json import change_resume_json
-import tempfile
-from vision_renderer import render_html_from_image_and_json
+from database import SessionLocal, engine
+from migrations import upgrade_schema
+from models import User, Job
+from auth import ahash_password, averify_password
+from sessions import SessionUser, current_user, current_user_query, issue_token, revoke_token
+from extract_resume_data import (
+    extract_data_from_resume, aextract_data_from_resume, astream_extract_data_from_resume, extraction_token_usage,
+)
+from extraction_cache import cache_stats
+from change_resume_json import token_usage
+from llm_clients import llm_stats
+from pdf_text import PdfBudgetError
+from text_compaction import EXTRACT_TOKEN_BUDGET, compaction_stats
+from vision_renderer import (
+    arender_html_from_image_and_json, arender_html_from_template, astream_html_from_image_and_json,
+)
+from pdf_renderer import arender_pdf, pdf_render_service, PDF_RENDER_WARM_ON_STARTUP
+from image_normalizer import ImageTooLargeError, image_stats
+from warmup import warm_up_on_startup
+from executors import shutdown_pools
+from resume_service import (
+    get_latest_resume, save_resume, customize_latest_resume, customize_many,
+    save_customizations, save_pdf, list_customizations, reusable_versions, similar_customizations,
+    CUSTOMIZE_STRATEGIES, CUSTOMIZATIONS_PAGE_SIZE,
+)
+from job_posts import find_reusable_customizations
+from similarity_index import similarity_index
+from artifact_store import artifact_store, parse_range_header
+from blob_store import storage_report
+from jobs import JobWorker, QueueFullError, submit_job
+import job_handlers  # noqa: F401  (registers job handlers)
+from sse import sse_event, sse_response
+from upload_store import (
+    MultipartLimitMiddleware, StoredUpload, UploadTooLargeError, check_size, store_stream, store_upload,
+)
+from metrics import RequestMetricsMiddleware, current_request_id, render_metrics, span
 
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+logger = logging.getLogger(__name__)
+
+# Batch customization limits
+BATCH_CUSTOMIZE_MAX_POSTS = int(os.getenv("BATCH_CUSTOMIZE_MAX_POSTS", "50"))
+BATCH_CUSTOMIZE_CONCURRENCY = int(os.getenv("BATCH_CUSTOMIZE_CONCURRENCY", "8"))
+SIMILAR_CUSTOMIZATIONS_MAX_K = int(os.getenv("SIMILAR_CUSTOMIZATIONS_MAX_K", "20"))
+
+# Job worker threads started inside the API process; set to 0 when running worker.py separately
+JOB_API_WORKERS = int(os.getenv("JOB_API_WORKERS", "2"))
 
 app = FastAPI()
 
@@ -24,9 +63,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(MultipartLimitMiddleware)
+# Outermost, so the request id and latency cover CORS handling and streamed bodies
+app.add_middleware(RequestMetricsMiddleware)
+
+upgrade_schema(engine)
+
+
+job_worker = JobWorker(concurrency=JOB_API_WORKERS)
+
+
+@app.on_event("startup")
+def _start_job_worker():
+    if JOB_API_WORKERS > 0:
+        job_worker.start()
+
+
+@app.on_event("startup")
+def _start_artifact_eviction():
+    artifact_store.start_background_eviction()
+
+
+@app.on_event("startup")
+def _warm_pdf_renderer():
+    if PDF_RENDER_WARM_ON_STARTUP:
+        pdf_render_service.warm_up(wait=False)
 
-Base.metadata.create_all(bind=engine)
+
+@app.on_event("startup")
+def _warm_up_lazy_imports():
+    warm_up_on_startup()
+
+
+@app.on_event("shutdown")
+def _shutdown_pools():
+    job_worker.stop()
+    artifact_store.stop_background_eviction()
+    pdf_render_service.shutdown()
+    shutdown_pools()
 
 def get_db():
     db = SessionLocal()
@@ -36,116 +112,319 @@ def get_db():
         db.close()
 
 
+def _find_user(db: Session, username: str) -> User | None:
+    return db.query(User).filter(User.username == username).first()
+
+
+def _create_user(db: Session, username: str, password_hash: str):
+    db.add(User(username=username, password=password_hash))
+    db.commit()
+
+
+# bcrypt runs on its own pool; the DB reads and commits go to the threadpool, since a
+# commit can wait up to SQLITE_BUSY_TIMEOUT_MS for the write lock
 @app.post("/register")
-def register(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == username).first()
-    if user:
+async def register(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
+    if await run_in_threadpool(_find_user, db, username):
         raise HTTPException(status_code=400, detail="User already exists")
-    new_user = User(username=username, password=hash_password(password))
-    db.add(new_user)
-    db.commit()
+    password_hash = await ahash_password(password)
+    await run_in_threadpool(_create_user, db, username, password_hash)
     return {"message": "User created successfully"}
 
 
 @app.post("/login")
-def login(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.password):
+async def login(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, username)
+    if not user or not await averify_password(password, user.password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    return {"message": "Login successful", "username": username}
+    token = await run_in_threadpool(issue_token, db, user)
+    return {"message": "Login successful", "username": username, "access_token": token, "token_type": "bearer"}
+
+
+@app.post("/logout")
+def logout(authorization: str | None = Header(None), db: Session = Depends(get_db)):
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        revoke_token(db, token.strip())
+    return {"message": "Logged out"}
 
 
 # --- Dummy resume processor ---
-def process_resume(file_path: str) -> dict:
-    return extract_data_from_resume(file_path)
+def process_resume(file_path: str, content_hash: str | None = None) -> dict:
+    return extract_data_from_resume(file_path, content_hash)
 
 
+async def aprocess_resume(file_path: str, content_hash: str | None = None) -> dict:
+    return await aextract_data_from_resume(file_path, content_hash)
 
-@app.post("/upload_resume")
-async def upload_resume(username: str = Form(...), file: UploadFile = File(...), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    file_location = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_location, "wb") as f:
-        f.write(await file.read())
+async def _stored(store) -> StoredUpload:
+    try:
+        with span("upload_write"):
+            return await store
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    extracted = process_resume(file_location)
 
-    resume = Resume(filename=file.filename, extracted_data=extracted, owner=user)
-    db.add(resume)
-    db.commit()
-    db.refresh(resume)
+async def _extract_and_save(db: Session, user_id: int, filename: str, upload: StoredUpload) -> dict:
+    try:
+        extracted = await aprocess_resume(upload.path, upload.sha256)
+    except PdfBudgetError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    with span("db_save"):
+        await run_in_threadpool(save_resume, db, user_id, filename, extracted)
 
     return {"message": "Resume uploaded successfully", "extracted_data": extracted}
 
-@app.post("/customize_resume")
-def customize_resume(username: str = Form(...), job_post: str = Form(...), db: Session = Depends(get_db)):
-    # 1. Find user
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # 2. Get latest resume
-    resume = db.query(Resume).filter(Resume.user_id == user.id).order_by(Resume.id.desc()).first()
-    if not resume:
-        raise HTTPException(status_code=404, detail="No resume found for this user")
 
-    # 3. Prepare prompt
-    updated_json = change_resume_json(resume.extracted_data, job_post)
+@app.post("/upload_resume")
+async def upload_resume(
+    file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Extracts and saves a resume PDF sent as a multipart form. Starlette spools the
+    whole form before this runs, so the upload limit is enforced while the body arrives
+    by MultipartLimitMiddleware; /upload_resume/raw avoids the spooled copy altogether.
+    """
+    upload = await _stored(store_upload(file))
+    return await _extract_and_save(db, user.id, file.filename, upload)
+
+
+@app.post("/upload_resume/raw")
+async def upload_resume_raw(
+    request: Request,
+    filename: str = "resume.pdf",
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Same as /upload_resume with the PDF as the raw request body instead of a multipart
+    form. The body goes to disk as it arrives, and a Content-Length over the upload
+    limit is rejected before any of it is read.
+    """
+    content_length = request.headers.get("content-length", "")
+    try:
+        check_size(int(content_length) if content_length.isdigit() else None)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    upload = await _stored(store_stream(request.stream(), filename))
+    return await _extract_and_save(db, user.id, filename, upload)
+
+@app.post("/upload_resume/stream")
+async def upload_resume_stream(
+    file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
+):
+    """
+    Same as /upload_resume, as server-sent events: "accepted" right away, then "parsed",
+    "rules" and one "section" per LLM call as they finish, "extracted", "saved" and
+    "done". Failures arrive as an "error" event with the HTTP status it would have had.
+    """
+    upload = await _stored(store_upload(file))
+    # The request session is closed before the body streams, so keep plain values only
+    user_id, filename = user.id, file.filename
+
+    async def events():
+        yield sse_event("accepted", {"filename": filename})
+        try:
+            async for event, data in astream_extract_data_from_resume(upload.path, upload.sha256):
+                yield sse_event(event, data)
+                if event == "extracted":
+                    extracted = data["extracted_data"]
+            with span("db_save"), SessionLocal() as session:
+                resume = await run_in_threadpool(save_resume, session, user_id, filename, extracted)
+                resume_id = resume.id
+            yield sse_event("saved", {"resume_id": resume_id})
+            yield sse_event("done", {"message": "Resume uploaded successfully"})
+        except PdfBudgetError as e:
+            yield sse_event("error", {"status": 413, "detail": str(e)})
+        except Exception as e:
+            logger.exception("Extraction failed (request %s)", current_request_id())
+            yield sse_event("error", {"status": 500, "detail": f"Extraction failed: {e}"})
+
+    return sse_response(events())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text format: stage and request latency histograms, LLM tokens and cost, cache hits."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/extraction_cache/stats")
+def extraction_cache_stats():
+    return cache_stats()
+
+@app.get("/llm/stats")
+def get_llm_stats():
+    return llm_stats()
+
+@app.get("/extraction/token_stats")
+def extraction_token_stats():
+    return {
+        "budget": EXTRACT_TOKEN_BUDGET,
+        "compaction": compaction_stats.snapshot(),
+        "calls": extraction_token_usage.snapshot(),
+    }
+
+def _check_customize_mode(mode: str):
+    if mode not in CUSTOMIZE_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(CUSTOMIZE_STRATEGIES)}")
 
-    customization = ResumeCustomization(
-        job_post_text=job_post,
-        customized_data=updated_json,
-        resume=resume,
-        user=user
-    )
 
-    db.add(customization)
-    db.commit()
-    db.refresh(customization)
+@app.get("/customize_resume/token_stats")
+def customize_token_stats():
+    return token_usage.snapshot()
+
+@app.post("/customize_resume")
+def customize_resume(
+    job_post: str = Form(...),
+    mode: str = Form("llm"),  # "llm", "local" or "auto"
+    warm_start: bool = Form(False),  # reuse skills from a near-duplicate past job post
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    _check_customize_mode(mode)
 
-    # 5. Return updated JSON
+    # 1. Customize latest resume and save it
+    try:
+        customization, used_mode, reused = customize_latest_resume(db, user.id, job_post, mode, warm_start)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+
+    # 2. Return updated JSON
     return {
         "message": "Customized resume saved successfully",
-        "customized_resume": updated_json,
-        "customization_id": customization.id
+        "customized_resume": customization.customized_json,
+        "customization_id": customization.id,
+        "mode": used_mode,
+        "reused": reused
     }
 
+@app.post("/customize_resume_batch")
+async def customize_resume_batch(
+    job_posts: list[str] = Form(...),
+    concurrency: int | None = Form(None),
+    mode: str = Form("llm"),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Tailors the latest resume to every job post concurrently. Streams one NDJSON
+    line per post as it completes, then saves all successful customizations in
+    one transaction and sends a final line with their ids.
+    """
+    _check_customize_mode(mode)
+    if len(job_posts) > BATCH_CUSTOMIZE_MAX_POSTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_CUSTOMIZE_MAX_POSTS} job posts per batch")
+
+    resume = await run_in_threadpool(get_latest_resume, db, user.id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="No resume found for this user")
+
+    # Posts this resume was already tailored to are answered from the database
+    reusable = await run_in_threadpool(find_reusable_customizations, db, resume.id, job_posts, reusable_versions(mode))
+    reused = {index: (c.id, c.customized_json) for index, c in reusable.items()}
+    pending = [i for i in range(len(job_posts)) if i not in reused]
+
+    # The request session is closed before the body streams, so keep plain values only
+    user_id, resume_id, resume_json = user.id, resume.id, resume.extracted_json
+    limit = max(1, min(concurrency or BATCH_CUSTOMIZE_CONCURRENCY, BATCH_CUSTOMIZE_CONCURRENCY))
+
+    async def stream():
+        for index, (_, updated_json) in reused.items():
+            yield json.dumps({"index": index, "status": "ok", "reused": True, "customized_resume": updated_json}) + "\n"
+
+        results = {}
+        pending_posts = [job_posts[i] for i in pending]
+        async for n, updated_json, used, error in customize_many(resume_json, pending_posts, limit, mode):
+            index = pending[n]
+            if error is None:
+                results[index] = (updated_json, used)
+                line = {"index": index, "status": "ok", "reused": False, "customized_resume": updated_json}
+            else:
+                line = {"index": index, "status": "error", "detail": str(error)}
+            yield json.dumps(line) + "\n"
+
+        order = sorted(results)
+        with SessionLocal() as session:
+            ids = await run_in_threadpool(
+                save_customizations, session, resume_id, user_id,
+                [(job_posts[i], *results[i]) for i in order],
+            )
+        customization_ids = {index: customization_id for index, (customization_id, _) in reused.items()}
+        customization_ids.update(zip(order, ids))
+        yield json.dumps({
+            "status": "done",
+            "saved": len(ids),
+            "reused": len(reused),
+            "failed": len(pending) - len(ids),
+            "customization_ids": dict(sorted(customization_ids.items())),
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/similar_customizations")
+def get_similar_customizations(
+    job_post: str = Form(...),
+    k: int = Form(5),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    k = max(1, min(k, SIMILAR_CUSTOMIZATIONS_MAX_K))
+    return {"similar": similar_customizations(db, user.id, job_post, k)}
+
+
+@app.get("/similarity_stats")
+def similarity_stats():
+    return similarity_index.stats()
+
+
 @app.get("/get_customized_resumes")
-def get_customized_resumes(username: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+def get_customized_resumes(
+    cursor: int | None = None,
+    limit: int = CUSTOMIZATIONS_PAGE_SIZE,
+    fields: str | None = None,  # comma-separated, e.g. "id,job_post_text"
+    summary: bool = False,
+    user: SessionUser = Depends(current_user_query),
+    db: Session = Depends(get_db)
+):
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        customizations, next_cursor = list_customizations(
+            db, user.id, cursor=cursor, limit=limit, fields=field_list, summary=summary
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    customizations = db.query(ResumeCustomization).filter(ResumeCustomization.user_id == user.id).all()
+    return {"customizations": customizations, "next_cursor": next_cursor}
 
-    return {
-        "customizations": [
-            {
-                "id": c.id,
-                "job_post_text": c.job_post_text,
-                "customized_data": c.customized_data
-            }
-            for c in customizations
-        ]
-    }
+
+RENDER_MODES = ("direct", "template")
+
+
+def _check_render_mode(mode: str):
+    if mode not in RENDER_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(RENDER_MODES)}")
 
 
 @app.post("/render_resume_from_image")
 async def render_resume_from_image(
-    username: str = Form(...),
     source: str = Form("original"),  # "original" or "customized"
     customization_id: int | None = Form(None),
+    mode: str = Form("direct"),  # "direct" or "template"
     file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
     db: Session = Depends(get_db)
 ):
+    _check_render_mode(mode)
     try:
         image_bytes = await file.read()
-        out = render_html_from_image_and_json(
+        render = arender_html_from_template if mode == "template" else arender_html_from_image_and_json
+        out = await render(
             db=db,
-            username=username,
+            user_id=user.id,
             image_bytes=image_bytes,
             filename=file.filename,
             source=source,
@@ -155,35 +434,227 @@ async def render_resume_from_image(
         html_text = out["html"]
 
         # ---- Convert HTML to PDF ----
-        from vision_renderer import html_to_pdf_bytes
-        pdf_bytes = html_to_pdf_bytes(html_text)
+        with span("pdf_render"):
+            pdf_bytes = await arender_pdf(html_text)
 
         # Save to tmp file
-        tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        tmpfile.write(pdf_bytes)
-        tmpfile.flush()
-        tmpfile.close()
+        with span("pdf_save"):
+            pdf_url = await run_in_threadpool(save_pdf, pdf_bytes)
 
         return {
             "message": "Rendered successfully",
             "html": html_text,
-            "pdf_url": f"/download_pdf/{os.path.basename(tmpfile.name)}",
+            "pdf_url": pdf_url,
             "source": out["source"],
             "customization_id": out["customization_id"],
+            "template_cache_hit": out.get("template_cache_hit"),
         }
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
-        print(e)
+        logger.exception("Rendering failed (request %s)", current_request_id())
         raise HTTPException(status_code=500, detail=f"Rendering failed: {e}")
 
 
+@app.post("/render_resume_from_image/stream")
+async def render_resume_from_image_stream(
+    source: str = Form("original"),  # "original" or "customized"
+    customization_id: int | None = Form(None),
+    mode: str = Form("direct"),  # "direct" or "template"
+    file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
+):
+    """
+    Same as /render_resume_from_image, as server-sent events: "accepted" right away,
+    then "token" for every chunk of HTML the vision model streams in direct mode (or
+    "template" with the cache outcome in template mode), "html", "pdf_ready" and "done".
+    """
+    _check_render_mode(mode)
+    image_bytes = await file.read()
+    user_id, filename = user.id, file.filename
+
+    async def events():
+        yield sse_event("accepted", {"mode": mode, "source": source})
+        try:
+            with SessionLocal() as session:
+                if mode == "template":
+                    out = await arender_html_from_template(
+                        db=session, user_id=user_id, image_bytes=image_bytes, filename=filename,
+                        source=source, customization_id=customization_id,
+                    )
+                    yield sse_event("template", {"cache_hit": out["template_cache_hit"]})
+                else:
+                    async for event, data in astream_html_from_image_and_json(
+                        db=session, user_id=user_id, image_bytes=image_bytes, filename=filename,
+                        source=source, customization_id=customization_id,
+                    ):
+                        if event == "token":
+                            yield sse_event("token", {"text": data})
+                        else:
+                            out = data
+            yield sse_event("html", {
+                "html": out["html"],
+                "source": out["source"],
+                "customization_id": out["customization_id"],
+            })
+
+            with span("pdf_render"):
+                pdf_bytes = await arender_pdf(out["html"])
+            with span("pdf_save"):
+                pdf_url = await run_in_threadpool(save_pdf, pdf_bytes)
+            yield sse_event("pdf_ready", {"pdf_url": pdf_url})
+            yield sse_event("done", {"message": "Rendered successfully"})
+        except ImageTooLargeError as e:
+            yield sse_event("error", {"status": 413, "detail": str(e)})
+        except ValueError as ve:
+            yield sse_event("error", {"status": 404, "detail": str(ve)})
+        except Exception as e:
+            logger.exception("Rendering failed (request %s)", current_request_id())
+            yield sse_event("error", {"status": 500, "detail": f"Rendering failed: {e}"})
+
+    return sse_response(events())
+
+
+@app.get("/render_stats")
+def render_stats():
+    return {**pdf_render_service.stats(), "images": image_stats.snapshot()}
+
+
+@app.get("/storage_stats")
+def storage_stats(db: Session = Depends(get_db)):
+    return storage_report(db)
+
+
 @app.get("/download_pdf/{filename}")
-def download_pdf(filename: str):
-    tmp_path = os.path.join(tempfile.gettempdir(), filename)
-    if not os.path.exists(tmp_path):
+def download_pdf(filename: str, request: Request):
+    info = artifact_store.stat(filename)
+    if info is None:
         raise HTTPException(status_code=404, detail="PDF not found")
-    return FileResponse(tmp_path, media_type="application/pdf", filename="resume.pdf")
+
+    etag = f'"{info.etag}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Content-addressed: a given URL always serves the same bytes
+        "Cache-Control": f"private, max-age={artifact_store.ttl_seconds}, immutable",
+        "Content-Disposition": 'attachment; filename="resume.pdf"',
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), info.size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{info.size}"})
+
+    start, end = byte_range or (0, None)
+    try:
+        body = artifact_store.read(filename, start, end)
+    except FileNotFoundError:
+        # Evicted since stat(); fail before any header is sent
+        raise HTTPException(status_code=404, detail="PDF not found")
+
+    if byte_range is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(body, media_type="application/pdf", headers=headers)
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(body, status_code=206, media_type="application/pdf", headers=headers)
+
+
+# ---------------- Background jobs ----------------
+
+def _submit(db: Session, kind: str, payload: dict, user_id: int) -> dict:
+    try:
+        job = submit_job(db, kind, payload, user_id=user_id)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+
+def _get_job_for_user(db: Session, job_id: str, user_id: int) -> Job:
+    job = db.get(Job, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/jobs/upload_resume", status_code=202)
+async def submit_upload_resume(
+    file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    upload = await _stored(store_upload(file))
+    payload = {"user_id": user.id, "file_path": upload.path, "content_hash": upload.sha256, "filename": file.filename}
+    return await run_in_threadpool(_submit, db, "upload_resume", payload, user.id)
+
+
+@app.post("/jobs/customize_resume", status_code=202)
+def submit_customize_resume(
+    job_post: str = Form(...),
+    mode: str = Form("llm"),
+    warm_start: bool = Form(False),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    _check_customize_mode(mode)
+    payload = {"user_id": user.id, "job_post": job_post, "mode": mode, "warm_start": warm_start}
+    return _submit(db, "customize_resume", payload, user.id)
+
+
+@app.post("/jobs/render_resume_from_image", status_code=202)
+async def submit_render_resume_from_image(
+    source: str = Form("original"),
+    customization_id: int | None = Form(None),
+    mode: str = Form("direct"),
+    file: UploadFile = File(...),
+    user: SessionUser = Depends(current_user),
+    db: Session = Depends(get_db)
+):
+    _check_render_mode(mode)
+
+    # Workers may run in another process, so the image goes to disk rather than into the payload
+    upload = await _stored(store_upload(file, default_ext=".bin"))
+
+    payload = {
+        "user_id": user.id,
+        "image_path": upload.path,
+        "filename": file.filename,
+        "source": source,
+        "customization_id": customization_id,
+        "mode": mode,
+    }
+    return await run_in_threadpool(_submit, db, "render_resume_from_image", payload, user.id)
+
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str, user: SessionUser = Depends(current_user_query), db: Session = Depends(get_db)):
+    job = _get_job_for_user(db, job_id, user.id)
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str, user: SessionUser = Depends(current_user_query), db: Session = Depends(get_db)):
+    job = _get_job_for_user(db, job_id, user.id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return {"job_id": job.id, "status": job.status, "result": job.result}
 
 
 if __name__ == "__main__":
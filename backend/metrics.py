@@ -0,0 +1,261 @@
+"""
+In-process metrics for the hot paths, exposed in Prometheus text format at /metrics,
+plus one structured (JSON) log line per request carrying its request id.
+
+- span("stage") times a stage into the stage_duration_seconds histogram and into the
+  current request's log line, so a slow /upload_resume shows whether the time went to
+  PDF parsing, the LLM or the database commit;
+- record_tokens() counts LLM tokens and their estimated cost (tokens.TokenUsage calls it);
+- record_cache() counts cache hits and misses; the hit ratio is exported as a gauge.
+
+Metrics are per process: with several uvicorn workers, scrape each one.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# ---------------- Load env ----------------
+load_dotenv()
+
+# ---------------- Config ----------------
+# USD per million tokens, for the cost counters (defaults: Gemini 2.5 Flash list price)
+LLM_INPUT_USD_PER_MTOK = float(os.getenv("LLM_INPUT_USD_PER_MTOK", "0.30"))
+LLM_OUTPUT_USD_PER_MTOK = float(os.getenv("LLM_OUTPUT_USD_PER_MTOK", "2.50"))
+# One JSON log line per request on stderr
+REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "1") == "1"
+
+# Seconds; wide enough for multi-second LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+request_logger = logging.getLogger("request_log")
+if REQUEST_LOG_ENABLED and not request_logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    request_logger.addHandler(_handler)
+    request_logger.setLevel(logging.INFO)
+    request_logger.propagate = False
+
+
+def _labels_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels_text(self.labels, label_values)} {value:g}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(label_values, [[0] * (len(self.buckets) + 1), 0.0])
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for label_values, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _labels_text(self.labels, label_values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labels, label_values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels_text(self.labels, label_values)} {cumulative}")
+        return "\n".join(lines)
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route, until the last body byte",
+    ("method", "route", "status"),
+)
+stage_duration = Histogram("stage_duration_seconds", "Latency of each hot-path stage", ("stage",))
+stage_errors = Counter("stage_errors_total", "Stages that raised", ("stage",))
+llm_tokens = Counter("llm_tokens_total", "LLM tokens by feature and direction", ("feature", "label", "direction"))
+llm_cost = Counter("llm_cost_usd_total", "Estimated LLM cost in USD", ("feature",))
+cache_requests = Counter("cache_requests_total", "Cache lookups by outcome", ("cache", "result"))
+
+_METRICS = (http_request_duration, stage_duration, stage_errors, llm_tokens, llm_cost, cache_requests)
+
+
+class RequestContext:
+    """What the current request has done so far; copied into its log line."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self._lock = threading.Lock()
+        self.stages: Dict[str, float] = {}
+        self.tokens = {"input": 0, "output": 0, "cost_usd": 0.0}
+        self.cache: Dict[str, str] = {}
+
+    def add_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_tokens(self, input_tokens: int, output_tokens: int, cost: float):
+        with self._lock:
+            self.tokens["input"] += input_tokens
+            self.tokens["output"] += output_tokens
+            self.tokens["cost_usd"] += cost
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    context = _current.get()
+    return context.request_id if context else None
+
+
+def observe_stage(stage: str, seconds: float):
+    stage_duration.observe(seconds, stage)
+    context = _current.get()
+    if context is not None:
+        context.add_stage(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Times a stage (sync or async code) into the stage histogram and the request log."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage)
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def record_tokens(feature: str, label: str, input_tokens: int, output_tokens: int):
+    cost = (input_tokens * LLM_INPUT_USD_PER_MTOK + output_tokens * LLM_OUTPUT_USD_PER_MTOK) / 1_000_000
+    llm_tokens.inc(feature, label, "input", amount=input_tokens)
+    llm_tokens.inc(feature, label, "output", amount=output_tokens)
+    llm_cost.inc(feature, amount=cost)
+    context = _current.get()
+    if context is not None:
+        context.add_tokens(input_tokens, output_tokens, cost)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache, "hit" if hit else "miss")
+    context = _current.get()
+    if context is not None:
+        context.cache[cache] = "hit" if hit else "miss"
+
+
+def _cache_hit_ratios() -> str:
+    totals: Dict[str, Dict[str, float]] = {}
+    for (cache, result), value in cache_requests.values().items():
+        totals.setdefault(cache, {"hit": 0, "miss": 0})[result] = value
+    lines = ["# HELP cache_hit_ratio Hits over lookups since start", "# TYPE cache_hit_ratio gauge"]
+    for cache, counts in sorted(totals.items()):
+        lookups = counts["hit"] + counts["miss"]
+        lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {counts["hit"] / lookups if lookups else 0:.4f}')
+    return "\n".join(lines)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join([metric.expose() for metric in _METRICS] + [_cache_hit_ratios()]) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware: assigns a request id (the client's X-Request-ID or a new one) and
+    returns it as a header, observes the request latency by route, and logs one JSON
+    line per request with its stages, tokens and cache outcomes. Plain ASGI rather than
+    BaseHTTPMiddleware, so streamed responses are timed until their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        context = RequestContext(request_id)
+        token = _current.set(context)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers") or []) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Route templates, not raw paths, keep label cardinality bounded
+            route_path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(elapsed, scope["method"], route_path, str(status))
+            _current.reset(token)
+            if REQUEST_LOG_ENABLED:
+                request_logger.info(json.dumps({
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_path,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in context.stages.items()},
+                    "tokens": {**context.tokens, "cost_usd": round(context.tokens["cost_usd"], 6)},
+                    "cache": context.cache,
+                }))
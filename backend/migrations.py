@@ -0,0 +1,40 @@
+"""
+Additive schema upgrades for existing databases.
+
+create_all() only creates missing tables; it never touches tables that already
+exist. upgrade_schema() also adds columns and indexes that were added to the
+models later, so an old database.db keeps working without a migration tool.
+Columns are added as nullable; rows written before the upgrade get NULL.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from database import Base
+import models  # noqa: F401  (registers tables on Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(engine: Engine):
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+            logger.info("Added column %s.%s", table.name, column.name)
+
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                logger.info("Created index %s", index.name)
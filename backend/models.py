@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Text
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Text, DateTime, Index, LargeBinary
 from database import Base
 from sqlalchemy.orm import relationship
+from blob_codec import decode_blob
 
 class User(Base):
     __tablename__ = "users"
@@ -18,18 +21,31 @@ class Resume(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, index=True)
-    extracted_data = Column(JSON)  # store parsed resume content
+    extracted_data = Column(JSON)  # legacy inline copy; new rows keep the parsed resume in json_blobs
+    extracted_blob_hash = Column(String, ForeignKey("json_blobs.content_hash"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="resumes")
     customizations = relationship("ResumeCustomization", back_populates="resume")
+    extracted_blob = relationship("JsonBlob")
+
+    @property
+    def extracted_json(self) -> Optional[str]:
+        if self.extracted_blob_hash is not None:
+            return self.extracted_blob.text
+        return self.extracted_data
 
 class ResumeCustomization(Base):
     __tablename__ = "resume_customizations"
 
     id = Column(Integer, primary_key=True, index=True)
-    job_post_text = Column(Text, nullable=False)
-    customized_data = Column(JSON, nullable=False)
+    job_post_text = Column(Text, nullable=False)  # legacy inline copy; "" for rows linked to job_posts
+    job_post_id = Column(Integer, ForeignKey("job_posts.id"))
+    # What produced it (LLM prompt/model or local ranker version); NULL for legacy rows
+    prompt_version = Column(String)
+    customized_data = Column(JSON, nullable=False)  # legacy inline copy; JSON null once moved to json_blobs
+    customized_blob_hash = Column(String, ForeignKey("json_blobs.content_hash"), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
     # Foreign Keys
     resume_id = Column(Integer, ForeignKey("resumes.id"))
@@ -37,4 +53,107 @@ class ResumeCustomization(Base):
 
     # Relationships
     resume = relationship("Resume", back_populates="customizations")
-    user = relationship("User", back_populates="customizations")
\ No newline at end of file
+    user = relationship("User", back_populates="customizations")
+    customized_blob = relationship("JsonBlob")
+    job_post = relationship("JobPost")
+
+    @property
+    def customized_json(self) -> Optional[str]:
+        if self.customized_blob_hash is not None:
+            return self.customized_blob.text
+        return self.customized_data
+
+    __table_args__ = (
+        # Keyset pagination of a user's customizations walks this index
+        Index("ix_resume_customizations_user_id_id", "user_id", "id"),
+        # Reuse lookup: same resume, same job post, same prompt version
+        Index("ix_resume_customizations_reuse", "resume_id", "job_post_id", "prompt_version"),
+    )
+
+
+class JobPost(Base):
+    __tablename__ = "job_posts"
+
+    id = Column(Integer, primary_key=True)
+    # sha256 of the normalized text; reposts with different whitespace or case match
+    text_hash = Column(String, unique=True, nullable=False)
+    text = Column(Text, nullable=False)  # as first submitted
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JsonBlob(Base):
+    __tablename__ = "json_blobs"
+
+    # sha256 of the canonical JSON; identical documents are stored once
+    content_hash = Column(String, primary_key=True)
+    codec = Column(String, nullable=False)  # "raw", "zlib" or "zstd"
+    data = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    # Blob whose content was the compression dictionary (a customization's source resume)
+    base_hash = Column(String, ForeignKey("json_blobs.content_hash"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    base = relationship("JsonBlob", remote_side=[content_hash])
+
+    @property
+    def raw_bytes(self) -> bytes:
+        base = self.base.raw_bytes if self.base_hash is not None else None
+        return decode_blob(self.codec, self.data, base)
+
+    @property
+    def text(self) -> str:
+        return self.raw_bytes.decode("utf-8")
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+
+    # sha256 of (pdf content hash, prompt version, schema version, model name)
+    cache_key = Column(String, primary_key=True)
+    content_hash = Column(String, index=True)
+    extracted_data = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    kind = Column(String, index=True, nullable=False)
+    status = Column(String, index=True, nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow, index=True)
+    locked_by = Column(String)
+    locked_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+
+class LayoutTemplate(Base):
+    __tablename__ = "layout_templates"
+
+    # sha256 of (layout image hash, template prompt version, model name)
+    cache_key = Column(String, primary_key=True)
+    image_hash = Column(String, index=True, nullable=False)
+    template = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SessionToken(Base):
+    __tablename__ = "session_tokens"
+
+    token_hash = Column(String, primary_key=True)  # sha256 of the bearer token
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
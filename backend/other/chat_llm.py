@@ -2,29 +2,20 @@ from langgraph.graph import StateGraph, MessagesState
 from langgraph.constants import START, END
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.store.memory import InMemoryStore
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_ollama import ChatOllama
+from llm_clients import chat_model
 
     
 from dotenv import load_dotenv
-import os
 
 # ---------------- Load env ----------------
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
 checkpoint = InMemorySaver()
 store = InMemoryStore()
 
 # ---------------- Models ----------------
-gemini_model = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash", api_key=GEMINI_API_KEY
-)
-ollama_model = ChatOllama(model="gemma3n", disable_streaming=False)
-
-# fallback: if Gemini fails, use Ollama
-model = gemini_model.with_fallbacks([ollama_model])
+# Shared client from llm_clients; if Gemini fails or its circuit is open, use Ollama
+model = chat_model(fallback="ollama")
 
 # Define the function that calls the model
 async def call_model(state: MessagesState, config):
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from executors import PDF_RENDER_WORKERS, PDF_RENDER_EXECUTOR, limited, process_context
+from metrics import record_cache
+
+# ---------------- Config ----------------
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_RENDER_WARM_ON_STARTUP = os.getenv("PDF_RENDER_WARM_ON_STARTUP", "1") == "1"
+
+A4_STYLESHEET = """
+    @page {
+        size: A4;
+        margin: 1.5cm;
+    }
+    body {
+        margin: 0 auto;
+        box-sizing: border-box;
+    }
+    * {
+        max-width: 100%;
+        box-sizing: border-box;
+    }
+"""
+
+_WARMUP_HTML = "<!DOCTYPE html><html><body><p>warm-up</p></body></html>"
+
+# ---------------- Worker side ----------------
+# Each worker process (or thread) parses the stylesheet and loads fonts once.
+_worker_state = threading.local()
+
+
+def _init_worker():
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    _worker_state.font_config = FontConfiguration()
+    _worker_state.stylesheet = CSS(string=A4_STYLESHEET, font_config=_worker_state.font_config)
+    # First render pays for fontconfig scanning and Pango setup; do it before real traffic
+    _write_pdf(_WARMUP_HTML)
+
+
+def _write_pdf(html: str) -> bytes:
+    from weasyprint import HTML
+
+    if getattr(_worker_state, "stylesheet", None) is None:
+        _init_worker()
+    return HTML(string=html).write_pdf(
+        stylesheets=[_worker_state.stylesheet], font_config=_worker_state.font_config
+    )
+
+
+def _render_in_worker(html: str):
+    start = time.perf_counter()
+    pdf_bytes = _write_pdf(html)
+    return pdf_bytes, time.perf_counter() - start
+
+
+# ---------------- API side ----------------
+
+class _PdfCache:
+    """LRU cache of rendered PDFs keyed by HTML sha256, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf_bytes = self._items.get(key)
+            if pdf_bytes is not None:
+                self._items.move_to_end(key)
+            return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = pdf_bytes
+            self._size += len(pdf_bytes)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "size_bytes": self._size}
+
+
+class PdfRenderService:
+    """
+    Renders HTML to PDF on a pool of pre-warmed WeasyPrint workers, with an
+    in-memory cache of PDF bytes and queue-depth / render-time metrics.
+    """
+
+    def __init__(self, workers: int = PDF_RENDER_WORKERS, executor: str = PDF_RENDER_EXECUTOR,
+                 cache_max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.workers = workers
+        self.executor = executor
+        self.cache = _PdfCache(cache_max_bytes)
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._counters = {"renders": 0, "errors": 0, "cache_hits": 0, "cache_misses": 0}
+        self._render_seconds = deque(maxlen=1000)  # time inside WeasyPrint
+        self._total_seconds = deque(maxlen=1000)   # including time waiting for a worker
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.executor == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=_init_worker, mp_context=process_context(),
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-render",
+                                                    initializer=_init_worker)
+            return self._pool
+
+    def warm_up(self, wait: bool = True):
+        """
+        Starts every worker so the first real request does not pay for startup.
+        """
+        futures = [self._get_pool().submit(_render_in_worker, _WARMUP_HTML) for _ in range(self.workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def _submit(self, html: str) -> Future:
+        with self._stats_lock:
+            self._queued += 1
+        future = self._get_pool().submit(_render_in_worker, html)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        with self._stats_lock:
+            self._queued -= 1
+            if future.exception() is None:
+                self._counters["renders"] += 1
+                self._render_seconds.append(future.result()[1])
+            else:
+                self._counters["errors"] += 1
+
+    def _lookup(self, html: str):
+        key = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        pdf_bytes = self.cache.get(key)
+        with self._stats_lock:
+            self._counters["cache_hits" if pdf_bytes is not None else "cache_misses"] += 1
+        record_cache("pdf", pdf_bytes is not None)
+        return key, pdf_bytes
+
+    def _store(self, key: str, pdf_bytes: bytes, started: float):
+        self.cache.put(key, pdf_bytes)
+        with self._stats_lock:
+            self._total_seconds.append(time.perf_counter() - started)
+
+    def render(self, html: str) -> bytes:
+        started = time.perf_counter()
+        key, pdf_bytes = self._lookup(html)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        pdf_bytes, _ = self._submit(html).result()
+        self._store(key, pdf_bytes, started)
+        return pdf_bytes
+
+    async def arender(self, html: str) -> bytes:
+        started = time.perf_counter()
+        key, pdf_bytes = self._lookup(html)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        async with limited("pdf_render"):
+            pdf_bytes, _ = await asyncio.wrap_future(self._submit(html))
+        self._store(key, pdf_bytes, started)
+        return pdf_bytes
+
+    def stats(self) -> dict:
+        def summary(samples):
+            ordered = sorted(samples)
+            if not ordered:
+                return {"count": 0}
+            return {
+                "count": len(ordered),
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+
+        with self._stats_lock:
+            stats = {
+                "workers": self.workers,
+                "executor": self.executor,
+                "queue_depth": self._queued,
+                **self._counters,
+                "render_time": summary(self._render_seconds),
+                "end_to_end_time": summary(self._total_seconds),
+            }
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+pdf_render_service = PdfRenderService()
+
+
+def render_pdf(html: str) -> bytes:
+    return pdf_render_service.render(html)
+
+
+async def arender_pdf(html: str) -> bytes:
+    return await pdf_render_service.arender(html)
@@ -0,0 +1,184 @@
+import os
+import re
+from collections import Counter, deque
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional
+
+from executors import get_pool, PDF_PAGES_WORKERS
+
+# ---------------- Config ----------------
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+PDF_MAX_TEXT_CHARS = int(os.getenv("PDF_MAX_TEXT_CHARS", "200000"))
+# Documents with at least this many pages are split across the pdf_pages process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+# Bump when the text produced for the same PDF changes, so cached extractions are invalidated
+TEXT_ENGINE_VERSION = "2"
+
+# Header/footer detection looks at this many lines at the top and bottom of each page
+_EDGE_LINES = 2
+# ...and only over the first pages, so page text can still be streamed afterwards
+_HEADER_SAMPLE_PAGES = 6
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+class PdfBudgetError(ValueError):
+    pass
+
+
+def _check_file_budget(file_path: str, max_bytes: int):
+    size = os.path.getsize(file_path)
+    if size > max_bytes:
+        raise PdfBudgetError(f"PDF is {size} bytes, the limit is {max_bytes} bytes")
+
+
+# Per-process reader reused across the page ranges of one document
+_worker_reader: dict = {}
+
+
+def _pdf_reader(file_path: str):
+    # Imported on first use to keep API startup fast
+    from pypdf import PdfReader
+    return PdfReader(file_path)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    # Runs in a pdf_pages worker process
+    key = (file_path, os.path.getmtime(file_path))
+    if _worker_reader.get("key") != key:
+        _worker_reader["key"] = key
+        _worker_reader["reader"] = _pdf_reader(file_path)
+    reader = _worker_reader["reader"]
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_page_texts(
+    file_path: str,
+    max_pages: int = PDF_MAX_PAGES,
+    max_bytes: int = PDF_MAX_BYTES,
+    parallel: Optional[bool] = None,
+) -> Iterator[str]:
+    """
+    Yields the raw text of each page, in order, up to `max_pages` pages.
+
+    Args:
+        file_path (str): Path to the PDF file.
+        max_pages (int): Pages past this are ignored.
+        max_bytes (int): Files larger than this raise PdfBudgetError before parsing.
+        parallel (bool, optional): Force or disable the process pool. By default it is
+            used once the document has PDF_PARALLEL_MIN_PAGES pages and more than one
+            worker is configured.
+    """
+    _check_file_budget(file_path, max_bytes)
+    reader = _pdf_reader(file_path)
+    page_count = min(len(reader.pages), max_pages)
+    if parallel is None:
+        parallel = PDF_PAGES_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+    if not parallel:
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    # Keep a bounded window of page ranges in flight so a consumer that stops
+    # early (e.g. on the character budget) does not pay for the whole document
+    pool = get_pool("pdf_pages")
+    window = 2 * PDF_PAGES_WORKERS
+    pending = deque()
+    try:
+        for start in range(0, page_count, PDF_PAGES_PER_TASK):
+            stop = min(start + PDF_PAGES_PER_TASK, page_count)
+            pending.append(pool.submit(_extract_page_range, file_path, start, stop))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _normalize_line(line: str) -> str:
+    # "Page 3 of 7" and "Page 4 of 7" should count as the same footer
+    return _SPACES.sub(" ", _DIGITS.sub("#", line)).strip().lower()
+
+
+def _edge_lines(page: str) -> List[str]:
+    lines = [line for line in page.splitlines() if line.strip()]
+    if len(lines) <= 2 * _EDGE_LINES:
+        return lines
+    return lines[:_EDGE_LINES] + lines[-_EDGE_LINES:]
+
+
+def find_repeated_lines(pages: List[str], min_ratio: float = 0.6) -> set:
+    """
+    Returns normalized lines that appear at the top or bottom of at least
+    `min_ratio` of the pages. Needs three or more pages to say anything.
+    """
+    if len(pages) < 3:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({_normalize_line(line) for line in _edge_lines(page)})
+    threshold = max(2, int(len(pages) * min_ratio + 0.5))
+    return {line for line, count in counts.items() if count >= threshold and line}
+
+
+def strip_lines(page: str, repeated: set) -> str:
+    if not repeated:
+        return page
+    edges = set(_edge_lines(page))
+    return "\n".join(
+        line for line in page.splitlines()
+        if not (line in edges and _normalize_line(line) in repeated)
+    )
+
+
+def iter_pdf_text(
+    file_path: str,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_TEXT_CHARS,
+    max_bytes: int = PDF_MAX_BYTES,
+    strip_headers: bool = True,
+    parallel: Optional[bool] = None,
+) -> Iterator[str]:
+    """
+    Streams cleaned page text. Repeated headers/footers are learned from the first
+    pages and removed from every page; output stops once `max_chars` is reached.
+    """
+    pages = iter_page_texts(file_path, max_pages=max_pages, max_bytes=max_bytes, parallel=parallel)
+
+    repeated = set()
+    if strip_headers:
+        head = [page for _, page in zip(range(_HEADER_SAMPLE_PAGES), pages)]
+        repeated = find_repeated_lines(head)
+        pages = chain(head, pages)
+
+    yield from _take_chars((strip_lines(page, repeated) for page in pages), max_chars)
+
+
+def _take_chars(pages: Iterable[str], max_chars: int) -> Iterator[str]:
+    remaining = max_chars
+    for page in pages:
+        if remaining <= 0:
+            return
+        page = page[:remaining]
+        remaining -= len(page)
+        yield page
+
+
+def extract_text_from_pdf(file_path: str, **kwargs) -> str:
+    """
+    Extracts text from a PDF file within the configured page, byte and character budgets.
+
+    Args:
+        file_path (str): Path to the PDF file.
+        **kwargs: Overrides passed to iter_pdf_text.
+
+    Returns:
+        str: Extracted text from all pages.
+    """
+    return "\n".join(iter_pdf_text(file_path, **kwargs)).strip()
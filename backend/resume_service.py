@@ -0,0 +1,333 @@
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import User, Resume, ResumeCustomization, JobPost
+from change_resume_json import change_resume_json, achange_resume_json, CUSTOMIZE_PROMPT_VERSION
+from artifact_store import artifact_store
+from blob_store import put_json, load_json_texts
+from job_posts import get_or_create_job_post, find_reusable_customizations
+from resume_models import ResumeExtractionData
+from similarity_index import similarity_index, SIMILARITY_VERSION, SIMILARITY_WARM_START_MIN_SCORE
+from skill_ranker import rank_resume_skills, LOCAL_RANK_MIN_CONFIDENCE, LOCAL_RANK_VERSION
+from metrics import record_cache, span
+
+# "local": rank skills without a model call; "llm": always ask the model;
+# "auto": rank locally and fall back to the model when confidence is low
+CUSTOMIZE_STRATEGIES = ("llm", "local", "auto")
+
+# Listing customizations
+CUSTOMIZATIONS_PAGE_SIZE = int(os.getenv("CUSTOMIZATIONS_PAGE_SIZE", "50"))
+CUSTOMIZATIONS_MAX_PAGE_SIZE = int(os.getenv("CUSTOMIZATIONS_MAX_PAGE_SIZE", "200"))
+SUMMARY_SNIPPET_CHARS = int(os.getenv("SUMMARY_SNIPPET_CHARS", "120"))
+CUSTOMIZATION_FIELDS = ("id", "resume_id", "job_post_text", "customized_data", "created_at")
+
+
+# Shared by the HTTP endpoints in main.py and the background job handlers in job_handlers.py
+
+def get_user(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(User.username == username).first()
+
+
+def get_latest_resume(db: Session, user_id: int) -> Optional[Resume]:
+    return db.query(Resume).filter(Resume.user_id == user_id).order_by(Resume.id.desc()).first()
+
+
+def save_resume(db: Session, user_id: int, filename: str, extracted: str) -> Resume:
+    resume = Resume(filename=filename, extracted_blob_hash=put_json(db, extracted), user_id=user_id)
+    db.add(resume)
+    db.commit()
+    db.refresh(resume)
+    return resume
+
+
+def _check_strategy(strategy: str):
+    if strategy not in CUSTOMIZE_STRATEGIES:
+        raise ValueError(f"Unknown customization mode: {strategy}")
+
+
+def customization_version(used: str) -> str:
+    """prompt_version stored on a customization produced by the "local", "llm" or "warm_start" engine."""
+    if used == "warm_start":
+        return f"warm_start:{SIMILARITY_VERSION}"
+    return LOCAL_RANK_VERSION if used == "local" else CUSTOMIZE_PROMPT_VERSION
+
+
+def reusable_versions(strategy: str) -> List[str]:
+    """Stored customizations a request with `strategy` may return instead of recomputing, best first."""
+    _check_strategy(strategy)
+    if strategy == "llm":
+        return [CUSTOMIZE_PROMPT_VERSION]
+    if strategy == "local":
+        return [LOCAL_RANK_VERSION]
+    return [CUSTOMIZE_PROMPT_VERSION, LOCAL_RANK_VERSION]
+
+
+def engine_of(customization: ResumeCustomization) -> str:
+    return customization.prompt_version.split(":", 1)[0]
+
+
+def _local_customization(resume_json: str, job_post: str, strategy: str) -> Optional[str]:
+    _check_strategy(strategy)
+    if strategy == "llm":
+        return None
+    updated_json, confidence = rank_resume_skills(resume_json, job_post)
+    if strategy == "local" or confidence >= LOCAL_RANK_MIN_CONFIDENCE:
+        return updated_json
+    return None
+
+
+def customize_json(resume_json: str, job_post: str, strategy: str = "llm") -> Tuple[str, str]:
+    """
+    Returns (customized resume JSON, "local" or "llm") for the chosen strategy.
+    """
+    updated_json = _local_customization(resume_json, job_post, strategy)
+    if updated_json is not None:
+        return updated_json, "local"
+    return change_resume_json(resume_json, job_post), "llm"
+
+
+async def acustomize_json(resume_json: str, job_post: str, strategy: str = "llm") -> Tuple[str, str]:
+    updated_json = None
+    if strategy != "llm":
+        # Ranking is CPU work; a batch runs it for every post, so keep it off the event loop
+        updated_json = await asyncio.to_thread(_local_customization, resume_json, job_post, strategy)
+    if updated_json is not None:
+        return updated_json, "local"
+    return await achange_resume_json(resume_json, job_post), "llm"
+
+
+def _warm_started_json(db: Session, user_id: int, resume_json: str, job_post: str) -> Optional[str]:
+    """
+    Takes the skills of the customization made for the most similar past job post and
+    applies them to the current resume. Skills the resume no longer has are dropped;
+    returns None when there is no close enough neighbour or too little overlap.
+    """
+    neighbours = similarity_index.search(db, user_id, job_post, k=1)
+    if not neighbours or neighbours[0].score < SIMILARITY_WARM_START_MIN_SCORE:
+        return None
+    neighbour = db.get(ResumeCustomization, neighbours[0].customization_id)
+    if neighbour is None or neighbour.customized_json is None:
+        return None
+
+    resume = ResumeExtractionData.model_validate_json(resume_json)
+    neighbour_skills = ResumeExtractionData.model_validate_json(neighbour.customized_json).skills
+    available = {skill.casefold(): skill for skill in resume.skills}
+    skills = [available[s.casefold()] for s in neighbour_skills if s.casefold() in available]
+    if not skills or len(skills) * 2 < len(neighbour_skills):
+        return None
+    resume.skills = list(dict.fromkeys(skills))
+    return resume.model_dump_json()
+
+
+def customize_latest_resume(
+    db: Session, user_id: int, job_post: str, strategy: str = "llm", warm_start: bool = False
+) -> Tuple[ResumeCustomization, str, bool]:
+    """
+    Tailors the user's latest resume to `job_post` and saves the customization.
+    Returns the row, which engine ("local", "llm" or "warm_start") produced it and
+    whether it was reused: when this resume was already tailored to the same
+    (normalized) job post with the current prompt version, that row is returned
+    without a model call. With `warm_start`, a near-duplicate past job post lends
+    its customized skills instead of running `strategy`.
+    Raises ValueError when the user has no resume yet or the strategy is unknown.
+    """
+    resume = get_latest_resume(db, user_id)
+    if not resume:
+        raise ValueError("No resume found for this user")
+
+    with span("customization_lookup"):
+        existing = find_reusable_customizations(db, resume.id, [job_post], reusable_versions(strategy)).get(0)
+    record_cache("customization", existing is not None)
+    if existing is not None:
+        return existing, engine_of(existing), True
+
+    updated_json = _warm_started_json(db, user_id, resume.extracted_json, job_post) if warm_start else None
+    if updated_json is not None:
+        used = "warm_start"
+    else:
+        updated_json, used = customize_json(resume.extracted_json, job_post, strategy)
+    with span("db_save"):
+        customization = _new_customization(
+            db, resume.id, resume.extracted_blob_hash, user_id, job_post, updated_json, used
+        )
+        db.add(customization)
+        db.commit()
+        db.refresh(customization)
+    similarity_index.add(user_id, customization.id, customization.job_post_id, job_post)
+    return customization, used, False
+
+
+def _new_customization(
+    db: Session, resume_id: int, base_hash: Optional[str], user_id: int, job_post: str, updated_json: str, used: str
+) -> ResumeCustomization:
+    return ResumeCustomization(
+        job_post_text="",
+        job_post_id=get_or_create_job_post(db, job_post).id,
+        prompt_version=customization_version(used),
+        customized_data=None,
+        customized_blob_hash=put_json(db, updated_json, base_hash=base_hash),
+        resume_id=resume_id,
+        user_id=user_id,
+    )
+
+
+async def customize_many(
+    resume_json: str,
+    job_posts: List[str],
+    concurrency: int,
+    strategy: str = "llm"
+) -> AsyncIterator[Tuple[int, Optional[str], Optional[str], Optional[Exception]]]:
+    """
+    Tailors one resume to many job posts concurrently, at most `concurrency` LLM
+    calls at a time, yielding (index, customized_json, engine, error) as each one finishes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, job_post: str):
+        async with semaphore:
+            try:
+                updated_json, used = await acustomize_json(resume_json, job_post, strategy)
+                return index, updated_json, used, None
+            except Exception as e:
+                return index, None, None, e
+
+    tasks = [asyncio.create_task(run(i, post)) for i, post in enumerate(job_posts)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def save_customizations(db: Session, resume_id: int, user_id: int, rows: List[Tuple[str, str, str]]) -> List[int]:
+    """
+    Inserts (job_post, customized_json, engine) rows for one resume in a single
+    transaction and returns their ids in the same order.
+    """
+    resume = db.get(Resume, resume_id)
+    base_hash = resume.extracted_blob_hash if resume is not None else None
+    customizations = [
+        _new_customization(db, resume_id, base_hash, user_id, job_post, data, used)
+        for job_post, data, used in rows
+    ]
+    db.add_all(customizations)
+    db.flush()
+    ids = [c.id for c in customizations]
+    post_ids = [c.job_post_id for c in customizations]
+    db.commit()
+    for customization_id, job_post_id, (job_post, _, _) in zip(ids, post_ids, rows):
+        similarity_index.add(user_id, customization_id, job_post_id, job_post)
+    return ids
+
+
+def similar_customizations(db: Session, user_id: int, job_post: str, k: int = 5) -> List[dict]:
+    """
+    The user's past customizations for the job posts closest to `job_post`, best first.
+    """
+    neighbours = similarity_index.search(db, user_id, job_post, k=k)
+    if not neighbours:
+        return []
+    rows = {
+        row.id: row
+        for row in db.query(
+            ResumeCustomization.id,
+            ResumeCustomization.job_post_id,
+            func.substr(func.coalesce(JobPost.text, ResumeCustomization.job_post_text), 1, SUMMARY_SNIPPET_CHARS)
+            .label("job_post_snippet"),
+            ResumeCustomization.created_at,
+        )
+        .outerjoin(JobPost, ResumeCustomization.job_post_id == JobPost.id)
+        .filter(ResumeCustomization.id.in_([n.customization_id for n in neighbours]))
+    }
+    return [
+        {
+            "customization_id": n.customization_id,
+            "score": n.score,
+            "job_post_snippet": rows[n.customization_id].job_post_snippet,
+            "created_at": rows[n.customization_id].created_at.isoformat()
+            if rows[n.customization_id].created_at else None,
+        }
+        for n in neighbours
+        if n.customization_id in rows
+    ]
+
+
+def list_customizations(
+    db: Session,
+    user_id: int,
+    cursor: Optional[int] = None,
+    limit: int = CUSTOMIZATIONS_PAGE_SIZE,
+    fields: Optional[Sequence[str]] = None,
+    summary: bool = False,
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    Returns one page of a user's customizations, newest first, and the cursor for the next page.
+
+    Pages are keyed on id (WHERE id < cursor) over the (user_id, id) index, so every page
+    costs the same no matter how deep it is. Only the requested columns are selected.
+
+    Args:
+        db (Session): Database session.
+        user_id (int): Owner of the customizations.
+        cursor (Optional[int]): next_cursor from the previous page; None for the first page.
+        limit (int): Page size, capped at CUSTOMIZATIONS_MAX_PAGE_SIZE.
+        fields (Optional[Sequence[str]]): Subset of CUSTOMIZATION_FIELDS; id is always included.
+        summary (bool): Return only id, a job post snippet and created_at.
+
+    Returns:
+        Tuple[List[dict], Optional[int]]: The rows and the next cursor (None on the last page).
+    """
+    # Rows linked to job_posts keep an empty legacy job_post_text
+    job_post_text = func.coalesce(JobPost.text, ResumeCustomization.job_post_text)
+    if summary:
+        columns = [
+            ResumeCustomization.id,
+            func.substr(job_post_text, 1, SUMMARY_SNIPPET_CHARS).label("job_post_snippet"),
+            ResumeCustomization.created_at,
+        ]
+    else:
+        fields = list(fields or CUSTOMIZATION_FIELDS)
+        unknown = [f for f in fields if f not in CUSTOMIZATION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        names = ["id"] + [f for f in CUSTOMIZATION_FIELDS if f in fields and f != "id"]
+        columns = [
+            job_post_text.label(name) if name == "job_post_text" else getattr(ResumeCustomization, name)
+            for name in names
+        ]
+        if "customized_data" in names:
+            columns.append(ResumeCustomization.customized_blob_hash)
+
+    limit = max(1, min(limit, CUSTOMIZATIONS_MAX_PAGE_SIZE))
+    query = (
+        db.query(*columns)
+        .select_from(ResumeCustomization)
+        .outerjoin(JobPost, ResumeCustomization.job_post_id == JobPost.id)
+        .filter(ResumeCustomization.user_id == user_id)
+    )
+    if cursor is not None:
+        query = query.filter(ResumeCustomization.id < cursor)
+    rows = query.order_by(ResumeCustomization.id.desc()).limit(limit + 1).all()
+
+    items = [row._asdict() for row in rows[:limit]]
+    if items and "customized_blob_hash" in items[0]:
+        texts = load_json_texts(db, (item["customized_blob_hash"] for item in items))
+        for item in items:
+            blob_hash = item.pop("customized_blob_hash")
+            if blob_hash is not None:
+                item["customized_data"] = texts.get(blob_hash)
+    for item in items:
+        if item.get("created_at") is not None:
+            item["created_at"] = item["created_at"].isoformat()
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return items, next_cursor
+
+
+def save_pdf(pdf_bytes: bytes) -> str:
+    """
+    Stores a rendered PDF in the artifact store and returns its /download_pdf URL.
+    """
+    return f"/download_pdf/{artifact_store.save(pdf_bytes, extension='pdf')}"
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import Form, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import SessionToken, User
+
+# ---------------- Config ----------------
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+# How long a resolved token or username is trusted without going back to the DB.
+# A revoked token stays usable in other processes for at most this long.
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "300"))
+# Accept the legacy `username` form/query field when no bearer token is sent. It proves
+# nothing about the caller, so only turn it on while migrating old clients.
+ALLOW_USERNAME_AUTH = os.getenv("ALLOW_USERNAME_AUTH", "0") == "1"
+
+
+@dataclass(frozen=True)
+class SessionUser:
+    id: int
+    username: str
+
+
+_cache_lock = threading.Lock()
+# token hash -> (SessionUser, expires_at)
+_token_cache: TTLCache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+# username -> SessionUser. The API never renames or deletes users, but the TTL still bounds
+# how long a user changed directly in the database keeps resolving under the old name.
+# Username auth has no session, so there is nothing to revoke here.
+_username_cache: TTLCache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+
+
+def _hash_token(token: str) -> str:
+    # Only hashes are stored, so a leaked database does not leak live sessions
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_token(db: Session, user: User) -> str:
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + timedelta(seconds=SESSION_TTL_SECONDS)
+    db.add(SessionToken(token_hash=_hash_token(token), user_id=user.id, expires_at=expires_at))
+    db.commit()
+    with _cache_lock:
+        _token_cache[_hash_token(token)] = (SessionUser(user.id, user.username), expires_at)
+    return token
+
+
+def revoke_token(db: Session, token: str):
+    token_hash = _hash_token(token)
+    db.query(SessionToken).filter(SessionToken.token_hash == token_hash).delete(synchronize_session=False)
+    db.commit()
+    with _cache_lock:
+        _token_cache.pop(token_hash, None)
+
+
+def resolve_token(token: str) -> Optional[SessionUser]:
+    """
+    Maps a bearer token to its user. Cache hits never touch the database.
+    """
+    token_hash = _hash_token(token)
+    with _cache_lock:
+        cached = _token_cache.get(token_hash)
+    if cached is None:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(SessionToken.expires_at, User.id, User.username)
+                .join(User, User.id == SessionToken.user_id)
+                .filter(SessionToken.token_hash == token_hash)
+                .first()
+            )
+        finally:
+            db.close()
+        if row is None:
+            return None
+        cached = (SessionUser(row.id, row.username), row.expires_at)
+        with _cache_lock:
+            _token_cache[token_hash] = cached
+
+    user, expires_at = cached
+    if expires_at < datetime.utcnow():
+        return None
+    return user
+
+
+def resolve_username(username: str) -> Optional[SessionUser]:
+    with _cache_lock:
+        user = _username_cache.get(username)
+    if user is not None:
+        return user
+
+    db = SessionLocal()
+    try:
+        row = db.query(User.id, User.username).filter(User.username == username).first()
+    finally:
+        db.close()
+    if row is None:
+        return None
+    user = SessionUser(row.id, row.username)
+    with _cache_lock:
+        _username_cache[username] = user
+    return user
+
+
+def _resolve(authorization: Optional[str], username: Optional[str]) -> SessionUser:
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        user = resolve_token(token.strip()) if scheme.lower() == "bearer" else None
+        if user is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired session token",
+                                headers={"WWW-Authenticate": "Bearer"})
+        return user
+
+    if username and ALLOW_USERNAME_AUTH:
+        user = resolve_username(username)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
+    raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+
+def current_user(
+    authorization: Optional[str] = Header(None),
+    username: Optional[str] = Form(None),
+) -> SessionUser:
+    """FastAPI dependency for form endpoints."""
+    return _resolve(authorization, username)
+
+
+def current_user_query(
+    authorization: Optional[str] = Header(None),
+    username: Optional[str] = Query(None),
+) -> SessionUser:
+    """FastAPI dependency for GET endpoints that took `username` as a query parameter."""
+    return _resolve(authorization, username)
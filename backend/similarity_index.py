@@ -0,0 +1,180 @@
+import math
+import os
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import JobPost, ResumeCustomization
+from skill_ranker import tokenize, vocabulary
+
+# ---------------- Config ----------------
+SIMILARITY_DIM = int(os.getenv("SIMILARITY_DIM", "4096"))
+# Per-user indexes kept in memory; the least recently used user is dropped first
+SIMILARITY_MAX_USERS = int(os.getenv("SIMILARITY_MAX_USERS", "1000"))
+# /customize_resume warm-starts only from a neighbour at least this similar
+SIMILARITY_WARM_START_MIN_SCORE = float(os.getenv("SIMILARITY_WARM_START_MIN_SCORE", "0.8"))
+
+# Bump when embed() changes; stored with warm-started customizations
+SIMILARITY_VERSION = f"hash{SIMILARITY_DIM}-2"
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "our", "the", "to", "we", "will", "with", "you", "your", "this", "that", "who", "have", "has",
+}
+_CONCEPT_WEIGHT = 2.0
+
+
+def embed(text: str, dim: int = SIMILARITY_DIM) -> np.ndarray:
+    """
+    Offline embedding of a job post: signed feature hashing of words, word bigrams and
+    known skill concepts, with sublinear term frequency, L2-normalized. No model, no fit;
+    the same text always maps to the same vector.
+    """
+    tokens = [t for t in tokenize(text) if t not in _STOPWORDS]
+    features = Counter(f"w:{t}" for t in tokens)
+    features.update(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    concepts = Counter(f"c:{c}" for c in vocabulary.concepts_in(tokens))
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for counts, weight in ((features, 1.0), (concepts, _CONCEPT_WEIGHT)):
+        for feature, count in counts.items():
+            # crc32 is stable across processes, unlike hash()
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % dim] += sign * weight * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+@dataclass
+class Neighbour:
+    customization_id: int
+    job_post_id: Optional[int]
+    score: float
+
+
+class _UserIndex:
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.ids = np.zeros(16, dtype=np.int64)
+        self.post_keys: List[int] = []
+        self.count = 0
+        # Every customization id <= synced_id is loaded; newer ones added directly are in `extra`
+        self.synced_id = 0
+        self.extra: Set[int] = set()
+
+    def append(self, customization_id: int, post_key: int, vector: np.ndarray) -> bool:
+        if customization_id <= self.synced_id or customization_id in self.extra:
+            return False
+        if self.count == len(self.ids):
+            # Amortized O(1) growth; rows are never rebuilt
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.ids = np.concatenate([self.ids, np.zeros_like(self.ids)])
+        self.vectors[self.count] = vector
+        self.ids[self.count] = customization_id
+        self.post_keys.append(post_key)
+        self.count += 1
+        self.extra.add(customization_id)
+        return True
+
+
+class SimilarityIndex:
+    """
+    Per-user in-memory vector index over past job posts. A user's index is loaded from the
+    database on first use and then only grows: inserts are appended as they happen, and each
+    search first pulls any rows written by other processes since the last sync.
+    """
+
+    def __init__(self, dim: int = SIMILARITY_DIM, max_users: int = SIMILARITY_MAX_USERS):
+        self.dim = dim
+        self.max_users = max_users
+        self._users: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"searches": 0, "rows_loaded": 0, "rows_added": 0}
+
+    def _user_index(self, user_id: int) -> _UserIndex:
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = self._users[user_id] = _UserIndex(self.dim)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            self._users.move_to_end(user_id)
+            return index
+
+    def _sync(self, db: Session, user_id: int, index: _UserIndex):
+        with self._lock:
+            synced_id = index.synced_id
+        rows = (
+            db.query(
+                ResumeCustomization.id,
+                ResumeCustomization.job_post_id,
+                func.coalesce(JobPost.text, ResumeCustomization.job_post_text),
+            )
+            .outerjoin(JobPost, ResumeCustomization.job_post_id == JobPost.id)
+            .filter(ResumeCustomization.user_id == user_id, ResumeCustomization.id > synced_id)
+            .order_by(ResumeCustomization.id)
+            .all()
+        )
+        if not rows:
+            return
+        vectors = [embed(text or "", self.dim) for _, _, text in rows]
+        with self._lock:
+            for (customization_id, job_post_id, _), vector in zip(rows, vectors):
+                if index.append(customization_id, job_post_id or -customization_id, vector):
+                    self._counters["rows_loaded"] += 1
+            index.synced_id = max(index.synced_id, rows[-1][0])
+            index.extra = {i for i in index.extra if i > index.synced_id}
+
+    def add(self, user_id: int, customization_id: int, job_post_id: Optional[int], text: str):
+        """Appends a new customization to an already-loaded user index; unloaded users load lazily."""
+        with self._lock:
+            index = self._users.get(user_id)
+        if index is None:
+            return
+        vector = embed(text, self.dim)
+        with self._lock:
+            if index.append(customization_id, job_post_id or -customization_id, vector):
+                self._counters["rows_added"] += 1
+
+    def search(self, db: Session, user_id: int, text: str, k: int = 5) -> List[Neighbour]:
+        """
+        The user's past customizations whose job posts are most similar to `text`, one per
+        distinct job post (its latest customization), highest cosine similarity first.
+        """
+        index = self._user_index(user_id)
+        self._sync(db, user_id, index)
+        query = embed(text, self.dim)
+        with self._lock:
+            self._counters["searches"] += 1
+            if index.count == 0:
+                return []
+            scores = index.vectors[:index.count] @ query
+            ids = index.ids[:index.count].copy()
+            post_keys = list(index.post_keys)
+
+        best: Dict[int, Neighbour] = {}
+        for row in range(len(ids)):
+            key = post_keys[row]
+            current = best.get(key)
+            if current is None or ids[row] > current.customization_id:
+                best[key] = Neighbour(int(ids[row]), key if key > 0 else None, round(float(scores[row]), 4))
+        return sorted(best.values(), key=lambda n: -n.score)[:k]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "rows": sum(index.count for index in self._users.values()),
+                "dim": self.dim,
+                **self._counters,
+            }
+
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from resume_models import ResumeExtractionData
+
+# ---------------- Config ----------------
+# Below this confidence, "auto" customization falls back to the LLM
+LOCAL_RANK_MIN_CONFIDENCE = float(os.getenv("LOCAL_RANK_MIN_CONFIDENCE", "0.5"))
+# A job post mentioning this many known skills gives full confidence
+_FULL_SIGNAL_CONCEPTS = 5
+
+# Canonical skill -> aliases that mean the same thing in a job post or resume
+SKILL_SYNONYMS: Dict[str, List[str]] = {
+    "python": ["python3"],
+    "java": [],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": [],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "rust": [],
+    "ruby": ["ruby on rails", "rails"],
+    "php": ["laravel"],
+    "sql": ["structured query language"],
+    "postgresql": ["postgres", "psql"],
+    "mysql": ["mariadb"],
+    "sqlite": [],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search", "opensearch"],
+    "fastapi": ["fast api"],
+    "django": ["django rest framework", "drf"],
+    "flask": [],
+    "node.js": ["nodejs", "express.js"],
+    "react": ["react.js", "reactjs"],
+    "next.js": ["nextjs"],
+    "angular": ["angularjs"],
+    "vue": ["vue.js", "vuejs"],
+    "html": ["html5"],
+    "css": ["css3", "tailwind", "tailwind css", "sass", "scss"],
+    "rest apis": ["rest", "restful", "rest api", "restful apis", "api development"],
+    "graphql": [],
+    "grpc": [],
+    "docker": ["containerization"],
+    "kubernetes": ["k8s", "helm"],
+    "aws": ["amazon web services", "ec2", "s3", "aws lambda"],
+    "gcp": ["google cloud", "google cloud platform", "vertex ai", "bigquery"],
+    "azure": ["microsoft azure"],
+    "terraform": ["infrastructure as code", "iac"],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery", "github actions", "jenkins", "gitlab ci"],
+    "git": ["github", "gitlab", "version control"],
+    "linux": ["unix", "bash", "shell scripting"],
+    "celery": ["task queues"],
+    "kafka": ["apache kafka"],
+    "rabbitmq": [],
+    "spark": ["apache spark", "pyspark"],
+    "airflow": ["apache airflow"],
+    "pandas": [],
+    "numpy": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pytorch": [],
+    "tensorflow": ["keras"],
+    "hugging face": ["huggingface", "transformers", "hugging face transformers"],
+    "langchain": [],
+    "langgraph": [],
+    "llm": ["llms", "large language models", "generative ai", "genai", "gpt"],
+    "rag": ["retrieval augmented generation", "retrieval-augmented generation"],
+    "vector databases": ["vector database", "vector db", "pinecone", "chromadb", "faiss", "pgvector"],
+    "machine learning": ["ml"],
+    "deep learning": ["neural networks"],
+    "nlp": ["natural language processing"],
+    "computer vision": ["opencv", "image processing"],
+    "mlops": ["ml ops", "model deployment", "mlflow"],
+    "data analysis": ["data analytics"],
+    "data engineering": ["etl", "data pipelines"],
+    "statistics": ["statistical analysis"],
+    "tableau": ["power bi", "data visualization"],
+    "streamlit": [],
+    "microservices": ["microservice", "distributed systems"],
+    "unit testing": ["pytest", "jest", "tdd", "test driven development"],
+    "agile": ["scrum", "kanban"],
+    "figma": [],
+    "communication": ["communication skills", "stakeholder management"],
+    "leadership": ["mentoring", "team lead"],
+    "problem solving": ["problem-solving", "analytical skills"],
+}
+# Aliases that are also ordinary words ("go", "rest"); in a job post they only count
+# when spelled exactly like this
+CASE_SENSITIVE_ALIASES = {"go": "Go", "ml": "ML", "rest": "REST"}
+
+# Identifies local customizations for reuse; bump the suffix when the scoring changes
+LOCAL_RANK_VERSION = "local:" + hashlib.sha256(
+    json.dumps([SKILL_SYNONYMS, CASE_SENSITIVE_ALIASES, "2"], sort_keys=True).encode("utf-8")
+).hexdigest()[:16]
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9+#]", re.IGNORECASE)
+_MAX_NGRAM = 4
+
+
+def tokenize(text: str, keep_case: bool = False) -> List[str]:
+    """
+    Lowercase tokens, or with `keep_case` the tokens as written, except that a token
+    opening a sentence is lowercased ("Go beyond" is not the language).
+    """
+    if not keep_case:
+        return _TOKEN.findall(text.lower())
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        i = match.start() - 1
+        while i >= 0 and text[i].isspace():
+            i -= 1
+        tokens.append(match.group(0).lower() if i < 0 or text[i] in ".!?" else match.group(0))
+    return tokens
+
+
+class SkillVocabulary:
+    """
+    Prebuilt index from every alias n-gram to its canonical skill id.
+    Built once at import; lookups are plain dict hits.
+    """
+
+    def __init__(self, synonyms: Dict[str, List[str]]):
+        self.canonical: List[str] = list(synonyms)
+        self.alias_to_id: Dict[Tuple[str, ...], int] = {}
+        for concept_id, name in enumerate(self.canonical):
+            for alias in [name, *synonyms[name]]:
+                self.alias_to_id.setdefault(tuple(tokenize(alias)), concept_id)
+        self.case_sensitive = {(alias,): (spelling,) for alias, spelling in CASE_SENSITIVE_ALIASES.items()}
+
+    def concepts_in(self, tokens: List[str], cased_tokens: Optional[List[str]] = None) -> List[int]:
+        """
+        Greedy longest-match of known skills in a token stream; returns concept ids, with repeats.
+        Case-sensitive aliases only match when `cased_tokens` (the same tokens as written)
+        spell them exactly; without it they never match.
+        """
+        found, i = [], 0
+        while i < len(tokens):
+            for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+                ngram = tuple(tokens[i:i + n])
+                concept_id = self.alias_to_id.get(ngram)
+                spelling = self.case_sensitive.get(ngram)
+                if spelling is not None and (cased_tokens is None or tuple(cased_tokens[i:i + n]) != spelling):
+                    concept_id = None
+                if concept_id is not None:
+                    found.append(concept_id)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+
+vocabulary = SkillVocabulary(SKILL_SYNONYMS)
+
+
+@dataclass
+class SkillRanking:
+    skills: List[str]
+    scores: List[float]
+    confidence: float
+
+
+def _skill_terms(skill: str) -> List[str]:
+    # A skill is represented by its canonical concepts when known, else by its own words
+    # A resume's skill list is unambiguous, so "go" there is the language whatever its case
+    tokens = tokenize(skill)
+    concepts = vocabulary.concepts_in(tokens, [CASE_SENSITIVE_ALIASES.get(t, t) for t in tokens])
+    if concepts:
+        return [f"c:{c}" for c in concepts]
+    return [f"w:{t}" for t in tokens if len(t) > 2]
+
+
+def rank_skills(skills: List[str], job_post: str, keep_unmatched: bool = True) -> SkillRanking:
+    """
+    Orders resume skills by TF-IDF-style relevance to the job post, without a model call.
+
+    Each skill is a small document of concept/word terms. The job post is turned into
+    log-scaled term frequencies over the same terms, idf down-weights terms shared by
+    many skills, and the score is a normalized dot product computed in NumPy.
+
+    Args:
+        skills (List[str]): The resume's skills.
+        job_post (str): Raw job post text.
+        keep_unmatched (bool): Keep skills with no overlap at the end instead of dropping them.
+
+    Returns:
+        SkillRanking: Skills sorted by score, their scores and a 0-1 confidence.
+    """
+    if not skills:
+        return SkillRanking([], [], 0.0)
+
+    skill_terms = [_skill_terms(s) for s in skills]
+    term_index: Dict[str, int] = {}
+    for terms in skill_terms:
+        for term in terms:
+            term_index.setdefault(term, len(term_index))
+
+    matrix = np.zeros((len(skills), max(len(term_index), 1)), dtype=np.float32)
+    for row, terms in enumerate(skill_terms):
+        for term in terms:
+            matrix[row, term_index[term]] = 1.0
+
+    cased_post_tokens = tokenize(job_post, keep_case=True)
+    post_tokens = [token.lower() for token in cased_post_tokens]
+    post_concepts = vocabulary.concepts_in(post_tokens, cased_post_tokens)
+    job_tf = np.zeros(matrix.shape[1], dtype=np.float32)
+    for term in [f"c:{c}" for c in post_concepts] + [f"w:{t}" for t in post_tokens]:
+        col = term_index.get(term)
+        if col is not None:
+            job_tf[col] += 1.0
+    job_tf = np.log1p(job_tf)
+
+    doc_freq = matrix.sum(axis=0)
+    idf = np.log((1 + len(skills)) / (1 + doc_freq)) + 1.0
+    norms = np.sqrt(matrix.sum(axis=1))
+    norms[norms == 0] = 1.0
+    scores = (matrix @ (job_tf * idf)) / norms
+
+    # Stable sort keeps the resume's original order among equal scores
+    order = np.argsort(-scores, kind="stable")
+    ranked = [(skills[i], float(scores[i])) for i in order if keep_unmatched or scores[i] > 0]
+
+    matched = int((scores > 0).sum())
+    signal = min(1.0, len(set(post_concepts)) / _FULL_SIGNAL_CONCEPTS)
+    confidence = signal * min(1.0, matched / 2)
+    # Skills tied for the top score are in resume order, not by relevance
+    tied = int(np.isclose(scores, scores.max()).sum()) if matched else 0
+    if tied > 1:
+        confidence = min(confidence, 1.0 / tied)
+    confidence = round(confidence, 3)
+
+    return SkillRanking(
+        skills=[s for s, _ in ranked],
+        scores=[round(score, 4) for _, score in ranked],
+        confidence=confidence,
+    )
+
+
+def rank_resume_skills(resume_json, job_post: str) -> Tuple[str, float]:
+    """
+    Returns (customized resume JSON, confidence) with skills reordered locally.
+    Relevant skills come first; the rest keep their original order after them.
+    """
+    if isinstance(resume_json, dict):
+        resume = ResumeExtractionData.model_validate(resume_json)
+    else:
+        resume = ResumeExtractionData.model_validate_json(resume_json)
+    ranking = rank_skills(resume.skills, job_post)
+    resume.skills = ranking.skills
+    return resume.model_dump_json(), ranking.confidence
@@ -0,0 +1,86 @@
+"""
+Shared setup for the backend tests.
+
+Backend modules read their configuration from the environment at import time, so the
+environment is fixed here, before any of them is imported: the offline fake LLM
+provider, no background job workers or warm-up, and a scratch working directory with
+its own database.db, uploads/ and artifacts/. Run from backend/:
+
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="resume-tests-"))
+os.chdir(WORKDIR)
+os.environ.update({
+    "GEMINI_API_KEY": "test-placeholder",
+    "LLM_PROVIDER": "fake",
+    "LLM_FALLBACK_PROVIDER": "",
+    "LLM_REQUESTS_PER_SECOND": "0",
+    "LLM_RETRY_INITIAL_S": "0",
+    "LLM_RETRY_MAX_S": "0",
+    "DATABASE_URL": f"sqlite:///{WORKDIR / 'database.db'}",
+    "JOB_API_WORKERS": "0",
+    "JOB_RETRY_BASE_DELAY": "0",
+    "PDF_RENDER_EXECUTOR": "thread",
+    "PDF_RENDER_WARM_ON_STARTUP": "0",
+    "WARM_UP_ON_STARTUP": "off",
+    "REQUEST_LOG_ENABLED": "0",
+})
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    from database import engine
+    from migrations import upgrade_schema
+
+    upgrade_schema(engine)
+
+
+@pytest.fixture
+def db():
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Registers a fresh user and returns the Authorization header of its session."""
+    credentials = {"username": f"user-{uuid.uuid4().hex[:12]}", "password": "secret"}
+    assert client.post("/register", data=credentials).status_code == 200
+    token = client.post("/login", data=credentials).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def resume_pdf(tmp_path):
+    """Path of a small synthetic resume PDF, different for every test."""
+    from benchmarks.synthetic import make_resume_pdf
+
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_resume_pdf(uuid.uuid4().int % 100_000))
+    return path
@@ -0,0 +1,29 @@
+"""Helpers shared by the test modules."""
+import json
+from functools import lru_cache
+
+import pytest
+
+
+def parse_sse(body: str) -> list:
+    """Splits a text/event-stream body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@lru_cache(maxsize=None)
+def weasyprint_available() -> bool:
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        # OSError: the Python package is there but Pango/GObject are not
+        return False
+    return True
+
+
+requires_weasyprint = pytest.mark.skipif(
+    not weasyprint_available(), reason="WeasyPrint or its system libraries are not installed"
+)
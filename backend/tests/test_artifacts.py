@@ -0,0 +1,89 @@
+import os
+import uuid
+
+import pytest
+
+from artifact_store import ArtifactStore, LocalFSBackend, artifact_store, parse_range_header
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=50-5000", (50, 99)),
+    # Invalid or unsupported headers are ignored: the whole body is served
+    ("bytes=5-2", None),
+    ("bytes=0-1,5-9", None),
+    ("bytes=abc", None),
+    ("bytes=-", None),
+    ("items=0-9", None),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=-0", "bytes=100-", "bytes=150-200"])
+def test_unsatisfiable_ranges_raise(header):
+    with pytest.raises(ValueError):
+        parse_range_header(header, 100)
+
+
+def test_saving_identical_content_twice_survives_eviction_in_between(tmp_path):
+    store = ArtifactStore(LocalFSBackend(str(tmp_path)))
+    name = store.save(b"%PDF same")
+    assert store.save(b"%PDF same") == name
+
+    touch = store.backend.touch
+
+    def evicted_first(artifact):
+        os.remove(tmp_path / artifact)
+        touch(artifact)
+
+    store.backend.touch = evicted_first
+    assert store.save(b"%PDF same") == name
+    assert (tmp_path / name).read_bytes() == b"%PDF same"
+
+
+@pytest.fixture
+def pdf():
+    data = b"%PDF-1.4 " + uuid.uuid4().hex.encode() * 10
+    return artifact_store.save(data), data
+
+
+def test_download_with_etag_and_ranges(client, pdf):
+    name, data = pdf
+    url = f"/download_pdf/{name}"
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == data
+    etag = full.headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+
+    part = client.get(url, headers={"Range": "bytes=4-9"})
+    assert part.status_code == 206
+    assert part.content == data[4:10]
+    assert part.headers["content-range"] == f"bytes 4-9/{len(data)}"
+
+    tail = client.get(url, headers={"Range": "bytes=-5"})
+    assert (tail.status_code, tail.content) == (206, data[-5:])
+
+    for header in ("bytes=5-2", "bytes=0-1,5-9"):
+        res = client.get(url, headers={"Range": header})
+        assert (res.status_code, res.content) == (200, data)
+
+    for header in ("bytes=-0", f"bytes={len(data)}-"):
+        res = client.get(url, headers={"Range": header})
+        assert res.status_code == 416
+        assert res.headers["content-range"] == f"bytes */{len(data)}"
+
+
+def test_missing_or_invalid_names_are_404(client, pdf):
+    name, _ = pdf
+    assert client.get(f"/download_pdf/{'0' * 64}.pdf").status_code == 404
+    assert client.get("/download_pdf/not-a-hash.pdf").status_code == 404
+    os.remove(os.path.join(artifact_store.backend.root, name))
+    assert client.get(f"/download_pdf/{name}").status_code == 404
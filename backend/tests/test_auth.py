@@ -0,0 +1,36 @@
+import uuid
+
+import sessions
+
+
+def _credentials() -> dict:
+    return {"username": f"user-{uuid.uuid4().hex[:12]}", "password": "secret"}
+
+
+def test_register_login_and_duplicate_names(client):
+    credentials = _credentials()
+    assert client.post("/register", data=credentials).status_code == 200
+    assert client.post("/register", data=credentials).status_code == 400
+    assert client.post("/login", data={**credentials, "password": "wrong"}).status_code == 400
+
+    body = client.post("/login", data=credentials).json()
+    assert body["username"] == credentials["username"]
+    assert body["token_type"] == "bearer" and body["access_token"]
+
+
+def test_username_alone_is_refused_unless_allowed(client, monkeypatch):
+    credentials = _credentials()
+    client.post("/register", data=credentials)
+    url = f"/jobs/{uuid.uuid4().hex}?username={credentials['username']}"
+    assert client.get(url).status_code == 401
+
+    monkeypatch.setattr(sessions, "ALLOW_USERNAME_AUTH", True)
+    # Authenticated; the job just does not exist
+    assert client.get(url).status_code == 404
+
+
+def test_logout_revokes_the_token(client, auth_headers):
+    url = f"/jobs/{uuid.uuid4().hex}"
+    assert client.get(url, headers=auth_headers).status_code == 404
+    assert client.post("/logout", headers=auth_headers).status_code == 200
+    assert client.get(url, headers=auth_headers).status_code == 401
@@ -0,0 +1,89 @@
+import json
+import uuid
+
+import pytest
+
+import main
+import resume_service
+
+
+@pytest.fixture
+def uploaded(client, auth_headers, resume_pdf):
+    files = {"file": ("resume.pdf", resume_pdf.read_bytes(), "application/pdf")}
+    assert client.post("/upload_resume", files=files, headers=auth_headers).status_code == 200
+    return auth_headers
+
+
+def _posts(n: int) -> list:
+    run = uuid.uuid4().hex[:8]
+    return [f"Backend engineer {run}-{i}: Python, FastAPI and PostgreSQL" for i in range(n)]
+
+
+def _batch(client, headers, posts, mode="llm"):
+    res = client.post("/customize_resume_batch", data={"job_posts": posts, "mode": mode}, headers=headers)
+    assert res.status_code == 200
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_every_post_gets_a_line_and_is_saved(client, uploaded):
+    posts = _posts(4)
+    lines, done = _batch(client, uploaded, posts)
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    assert all(line["status"] == "ok" and not line["reused"] for line in lines)
+    assert done["status"] == "done"
+    assert (done["saved"], done["reused"], done["failed"]) == (4, 0, 0)
+    assert sorted(done["customization_ids"]) == ["0", "1", "2", "3"]
+
+
+def test_repeated_posts_are_reused_without_the_model(client, uploaded, monkeypatch):
+    posts = _posts(2)
+    _, first = _batch(client, uploaded, posts)
+
+    async def no_model(*args):
+        raise AssertionError("the model must not be called for reused posts")
+
+    monkeypatch.setattr(resume_service, "achange_resume_json", no_model)
+    lines, second = _batch(client, uploaded, posts)
+    assert all(line["reused"] for line in lines)
+    assert (second["saved"], second["reused"]) == (0, 2)
+    assert second["customization_ids"] == first["customization_ids"]
+
+
+def test_a_failing_post_does_not_sink_the_batch(client, uploaded, monkeypatch):
+    posts = _posts(3)
+    real = resume_service.achange_resume_json
+
+    async def flaky(resume_json, job_post):
+        if job_post == posts[1]:
+            raise RuntimeError("model refused")
+        return await real(resume_json, job_post)
+
+    monkeypatch.setattr(resume_service, "achange_resume_json", flaky)
+    lines, done = _batch(client, uploaded, posts)
+    failed = [line for line in lines if line["status"] == "error"]
+    assert [line["index"] for line in failed] == [1]
+    assert "model refused" in failed[0]["detail"]
+    assert (done["saved"], done["failed"]) == (2, 1)
+
+
+def test_local_mode_ranks_without_the_model(client, uploaded, monkeypatch):
+    async def no_model(*args):
+        raise AssertionError("local mode must not call the model")
+
+    monkeypatch.setattr(resume_service, "achange_resume_json", no_model)
+    lines, done = _batch(client, uploaded, _posts(3), mode="local")
+    assert all(line["status"] == "ok" for line in lines)
+    assert done["saved"] == 3
+
+
+def test_limits_and_missing_resume(client, auth_headers, monkeypatch):
+    res = client.post("/customize_resume_batch", data={"job_posts": _posts(1)}, headers=auth_headers)
+    assert res.status_code == 404
+
+    monkeypatch.setattr(main, "BATCH_CUSTOMIZE_MAX_POSTS", 2)
+    res = client.post("/customize_resume_batch", data={"job_posts": _posts(3)}, headers=auth_headers)
+    assert res.status_code == 400
+
+    res = client.post("/customize_resume_batch", data={"job_posts": _posts(1), "mode": "bogus"}, headers=auth_headers)
+    assert res.status_code == 400
@@ -0,0 +1,117 @@
+import json
+import uuid
+
+import pytest
+
+import blob_codec
+from benchmarks.synthetic import sample_resume
+from blob_codec import canonical_json, content_hash, decode_blob, encode_blob
+from blob_store import migrate_legacy_rows, put_json, storage_report
+from models import JsonBlob, Resume, ResumeCustomization, User
+
+
+@pytest.fixture
+def resume_doc() -> dict:
+    doc = sample_resume(skill_count=30)
+    doc["name"] = f"Candidate {uuid.uuid4().hex}"
+    return doc
+
+
+@pytest.fixture
+def user(db) -> User:
+    user = User(username=f"blob-{uuid.uuid4().hex[:12]}", password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _tailored(doc: dict) -> dict:
+    tailored = json.loads(json.dumps(doc))
+    tailored["skills"] = list(reversed(tailored["skills"]))
+    return tailored
+
+
+def test_equal_documents_share_one_hash(resume_doc):
+    pretty = json.dumps(resume_doc, indent=2)
+    compact = json.dumps(resume_doc, separators=(",", ":"))
+    assert canonical_json(pretty) == canonical_json(compact) == canonical_json(resume_doc)
+    assert content_hash(canonical_json(pretty)) == content_hash(canonical_json(resume_doc))
+
+
+@pytest.mark.parametrize("codec", ["raw", "zlib", "zstd"])
+def test_every_codec_round_trips_with_and_without_a_base(codec, resume_doc, monkeypatch):
+    if codec == "zstd" and blob_codec.zstandard is None:
+        pytest.skip("zstandard is not installed")
+    monkeypatch.setattr(blob_codec, "BLOB_CODEC", codec)
+    base = canonical_json(resume_doc)
+    raw = canonical_json(_tailored(resume_doc))
+
+    used, data = encode_blob(raw)
+    assert used == codec
+    assert decode_blob(used, data) == raw
+
+    used, delta = encode_blob(raw, base)
+    assert decode_blob(used, delta, base) == raw
+    if codec != "raw":
+        assert len(delta) < len(data) < len(raw)
+
+
+def test_small_documents_stay_plain_text():
+    assert encode_blob(b'{"name":"Jane"}') == ("raw", b'{"name":"Jane"}')
+
+
+def test_put_json_stores_each_document_once(db, resume_doc):
+    first = put_json(db, resume_doc)
+    second = put_json(db, json.dumps(resume_doc, indent=4))
+    db.commit()
+    assert first == second
+    assert db.query(JsonBlob).filter(JsonBlob.content_hash == first).count() == 1
+    assert json.loads(db.get(JsonBlob, first).text) == resume_doc
+
+
+def test_customizations_compress_against_their_resume(db, resume_doc):
+    base_hash = put_json(db, resume_doc)
+    alone = put_json(db, {**_tailored(resume_doc), "variant": "alone"})
+    tailored = put_json(db, _tailored(resume_doc), base_hash=base_hash)
+    db.commit()
+
+    blob = db.get(JsonBlob, tailored)
+    assert blob.base_hash == base_hash
+    assert blob.stored_size < db.get(JsonBlob, alone).stored_size
+    assert json.loads(blob.text) == _tailored(resume_doc)
+
+
+def test_migration_moves_legacy_rows_and_is_idempotent(db, user, resume_doc):
+    resume = Resume(filename="resume.pdf", extracted_data=json.dumps(resume_doc), user_id=user.id)
+    duplicate = Resume(filename="again.pdf", extracted_data=json.dumps(resume_doc, indent=2), user_id=user.id)
+    db.add_all([resume, duplicate])
+    db.flush()
+    customization = ResumeCustomization(
+        job_post_text="Python developer", customized_data=json.dumps(_tailored(resume_doc)),
+        resume_id=resume.id, user_id=user.id,
+    )
+    db.add(customization)
+    db.commit()
+    assert storage_report(db)["legacy_rows"] >= 3
+
+    stats = migrate_legacy_rows(db)
+    assert (stats["resumes"], stats["customizations"], stats["skipped"]) == (2, 1, 0)
+    assert stats["legacy_bytes"] > 0
+
+    db.expire_all()
+    assert resume.extracted_data is None
+    assert resume.extracted_blob_hash == duplicate.extracted_blob_hash
+    assert json.loads(resume.extracted_json) == resume_doc
+    assert json.loads(customization.customized_json) == _tailored(resume_doc)
+    assert customization.customized_blob.base_hash == resume.extracted_blob_hash
+
+    assert migrate_legacy_rows(db) == {"resumes": 0, "customizations": 0, "legacy_bytes": 0, "skipped": 0}
+    report = storage_report(db)
+    assert report["legacy_rows"] == 0
+    assert report["saved_bytes"] > 0
+
+
+def test_storage_stats_endpoint(client):
+    res = client.get("/storage_stats")
+    assert res.status_code == 200
+    assert {"blobs", "logical_bytes", "stored_bytes", "saved_bytes", "legacy_rows"} <= res.json().keys()
@@ -0,0 +1,84 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+import resume_service
+from benchmarks.synthetic import sample_resume
+from models import ResumeCustomization, User
+from resume_service import list_customizations, save_customizations, save_resume
+
+
+@pytest.fixture
+def owner(db):
+    user = User(username=f"pages-{uuid.uuid4().hex[:12]}", password="x")
+    db.add(user)
+    db.commit()
+    resume = save_resume(db, user.id, "resume.pdf", json.dumps(sample_resume(skill_count=5)))
+    run = uuid.uuid4().hex[:8]
+    rows = [(f"Job post {run} number {i}", json.dumps({"skills": [f"skill-{i}"]}), "local") for i in range(7)]
+    ids = save_customizations(db, resume.id, user.id, rows)
+    # A legacy row keeps its job post inline
+    legacy = ResumeCustomization(job_post_text=f"Legacy post {run}", customized_data=json.dumps({"skills": []}),
+                                 resume_id=resume.id, user_id=user.id)
+    db.add(legacy)
+    db.flush()
+    # Every row shares one timestamp, so only the id can order the pages
+    same_time = datetime(2024, 1, 1, 12, 0, 0)
+    db.query(ResumeCustomization).filter_by(user_id=user.id).update({"created_at": same_time})
+    db.commit()
+    return user, sorted(ids + [legacy.id], reverse=True)
+
+
+def test_pages_cover_every_row_once_newest_first(db, owner):
+    user, ids = owner
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = list_customizations(db, user.id, cursor=cursor, limit=3, fields=["id"])
+        seen += [item["id"] for item in items]
+        pages += 1
+        if cursor is None:
+            break
+        assert cursor == items[-1]["id"]
+    assert seen == ids
+    assert pages == 3
+
+
+def test_last_full_page_has_no_cursor(db, owner):
+    user, ids = owner
+    items, cursor = list_customizations(db, user.id, limit=len(ids))
+    assert len(items) == len(ids)
+    assert cursor is None
+
+
+def test_fields_select_columns_and_resolve_blobs(db, owner):
+    user, ids = owner
+    items, _ = list_customizations(db, user.id, limit=len(ids), fields=["job_post_text", "customized_data"])
+    assert set(items[0]) == {"id", "job_post_text", "customized_data"}
+    assert items[0]["job_post_text"].startswith("Legacy post")
+    assert items[-1]["job_post_text"].endswith("number 0")
+    assert json.loads(items[-1]["customized_data"]) == {"skills": ["skill-0"]}
+
+    with pytest.raises(ValueError):
+        list_customizations(db, user.id, fields=["id", "password"])
+
+
+def test_summary_mode_returns_snippets(db, owner, monkeypatch):
+    user, ids = owner
+    monkeypatch.setattr(resume_service, "SUMMARY_SNIPPET_CHARS", 8)
+    items, _ = list_customizations(db, user.id, limit=2, summary=True)
+    assert [set(item) for item in items] == [{"id", "job_post_snippet", "created_at"}] * 2
+    assert items[0]["job_post_snippet"] == "Legacy p"
+    assert items[1]["job_post_snippet"] == "Job post"
+    assert items[0]["created_at"] == "2024-01-01T12:00:00"
+
+
+def test_endpoint_validates_fields_and_pages(client, auth_headers):
+    res = client.get("/get_customized_resumes?fields=id,secret", headers=auth_headers)
+    assert res.status_code == 400
+    assert "secret" in res.json()["detail"]
+
+    res = client.get("/get_customized_resumes?summary=true&limit=5", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json() == {"customizations": [], "next_cursor": None}
@@ -0,0 +1,133 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+import extract_resume_data
+import extraction_cache
+from extraction_cache import cache_stats, get_cached_extraction, make_cache_key, store_extraction
+from models import ExtractionCacheEntry
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(db):
+    db.query(ExtractionCacheEntry).delete()
+    db.commit()
+
+
+def _key() -> str:
+    return make_cache_key(uuid.uuid4().hex, "prompt-v1", "schema-v1", "model")
+
+
+def _age(db, cache_key: str, **delta):
+    entry = db.get(ExtractionCacheEntry, cache_key)
+    entry.created_at = entry.last_accessed_at = datetime.utcnow() - timedelta(**delta)
+    db.commit()
+
+
+def test_cache_key_covers_every_version():
+    base = make_cache_key("content", "prompt-v1", "schema-v1", "model-a")
+    assert base == make_cache_key("content", "prompt-v1", "schema-v1", "model-a")
+    assert base != make_cache_key("other", "prompt-v1", "schema-v1", "model-a")
+    assert base != make_cache_key("content", "prompt-v2", "schema-v1", "model-a")
+    assert base != make_cache_key("content", "prompt-v1", "schema-v2", "model-a")
+    assert base != make_cache_key("content", "prompt-v1", "schema-v1", "model-b")
+
+
+def test_store_then_hit_counts_and_stats(db):
+    key = _key()
+    before = cache_stats()
+    assert get_cached_extraction(key) is None
+
+    store_extraction(key, "content", '{"name": "Jane"}')
+    assert get_cached_extraction(key) == '{"name": "Jane"}'
+    assert get_cached_extraction(key) == '{"name": "Jane"}'
+
+    stats = cache_stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["size_bytes"] == len('{"name": "Jane"}')
+    assert db.get(ExtractionCacheEntry, key).hit_count == 2
+
+
+def test_expired_entries_miss_and_are_evicted(db, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_AGE_DAYS", 1)
+    old = _key()
+    store_extraction(old, "content", "{}")
+    _age(db, old, days=2)
+    assert get_cached_extraction(old) is None
+
+    store_extraction(_key(), "content", "{}")
+    db.expire_all()
+    assert db.get(ExtractionCacheEntry, old) is None
+
+
+def test_entry_limit_evicts_least_recently_used(db, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_ENTRIES", 2)
+    first, second, third = _key(), _key(), _key()
+    store_extraction(first, "a", "{}")
+    store_extraction(second, "b", "{}")
+    _age(db, first, minutes=2)
+    _age(db, second, minutes=1)
+    # Reading `first` makes `second` the least recently used
+    assert get_cached_extraction(first) == "{}"
+
+    store_extraction(third, "c", "{}")
+    db.expire_all()
+    assert db.get(ExtractionCacheEntry, second) is None
+    assert db.get(ExtractionCacheEntry, first) is not None
+    assert db.get(ExtractionCacheEntry, third) is not None
+
+
+def test_byte_limit_evicts_until_it_fits(db, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_BYTES", 250)
+    keys = [_key() for _ in range(3)]
+    for minutes, key in zip((3, 2, 1), keys):
+        store_extraction(key, "content", "x" * 100)
+        _age(db, key, minutes=minutes)
+
+    store_extraction(_key(), "content", "x" * 100)
+    assert cache_stats()["size_bytes"] <= 250
+    db.expire_all()
+    assert [db.get(ExtractionCacheEntry, key) is None for key in keys] == [True, True, False]
+
+
+def test_disabled_cache_never_stores(monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_ENABLED", False)
+    key = _key()
+    store_extraction(key, "content", "{}")
+    assert get_cached_extraction(key) is None
+    assert cache_stats()["entries"] == 0
+
+
+def test_second_extraction_of_same_file_skips_the_model(resume_pdf, monkeypatch):
+    calls = []
+    uncached = extract_resume_data._extract_data_uncached
+    monkeypatch.setattr(
+        extract_resume_data, "_extract_data_uncached", lambda path: calls.append(path) or uncached(path)
+    )
+
+    first = extract_resume_data.extract_data_from_resume(str(resume_pdf))
+    second = extract_resume_data.extract_data_from_resume(str(resume_pdf))
+    assert first == second
+    assert len(calls) == 1
+
+    # A new prompt version must not be served results made with the old one
+    monkeypatch.setattr(extract_resume_data, "PROMPT_VERSION", "changed")
+    extract_resume_data.extract_data_from_resume(str(resume_pdf))
+    assert len(calls) == 2
+
+
+def test_storing_the_same_key_twice_or_concurrently_keeps_one_entry(db):
+    key = _key()
+    store_extraction(key, "content", '{"v": 1}')
+    store_extraction(key, "content", '{"v": 2}')
+    assert get_cached_extraction(key) == '{"v": 2}'
+
+    other = _key()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: store_extraction(other, "content", "{}"), range(8)))
+    assert get_cached_extraction(other) == "{}"
+    assert cache_stats()["entries"] == 2
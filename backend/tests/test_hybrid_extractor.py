@@ -0,0 +1,92 @@
+from hybrid_extractor import (
+    EducationSection, ExperienceSection, ContactSection, SkillsSection, merge_extraction, plan_extraction,
+)
+from resume_models import EducationEntry, ExperienceEntry, Links
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 010 2030 | linkedin.com/in/jane-doe
+Summary
+Backend engineer.
+Experience
+Software Engineer | Acme | 2019 - 2023
+- Built the billing service
+Education
+B.Sc. Computer Science, State University, 2015 - 2019
+Skills
+Languages: Python, Go
+Tools: Docker, Kubernetes
+Certifications
+AWS Solutions Architect
+Languages
+English, Spanish"""
+
+
+def test_rules_fill_contact_and_lists_and_leave_the_rest_to_the_llm():
+    plan = plan_extraction(RESUME)
+    assert plan is not None
+    assert (plan.data.name, plan.data.email, plan.data.phone) == ("Jane Doe", "jane@example.com", "+1 555 010 2030")
+    assert plan.data.other_info.links.linkedin == "linkedin.com/in/jane-doe"
+    assert plan.data.skills == ["Python", "Go", "Docker", "Kubernetes"]
+    assert plan.data.other_info.certifications == ["AWS Solutions Architect"]
+    assert plan.data.other_info.languages == ["English", "Spanish"]
+    assert plan.llm_sections == {
+        "education": "B.Sc. Computer Science, State University, 2015 - 2019",
+        "experience": "Software Engineer | Acme | 2019 - 2023\n- Built the billing service",
+    }
+
+
+def test_sentence_like_skills_and_a_missing_name_go_to_the_llm():
+    text = RESUME.replace("Jane Doe\n", "", 1).replace(
+        "Languages: Python, Go\nTools: Docker, Kubernetes",
+        "Designed distributed systems that process billions of events per day",
+    )
+    plan = plan_extraction(text)
+    assert plan.llm_sections["contact"].startswith("jane@example.com")
+    assert "billions of events" in plan.llm_sections["skills"]
+    assert plan.data.skills == []
+
+
+def test_documents_without_known_headings_fall_back_to_one_call():
+    assert plan_extraction("Jane Doe\nSoftware Engineer at Acme since 2019") is None
+
+
+def test_text_under_an_unknown_heading_falls_back_to_one_call():
+    # "Work History" is not a known heading; its jobs would end up in the education call
+    text = RESUME.replace("Certifications", "Work History\nData Engineer | Initech | 2016 - 2019\nCertifications")
+    assert plan_extraction(text) is None
+    assert plan_extraction("RELEVANT EXPERIENCE\n" + RESUME) is None
+
+
+def test_known_sections_without_a_group_fall_back_unless_ignored():
+    assert plan_extraction(RESUME + "\nPublications\nA paper on caching, 2021") is None
+    # No extracted field holds a summary or hobbies, in either mode
+    assert plan_extraction(RESUME + "\nHobbies\nChess") is not None
+
+
+def test_merge_keeps_rule_values_and_fills_the_gaps():
+    plan = plan_extraction(RESUME.replace("linkedin.com/in/jane-doe", "", 1))
+    results = {
+        "contact": ContactSection(
+            name="J. Doe", email="other@example.com",
+            links=Links(linkedin="linkedin.com/in/jd", github="github.com/jd"),
+        ),
+        "education": EducationSection(education=[EducationEntry(degree="B.Sc.", institution="State University")]),
+        "experience": ExperienceSection(experience=[ExperienceEntry(job_title="Software Engineer", company="Acme")]),
+        "skills": SkillsSection(skills=["Python"]),
+    }
+    merged = merge_extraction(plan, results)
+
+    assert (merged.name, merged.email) == ("Jane Doe", "jane@example.com")
+    assert merged.other_info.links.linkedin == "linkedin.com/in/jd"
+    assert merged.other_info.links.github == "github.com/jd"
+    assert merged.education[0].institution == "State University"
+    assert merged.experience[0].company == "Acme"
+    assert merged.skills == ["Python"]
+    assert merged.other_info.certifications == ["AWS Solutions Architect"]
+    # The plan is not modified, so it can be merged again
+    assert plan.data.experience == [] and plan.data.other_info.links.github == ""
+
+
+def test_merge_without_results_returns_the_rule_data():
+    plan = plan_extraction(RESUME)
+    assert merge_extraction(plan, {}) == plan.data
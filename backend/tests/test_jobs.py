@@ -0,0 +1,189 @@
+import os
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+import jobs
+from jobs import JobWorker, LeaseHeartbeat, QueueFullError, TransientJobError, job_handler, submit_job
+from models import Job
+
+cleaned: list[dict] = []
+calls: list[dict] = []
+
+
+def _record_cleanup(payload: dict):
+    cleaned.append(payload)
+
+
+@job_handler("test_echo", cleanup=_record_cleanup)
+def _echo(db, payload: dict) -> dict:
+    calls.append(payload)
+    if payload.get("error") == "transient":
+        raise TransientJobError("try again")
+    if payload.get("error") == "fatal":
+        raise ValueError("bad payload")
+    if payload.get("sleep"):
+        time.sleep(payload["sleep"])
+    return {"echo": payload["value"]}
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(db):
+    db.query(Job).delete()
+    db.commit()
+    cleaned.clear()
+    calls.clear()
+
+
+def _drain(worker_id: str = "test-worker") -> int:
+    worker = JobWorker(concurrency=0)
+    runs = 0
+    while worker.run_once(worker_id):
+        runs += 1
+    return runs
+
+
+def test_submit_rejects_unknown_kinds_and_full_queues(db, monkeypatch):
+    with pytest.raises(ValueError):
+        submit_job(db, "no_such_kind", {})
+
+    monkeypatch.setattr(jobs, "JOB_QUEUE_MAX_DEPTH", 2)
+    submit_job(db, "test_echo", {"value": 1})
+    submit_job(db, "test_echo", {"value": 2})
+    with pytest.raises(QueueFullError):
+        submit_job(db, "test_echo", {"value": 3})
+
+
+def test_successful_job_stores_its_result_and_cleans_up_once(db):
+    job = submit_job(db, "test_echo", {"value": 42})
+    assert _drain() == 1
+
+    db.refresh(job)
+    assert (job.status, job.result, job.attempts, job.locked_by) == ("succeeded", {"echo": 42}, 1, None)
+    assert cleaned == [{"value": 42}]
+
+
+def test_transient_errors_retry_and_clean_up_only_at_the_end(db):
+    job = submit_job(db, "test_echo", {"value": 1, "error": "transient"})
+    assert _drain() == job.max_attempts
+
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.attempts == job.max_attempts
+    assert "TransientJobError" in job.error
+    assert len(cleaned) == 1
+
+
+def test_permanent_errors_fail_without_retry(db):
+    job = submit_job(db, "test_echo", {"value": 1, "error": "fatal"})
+    assert _drain() == 1
+
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("failed", 1)
+    assert job.error == "ValueError: bad payload"
+    assert len(cleaned) == 1
+
+
+def test_expired_leases_are_requeued(db):
+    job = submit_job(db, "test_echo", {"value": 7})
+    job.status, job.locked_by = "running", "dead-worker"
+    job.locked_at = datetime.utcnow() - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 1)
+    db.commit()
+
+    assert _drain() == 1
+    db.refresh(job)
+    assert job.status == "succeeded"
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(db):
+    job = submit_job(db, "test_echo", {"value": 7})
+    job.status, job.locked_by, job.attempts = "running", "crashed-worker", job.max_attempts
+    job.locked_at = datetime.utcnow() - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 1)
+    db.commit()
+
+    assert _drain() == 0
+    db.refresh(job)
+    assert (job.status, job.locked_by) == ("failed", None)
+    assert "Lease expired" in job.error
+    assert calls == []
+    assert cleaned == [{"value": 7}]
+
+
+def test_heartbeat_keeps_a_long_job_from_being_requeued(db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_LEASE_SECONDS", 1)
+    monkeypatch.setattr(jobs, "LeaseHeartbeat", partial(LeaseHeartbeat, interval=0.2))
+    job = submit_job(db, "test_echo", {"value": 1, "sleep": 2})
+
+    worker = JobWorker(concurrency=1, poll_interval=0.05)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            db.expire_all()
+            if db.get(Job, job.id).status == "succeeded":
+                break
+            # A second worker that would steal the job if its lease expired
+            JobWorker(concurrency=0).run_once("thief")
+            time.sleep(0.1)
+    finally:
+        worker.stop()
+
+    db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.attempts == 1
+    assert len(calls) == 1
+
+
+def test_renew_lease_requires_the_current_holder(db):
+    job = submit_job(db, "test_echo", {"value": 1})
+    job.status, job.locked_by, job.locked_at = "running", "holder", datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+
+    assert not jobs.renew_lease(job.id, "someone-else")
+    assert jobs.renew_lease(job.id, "holder")
+    db.refresh(job)
+    assert datetime.utcnow() - job.locked_at < timedelta(seconds=5)
+
+
+def test_failed_render_job_removes_its_layout_image(client, auth_headers, db):
+    files = {"file": ("layout.png", b"not really an image", "image/png")}
+    res = client.post("/jobs/render_resume_from_image", files=files, headers=auth_headers)
+    assert res.status_code == 202
+    job_id = res.json()["job_id"]
+    image_path = db.get(Job, job_id).payload["image_path"]
+
+    _drain()
+    status = client.get(f"/jobs/{job_id}", headers=auth_headers).json()
+    assert status["status"] == "failed"
+    assert client.get(f"/jobs/{job_id}/result", headers=auth_headers).status_code == 500
+    assert not os.path.exists(image_path)
+
+
+def test_shared_layout_image_is_kept_until_its_last_job_is_done(client, auth_headers, db):
+    files = {"file": ("layout", b"same image for two jobs", "image/png")}
+    first, second = (
+        client.post("/jobs/render_resume_from_image", files=files, headers=auth_headers).json()["job_id"]
+        for _ in range(2)
+    )
+    image_path = db.get(Job, first).payload["image_path"]
+    assert image_path == db.get(Job, second).payload["image_path"]
+    assert image_path.endswith(".bin")
+
+    worker = JobWorker(concurrency=0)
+    assert worker.run_once("test-worker")
+    assert os.path.exists(image_path)
+    assert worker.run_once("test-worker")
+    assert not os.path.exists(image_path)
+
+
+def test_upload_job_extracts_the_resume(client, auth_headers, resume_pdf):
+    files = {"file": ("resume.pdf", resume_pdf.read_bytes(), "application/pdf")}
+    job_id = client.post("/jobs/upload_resume", files=files, headers=auth_headers).json()["job_id"]
+    assert client.get(f"/jobs/{job_id}/result", headers=auth_headers).status_code == 409
+
+    _drain()
+    result = client.get(f"/jobs/{job_id}/result", headers=auth_headers).json()["result"]
+    assert result["resume_id"]
+    assert result["extracted_data"]
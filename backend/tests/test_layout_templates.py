@@ -0,0 +1,65 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from jinja2.exceptions import SecurityError
+
+from benchmarks.synthetic import sample_resume
+from database import SessionLocal
+from models import LayoutTemplate
+from vision_renderer import _load_template, _save_template, _validated_template, fill_layout_template
+
+TEMPLATE = """<html><body><h1>{{ resume.name }}</h1>
+{% for skill in resume.skills %}<li>{{ skill }}</li>{% endfor %}
+{% if resume.other_info.links.github %}<a href="{{ resume.other_info.links.github }}">GitHub</a>{% endif %}
+</body></html>"""
+
+
+def test_fill_accepts_dicts_and_json_and_defaults_missing_fields():
+    resume = sample_resume(skill_count=3)
+    from_dict = fill_layout_template(TEMPLATE, resume)
+    assert from_dict == fill_layout_template(TEMPLATE, json.dumps(resume))
+    assert f"<h1>{resume['name']}</h1>" in from_dict
+    assert from_dict.count("<li>") == 3
+
+    # Lists missing from the JSON render as empty, never as None
+    assert "<li>" not in fill_layout_template(TEMPLATE, {"name": "Jane"})
+
+
+def test_fill_escapes_resume_text():
+    html = fill_layout_template(TEMPLATE, {"name": "<script>alert(1)</script>"})
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+
+
+def test_templates_are_sandboxed():
+    with pytest.raises(SecurityError):
+        fill_layout_template("{{ ''.__class__.__subclasses__() }}", {})
+
+
+def test_validated_template_strips_fences_and_rejects_broken_templates():
+    assert _validated_template(f"Here it is:\n```html\n{TEMPLATE}\n```") == TEMPLATE
+    with pytest.raises(RuntimeError):
+        _validated_template("<html>{% for skill in resume.skills %}</html>")
+    # Must also render against an empty resume
+    with pytest.raises(RuntimeError):
+        _validated_template("<html>{{ resume.education[0].degree.upper() }}</html>")
+
+
+def test_concurrent_saves_of_one_template_keep_the_first(db):
+    cache_key = uuid.uuid4().hex
+
+    def save(i: int):
+        session = SessionLocal()
+        try:
+            _save_template(session, cache_key, "image", f"<html>{i}</html>")
+        finally:
+            session.close()
+
+    save(0)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(save, range(1, 9)))
+    assert db.query(LayoutTemplate).filter_by(cache_key=cache_key).count() == 1
+    assert _load_template(db, cache_key) == "<html>0</html>"
+    assert db.get(LayoutTemplate, cache_key).hit_count == 1
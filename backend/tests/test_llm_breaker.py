@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.runnables import Runnable
+
+from llm_clients import CircuitBreaker, CircuitOpenError, GuardedRunnable
+
+
+class Scripted(Runnable):
+    """Provider stand-in: each call pops the next outcome, an exception or a reply."""
+
+    def __init__(self, *outcomes, chunks=(), chunk_delay=0.0, delay=0.0):
+        self.outcomes = list(outcomes)
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.delay = delay
+        self.closed = False
+
+    def _next(self):
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    def invoke(self, input, config=None, **kwargs):
+        return self._next()
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self._next()
+
+    async def astream(self, input, config=None, **kwargs):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(self.chunk_delay)
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def _open(breaker: CircuitBreaker):
+    guarded = GuardedRunnable(Scripted(*[TimeoutError()] * breaker.failures), breaker)
+    for _ in range(breaker.failures):
+        with pytest.raises(TimeoutError):
+            guarded.invoke("x")
+    assert breaker.state() == "open"
+
+
+def _half_open(breaker: CircuitBreaker):
+    _open(breaker)
+    time.sleep(breaker.reset_after)
+    assert breaker.state() == "half_open"
+
+
+def test_transient_failures_open_then_a_trial_closes():
+    breaker = CircuitBreaker("test", failures=2, reset_after=0.05)
+    _open(breaker)
+    with pytest.raises(CircuitOpenError):
+        GuardedRunnable(Scripted(), breaker).invoke("x")
+
+    time.sleep(0.05)
+    assert GuardedRunnable(Scripted("ok"), breaker).invoke("x") == "ok"
+    stats = breaker.stats()
+    assert (stats["state"], stats["opened"], stats["rejected"], stats["consecutive_failures"]) == ("closed", 1, 1, 0)
+
+
+def test_failed_trial_reopens_and_only_one_trial_runs():
+    breaker = CircuitBreaker("test", failures=1, reset_after=0.05)
+    _half_open(breaker)
+
+    breaker.before_call()  # the trial is now in flight
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state() == "open"
+
+
+def test_permanent_errors_do_not_open_the_circuit():
+    breaker = CircuitBreaker("test", failures=2, reset_after=60)
+    guarded = GuardedRunnable(Scripted(ValueError(), ValueError(), ValueError()), breaker)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            guarded.invoke("x")
+    assert breaker.state() == "closed"
+
+
+def test_cancelled_trial_releases_the_slot():
+    breaker = CircuitBreaker("test", failures=1, reset_after=0.05)
+    _half_open(breaker)
+
+    async def cancel_trial():
+        task = asyncio.create_task(GuardedRunnable(Scripted(delay=10), breaker).ainvoke("x"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert GuardedRunnable(Scripted("ok"), breaker).invoke("x") == "ok"
+    assert breaker.state() == "closed"
+
+
+def test_stream_closed_by_the_consumer_releases_the_slot():
+    breaker = CircuitBreaker("test", failures=1, reset_after=0.05)
+    _half_open(breaker)
+    upstream = Scripted(chunks=["a", "b", "c"])
+
+    async def read_one():
+        stream = GuardedRunnable(upstream, breaker).astream("x")
+        assert await anext(stream) == "a"
+        await stream.aclose()
+
+    asyncio.run(read_one())
+    assert upstream.closed
+    assert GuardedRunnable(Scripted("ok"), breaker).invoke("x") == "ok"
+
+
+def test_stream_deadline_ignores_time_spent_by_the_consumer():
+    breaker = CircuitBreaker("test", failures=1, reset_after=60)
+    guarded = GuardedRunnable(Scripted(chunks=["a", "b", "c"], chunk_delay=0.02), breaker, timeout=0.2)
+
+    async def slow_consumer():
+        chunks = []
+        async for chunk in guarded.astream("x"):
+            chunks.append(chunk)
+            await asyncio.sleep(0.15)
+        return chunks
+
+    assert asyncio.run(slow_consumer()) == ["a", "b", "c"]
+    assert breaker.state() == "closed"
+
+
+def test_stalled_stream_times_out_and_counts_as_a_failure():
+    breaker = CircuitBreaker("test", failures=1, reset_after=60)
+    guarded = GuardedRunnable(Scripted(chunks=["a", "b"], chunk_delay=0.15), breaker, timeout=0.2)
+
+    async def consume():
+        return [chunk async for chunk in guarded.astream("x")]
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(consume())
+    assert breaker.state() == "open"
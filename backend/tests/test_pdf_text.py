@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.synthetic import make_resume_pages, make_text_pdf
+from pdf_text import PdfBudgetError, extract_text_from_pdf, iter_page_texts, iter_pdf_text
+
+
+@pytest.fixture
+def long_pdf(tmp_path):
+    path = tmp_path / "long.pdf"
+    path.write_bytes(make_text_pdf(make_resume_pages(8, lines_per_page=10)))
+    return str(path)
+
+
+def test_parallel_and_serial_extraction_agree(long_pdf):
+    serial = list(iter_page_texts(long_pdf, parallel=False))
+    parallel = list(iter_page_texts(long_pdf, parallel=True))
+    assert len(serial) == 8
+    assert parallel == serial
+
+
+def test_repeated_headers_and_page_numbers_are_stripped(long_pdf):
+    text = extract_text_from_pdf(long_pdf, parallel=False)
+    assert "Jane Doe - Senior Software Engineer" not in text
+    assert "Page 3 of 8" not in text
+    assert "Project 5: built a data pipeline" in text
+
+    kept = extract_text_from_pdf(long_pdf, parallel=False, strip_headers=False)
+    assert kept.count("Jane Doe - Senior Software Engineer") == 8
+
+
+def test_page_and_character_budgets(long_pdf):
+    assert len(list(iter_page_texts(long_pdf, max_pages=3, parallel=False))) == 3
+    assert len("".join(iter_pdf_text(long_pdf, max_chars=500, parallel=False))) == 500
+
+
+def test_oversized_file_is_refused_before_parsing(long_pdf):
+    with pytest.raises(PdfBudgetError):
+        next(iter_page_texts(long_pdf, max_bytes=100))
@@ -0,0 +1,58 @@
+import json
+
+from benchmarks.synthetic import sample_resume
+from skill_ranker import LOCAL_RANK_MIN_CONFIDENCE, rank_resume_skills, rank_skills, tokenize
+
+SKILLS = ["Python", "Go", "Computer Vision", "REST APIs", "Node.js", "Docker", "Machine Learning", "Marketing"]
+
+MARKETING_POST = """Marketing Manager. Go beyond the brief and grow our brand! Send your CV to jobs@example.com.
+Rest assured you will work with a node of creative teams: testing campaigns, analytics and
+ownership of our go-to-market plan, with containers of swag and lambda-fast turnarounds.
+Express yourself; ml of coffee per day is not tracked."""
+
+BACKEND_POST = """Backend engineer. You will build REST APIs in Go and Python, ship them with Docker
+and Kubernetes, and own the Python data pipelines behind our ML features."""
+
+
+def test_plain_english_words_are_not_skills():
+    ranking = rank_skills(SKILLS, MARKETING_POST)
+    assert ranking.skills[0] == "Marketing"
+    assert ranking.scores[1:] == [0.0] * (len(SKILLS) - 1)
+    assert ranking.confidence < LOCAL_RANK_MIN_CONFIDENCE
+
+
+def test_technical_post_ranks_mentioned_skills_first():
+    ranking = rank_skills(SKILLS, BACKEND_POST)
+    assert ranking.skills[0] == "Python"
+    assert set(ranking.skills[1:5]) == {"Go", "REST APIs", "Docker", "Machine Learning"}
+    assert ranking.skills[5:] == ["Computer Vision", "Node.js", "Marketing"]
+    assert ranking.confidence == 1.0
+
+
+def test_ambiguous_aliases_only_match_as_spelled():
+    assert rank_skills(["Go"], "Experience with Go services").scores == [rank_skills(["Go"], "Golang").scores[0]]
+    assert rank_skills(["Go"], "Ready to go the extra mile").scores == [0.0]
+    assert rank_skills(["REST APIs"], "We rest on weekends").scores == [0.0]
+    # In a resume's own skill list the case does not matter
+    assert rank_skills(["go", "rest"], "Experience with Go and REST").scores[0] > 0
+
+
+def test_tied_top_scores_cap_confidence():
+    post = "Python, Docker, Kubernetes, AWS and Terraform"
+    ranking = rank_skills(["Python", "Docker", "Kubernetes", "Java"], post)
+    assert ranking.scores[:3] == [ranking.scores[0]] * 3
+    assert ranking.confidence == round(1 / 3, 3)
+
+
+def test_sentence_starts_are_lowercased():
+    assert tokenize("Go big. Go home! Use Go", keep_case=True) == ["go", "big", "go", "home", "use", "Go"]
+    assert tokenize("Go big. Use Go") == ["go", "big", "use", "go"]
+
+
+def test_rank_resume_skills_reorders_only_skills():
+    resume = sample_resume(skill_count=20)
+    customized, confidence = rank_resume_skills(json.dumps(resume), MARKETING_POST)
+    customized = json.loads(customized)
+    assert sorted(customized["skills"]) == sorted(resume["skills"])
+    assert customized["experience"] == resume["experience"]
+    assert confidence < LOCAL_RANK_MIN_CONFIDENCE
@@ -0,0 +1,66 @@
+from benchmarks.synthetic import make_layout_png
+from helpers import parse_sse, weasyprint_available
+
+
+def _upload(client, headers, resume_pdf):
+    files = {"file": ("resume.pdf", resume_pdf.read_bytes(), "application/pdf")}
+    res = client.post("/upload_resume/stream", files=files, headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    return parse_sse(res.text)
+
+
+def test_upload_stream_reports_progress_then_saves(client, auth_headers, resume_pdf):
+    events = _upload(client, auth_headers, resume_pdf)
+    names = [name for name, _ in events]
+    assert names[0] == "accepted"
+    assert names[-3:] == ["extracted", "saved", "done"]
+    assert "parsed" in names
+    assert names.index("parsed") < names.index("extracted")
+
+    extracted = dict(events)["extracted"]
+    assert extracted["cached"] is False
+    assert extracted["extracted_data"]
+
+
+def test_upload_stream_of_a_cached_file_skips_to_extracted(client, auth_headers, resume_pdf):
+    _upload(client, auth_headers, resume_pdf)
+    events = _upload(client, auth_headers, resume_pdf)
+    assert [name for name, _ in events] == ["accepted", "extracted", "saved", "done"]
+    assert dict(events)["extracted"]["cached"] is True
+
+
+def test_render_stream_sends_tokens_before_the_html(client, auth_headers, resume_pdf):
+    _upload(client, auth_headers, resume_pdf)
+    files = {"file": ("layout.png", make_layout_png(1), "image/png")}
+    res = client.post("/render_resume_from_image/stream", data={"mode": "direct"}, files=files, headers=auth_headers)
+    events = parse_sse(res.text)
+    names = [name for name, _ in events]
+
+    assert names[0] == "accepted"
+    tokens = [data["text"] for name, data in events if name == "token"]
+    assert tokens
+    html = dict(events)["html"]["html"]
+    assert html in "".join(tokens)
+    assert names.index("html") > max(i for i, name in enumerate(names) if name == "token")
+    if weasyprint_available():
+        assert names[-2:] == ["pdf_ready", "done"]
+
+
+def test_render_stream_without_a_resume_is_a_404_event(client, auth_headers):
+    files = {"file": ("layout.png", make_layout_png(2), "image/png")}
+    res = client.post("/render_resume_from_image/stream", data={"mode": "direct"}, files=files, headers=auth_headers)
+    name, data = parse_sse(res.text)[-1]
+    assert name == "error"
+    assert data["status"] == 404
+
+
+def test_render_stream_in_template_mode_reports_the_cache(client, auth_headers, resume_pdf):
+    _upload(client, auth_headers, resume_pdf)
+    hits = []
+    for _ in range(2):
+        files = {"file": ("layout.png", make_layout_png(3), "image/png")}
+        res = client.post("/render_resume_from_image/stream", data={"mode": "template"}, files=files, headers=auth_headers)
+        events = dict(parse_sse(res.text))
+        hits.append(events["template"]["cache_hit"])
+    assert hits == [False, True]
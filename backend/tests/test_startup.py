@@ -0,0 +1,19 @@
+import json
+
+from benchmarks.bench_startup import IMPORT_TIME_BUDGET_S, cold_import_s, run_fresh
+
+# Imported on first use only; importing one of them from main again would undo the lazy loading
+LAZY_MODULES = ["pypdf", "langchain_google_genai", "langchain_ollama", "weasyprint", "PIL", "langgraph"]
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    snippet = f"import json, sys, main; print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    assert json.loads(run_fresh(snippet).strip().splitlines()[-1]) == []
+
+
+def test_cold_import_is_within_budget():
+    # Best of three, so a busy machine does not fail the run on one slow start
+    best = min(cold_import_s() for _ in range(3))
+    assert best <= IMPORT_TIME_BUDGET_S, (
+        f"cold `import main` took {best:.2f}s, over the {IMPORT_TIME_BUDGET_S:.2f}s budget (IMPORT_TIME_BUDGET_S)"
+    )
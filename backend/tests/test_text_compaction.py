@@ -0,0 +1,54 @@
+from benchmarks.synthetic import make_messy_resume_pages
+from text_compaction import compact_resume_text, fit_to_budget, normalize_text, split_sections
+from tokens import estimate_tokens
+
+
+def _messy_text() -> str:
+    return "\n".join("\n".join(page) for page in make_messy_resume_pages(2))
+
+
+def test_normalize_cleans_pdf_artefacts():
+    text = "ﬁnance  team\n• Built data-inten-\nsive services\n*\n\n\n\nlinkedin.com/in/\njane-doe\nPage 2 of 3"
+    assert normalize_text(text) == "finance team\n- Built data-intensive services\n\nlinkedin.com/in/jane-doe"
+
+
+def test_same_bullet_under_two_jobs_is_kept():
+    text = "\n".join([
+        "Experience",
+        "Engineer | Acme | 2019 - 2021",
+        "- Collaborated with cross-functional teams on delivery",
+        "Engineer | Initech | 2021 - 2023",
+        "- Collaborated with cross-functional teams on delivery",
+    ])
+    assert normalize_text(text).count("- Collaborated with cross-functional teams on delivery") == 2
+
+
+def test_a_line_repeated_right_after_itself_is_collapsed():
+    text = "Skills\nPython, FastAPI, PostgreSQL\nPython, FastAPI, PostgreSQL\n\nPython, FastAPI, PostgreSQL\nEducation"
+    assert normalize_text(text) == "Skills\nPython, FastAPI, PostgreSQL\n\nEducation"
+
+
+def test_sections_are_split_on_known_headings():
+    sections = split_sections("Jane Doe\nExperience:\n- Built things\nSKILLS\nPython")
+    assert [name for name, _ in sections] == ["header", "experience", "skills"]
+    assert sections[1][1] == ["Experience:", "- Built things"]
+
+
+def test_budget_shortens_then_drops_low_priority_sections_first():
+    normalized = normalize_text(_messy_text())
+    budget = estimate_tokens(normalized) // 2
+    result = fit_to_budget(normalized, budget)
+
+    assert result.tokens <= budget
+    assert not result.truncated
+    assert "interests" in result.dropped_sections + result.shortened_sections
+    for heading in ("Experience", "Skills"):
+        assert heading in result.text
+    assert "Python, FastAPI, PostgreSQL" in result.text
+
+
+def test_no_budget_keeps_everything():
+    result = compact_resume_text(_messy_text(), budget=0)
+    assert result.text == normalize_text(_messy_text())
+    assert result.raw_tokens >= result.normalized_tokens == result.tokens
+    assert (result.shortened_sections, result.dropped_sections, result.truncated) == ([], [], False)
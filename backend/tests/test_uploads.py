@@ -0,0 +1,90 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+import upload_store
+from upload_store import (
+    UPLOAD_FORM_OVERHEAD_BYTES, UPLOAD_MAX_BYTES, MultipartLimitMiddleware, UploadTooLargeError, store_stream,
+)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _store(*parts: bytes, **kwargs):
+    return asyncio.run(store_stream(_chunks(*parts), **kwargs))
+
+
+def test_uploads_are_content_addressed_and_deduplicated(upload_dir):
+    first = _store(b"%PDF-1.4 ", b"same bytes", filename="Resume.PDF")
+    second = _store(b"%PDF-1.4 same bytes", filename="other.pdf")
+    other = _store(b"%PDF-1.4 other bytes", filename="weird name.exe!!")
+
+    assert first.path == second.path == os.path.join(str(upload_dir), first.sha256 + ".pdf")
+    assert (first.deduplicated, second.deduplicated, other.deduplicated) == (False, True, False)
+    assert first.size == len(b"%PDF-1.4 same bytes")
+    assert other.path.endswith(".pdf")
+    assert sorted(os.listdir(upload_dir)) == sorted([os.path.basename(first.path), os.path.basename(other.path)])
+
+
+def test_oversized_stream_leaves_nothing_on_disk(upload_dir):
+    with pytest.raises(UploadTooLargeError):
+        _store(b"x" * 60, b"x" * 60, max_bytes=100)
+    assert os.listdir(upload_dir) == []
+
+
+def test_raw_upload_extracts_and_reuses_the_stored_file(client, auth_headers, resume_pdf):
+    body = resume_pdf.read_bytes()
+    url = "/upload_resume/raw?filename=resume.pdf"
+    first = client.post(url, content=body, headers=auth_headers)
+    second = client.post(url, content=body, headers=auth_headers)
+    assert first.status_code == second.status_code == 200
+    assert first.json()["extracted_data"] == second.json()["extracted_data"]
+
+
+def test_raw_upload_over_the_limit_is_refused(client, auth_headers):
+    res = client.post("/upload_resume/raw", content=b"x" * (UPLOAD_MAX_BYTES + 1), headers=auth_headers)
+    assert res.status_code == 413
+
+
+def test_multipart_upload_over_the_limit_is_refused(client, auth_headers):
+    oversized = b"x" * (UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES + 1)
+    files = {"file": ("resume.pdf", oversized, "application/pdf")}
+    assert client.post("/upload_resume", files=files, headers=auth_headers).status_code == 413
+
+
+def test_multipart_body_without_length_is_cut_off_once_over_the_cap():
+    received = []
+
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            received.append(1)
+
+    async def receive():
+        return {"type": "http.request", "body": b"x" * 40, "more_body": True}
+
+    scope = {"type": "http", "headers": [(b"content-type", b"multipart/form-data; boundary=b")]}
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(MultipartLimitMiddleware(app, max_bytes=100)(scope, receive, None))
+    assert exc_info.value.status_code == 413
+    assert len(received) == 2
+
+    # Other requests are passed through untouched
+    scope["headers"] = [(b"content-type", b"application/pdf")]
+    received.clear()
+
+    async def finite_receive():
+        return {"type": "http.request", "body": b"x" * 40, "more_body": len(received) < 5}
+
+    asyncio.run(MultipartLimitMiddleware(app, max_bytes=100)(scope, finite_receive, None))
+    assert len(received) == 5
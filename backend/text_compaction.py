@@ -0,0 +1,200 @@
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from tokens import estimate_tokens
+
+# ---------------- Config ----------------
+# Upper bound on the resume text sent to the extraction model, in estimated tokens; 0 disables it
+EXTRACT_TOKEN_BUDGET = int(os.getenv("EXTRACT_TOKEN_BUDGET", "6000"))
+# Lines kept from a section that has to be shortened to fit the budget
+_SECTION_HEAD_LINES = 3
+
+# Bump when compaction output changes, so cached extractions are invalidated
+COMPACTION_VERSION = "2"
+
+_INVISIBLE = re.compile("[­​‌‍⁠﻿]")
+_BULLET = re.compile("^[•▪●◦‣⁃∙·■□–—*>\\-]+\\s*")
+_INLINE_SPACE = re.compile("[ \t  -   　]+")
+# "engi-\nneering" -> "engineering"; only when the next line continues in lowercase
+_HYPHEN_BREAK = re.compile(r"(\w)-\n([a-z])")
+# A URL or handle split across lines: "linkedin.com/in/\njane-doe"
+_URL_BREAK = re.compile(r"(\S*/(?:\S*[/\-_.@])?|\S+@)\n(?=[\w\-])")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+
+# Lower number = more important; sections are shortened from the highest number down
+SECTION_PRIORITY = {
+    "header": 0,
+    "experience": 0, "work experience": 0, "professional experience": 0, "employment": 0,
+    "skills": 0, "technical skills": 0,
+    "education": 1,
+    "summary": 1, "profile": 1, "objective": 1, "about": 1,
+    "projects": 2, "personal projects": 2,
+    "certifications": 3, "certificates": 3, "licenses": 3,
+    "achievements": 4, "awards": 4, "honors": 4,
+    "publications": 4, "volunteering": 4, "volunteer": 4, "languages": 4,
+    "interests": 5, "hobbies": 5, "activities": 5, "references": 5,
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lossless-for-the-model cleanup: ligatures and full-width forms (NFKC), invisible
+    characters, bullet glyphs, broken hyphenation and URLs, runs of spaces, page-number
+    lines, empty bullets, blank-line runs and a line repeated right after itself. A line
+    repeated further on (the same bullet under two jobs) is kept; page headers and
+    footers are stripped earlier, by pdf_text.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = _INVISIBLE.sub("", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+    text = _URL_BREAK.sub(r"\1", text)
+
+    lines = []
+    for raw_line in text.split("\n"):
+        line = _INLINE_SPACE.sub(" ", raw_line).strip()
+        bullet = _BULLET.match(line)
+        if bullet:
+            line = line[bullet.end():].strip()
+            if line:
+                line = "- " + line
+        if not line:
+            if lines and lines[-1] != "":
+                lines.append("")
+            continue
+        if _PAGE_NUMBER.match(line):
+            continue
+        previous = next((kept for kept in reversed(lines[-2:]) if kept), None)
+        if line == previous:
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _heading(line: str) -> Optional[str]:
+    name = line.strip().rstrip(":").strip().lower()
+    return name if name in SECTION_PRIORITY else None
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Splits normalized text into (section name, lines); text before the first heading is "header"."""
+    sections = [("header", [])]
+    for line in text.split("\n"):
+        name = _heading(line)
+        if name is not None:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if any(line.strip() for line in lines)]
+
+
+def _join(sections: List[Tuple[str, List[str]]]) -> str:
+    return "\n".join("\n".join(lines) for _, lines in sections).strip()
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    raw_tokens: int
+    normalized_tokens: int
+    tokens: int
+    shortened_sections: List[str] = field(default_factory=list)
+    dropped_sections: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+
+def fit_to_budget(text: str, budget: int) -> CompactionResult:
+    """
+    Shortens the lowest-priority sections until `text` fits in `budget` estimated tokens:
+    first each is cut to its heading and first lines with a note of what was left out,
+    then it is dropped. The top-priority sections are never touched; if they alone are
+    over budget the text is cut at the end.
+    """
+    tokens = estimate_tokens(text)
+    result = CompactionResult(text=text, raw_tokens=tokens, normalized_tokens=tokens, tokens=tokens)
+    if budget <= 0 or tokens <= budget:
+        return result
+
+    sections = split_sections(text)
+    for priority in sorted({SECTION_PRIORITY[name] for name, _ in sections if SECTION_PRIORITY[name] > 0},
+                           reverse=True):
+        for i in reversed(range(len(sections))):
+            name, lines = sections[i]
+            if SECTION_PRIORITY[name] != priority:
+                continue
+            body = lines[1:]
+            if len(body) > _SECTION_HEAD_LINES:
+                omitted = len(body) - _SECTION_HEAD_LINES
+                sections[i] = (name, [lines[0], *body[:_SECTION_HEAD_LINES], f"[{omitted} more lines omitted]"])
+                result.shortened_sections.append(name)
+            if estimate_tokens(_join(sections)) <= budget:
+                break
+        if estimate_tokens(_join(sections)) <= budget:
+            break
+        for i in reversed(range(len(sections))):
+            if SECTION_PRIORITY[sections[i][0]] == priority:
+                result.dropped_sections.append(sections[i][0])
+                del sections[i]
+                if estimate_tokens(_join(sections)) <= budget:
+                    break
+        if estimate_tokens(_join(sections)) <= budget:
+            break
+
+    text = _join(sections)
+    if estimate_tokens(text) > budget:
+        text = text[:budget * 4].rsplit("\n", 1)[0]
+        result.truncated = True
+    result.text = text
+    result.tokens = estimate_tokens(text)
+    result.shortened_sections = [s for s in result.shortened_sections if s not in result.dropped_sections]
+    return result
+
+
+def compact_resume_text(text: str, budget: int = EXTRACT_TOKEN_BUDGET) -> CompactionResult:
+    """
+    Normalizes raw PDF text and fits it to the token budget before extraction.
+
+    Args:
+        text (str): Text as returned by extract_text_from_pdf.
+        budget (int): Maximum estimated tokens; 0 disables the budget.
+
+    Returns:
+        CompactionResult: The compacted text with token counts at each stage.
+    """
+    raw_tokens = estimate_tokens(text)
+    normalized = normalize_text(text)
+    result = fit_to_budget(normalized, budget)
+    result.raw_tokens = raw_tokens
+    result.normalized_tokens = estimate_tokens(normalized)
+    return result
+
+
+class CompactionStats:
+    """Thread-safe running totals of tokens before and after compaction."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {"documents": 0, "raw_tokens": 0, "normalized_tokens": 0, "tokens": 0,
+                        "over_budget": 0, "truncated": 0}
+
+    def record(self, result: CompactionResult):
+        with self._lock:
+            self._totals["documents"] += 1
+            self._totals["raw_tokens"] += result.raw_tokens
+            self._totals["normalized_tokens"] += result.normalized_tokens
+            self._totals["tokens"] += result.tokens
+            self._totals["over_budget"] += bool(result.shortened_sections or result.dropped_sections or result.truncated)
+            self._totals["truncated"] += result.truncated
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            totals = dict(self._totals)
+        raw = totals["raw_tokens"] or 1
+        totals["reduction"] = round(1 - totals["tokens"] / raw, 3) if totals["documents"] else 0.0
+        return totals
+
+
+compaction_stats = CompactionStats()
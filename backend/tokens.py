@@ -0,0 +1,60 @@
+import math
+import threading
+from typing import Optional
+
+from metrics import record_tokens
+
+# Gemini averages roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, offline token estimate used when the provider does not report usage.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class TokenUsage:
+    """
+    Thread-safe running totals of LLM input/output tokens, grouped by a label
+    (for example the customization mode). Every record also feeds the
+    llm_tokens_total and llm_cost_usd_total metrics under `feature`.
+    """
+
+    def __init__(self, feature: str):
+        self.feature = feature
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict] = {}
+
+    def record(self, label: str, input_tokens: int, output_tokens: int):
+        with self._lock:
+            totals = self._totals.setdefault(label, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+        record_tokens(self.feature, label, input_tokens, output_tokens)
+
+    def record_message(self, label: str, prompt_text: str, output_text: str, message=None):
+        """
+        Records usage from an AIMessage's usage_metadata, falling back to estimates.
+        """
+        usage: Optional[dict] = getattr(message, "usage_metadata", None)
+        if usage:
+            self.record(label, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        else:
+            self.record(label, estimate_tokens(prompt_text), estimate_tokens(output_text))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            report = {}
+            for label, totals in self._totals.items():
+                calls = totals["calls"] or 1
+                report[label] = {
+                    **totals,
+                    "avg_input_tokens": round(totals["input_tokens"] / calls, 1),
+                    "avg_output_tokens": round(totals["output_tokens"] / calls, 1),
+                }
+            return report
@@ -0,0 +1,160 @@
+"""
+Content-addressed storage for uploaded files.
+
+Uploads are copied to disk in chunks while a SHA-256 is computed, and stored as
+uploads/<sha256><ext>: identical uploads share one file, uploads from different
+users never overwrite each other, and the hash is handed to the extraction cache
+so the file is not read a second time. The size limit is checked before the first
+byte when the size is known, and again on every chunk.
+
+Starlette parses a multipart form, spooling its files to temp files, before the endpoint
+runs, so for multipart uploads those checks come too late to protect anything.
+MultipartLimitMiddleware caps multipart bodies while they are received instead.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from metrics import record_cache
+
+# ---------------- Config ----------------
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+# Room for the other form fields and the boundaries around the file in a multipart body
+UPLOAD_FORM_OVERHEAD_BYTES = int(os.getenv("UPLOAD_FORM_OVERHEAD_BYTES", str(64 * 1024)))
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    # True when the same content was already stored and the new copy was discarded
+    deduplicated: bool
+
+
+def _extension(filename: Optional[str], default: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXTENSION.match(ext) else default
+
+
+def check_size(size: Optional[int], max_bytes: int = UPLOAD_MAX_BYTES):
+    """Rejects an upload from its declared size (Content-Length, multipart part size)."""
+    if size is not None and size > max_bytes:
+        raise UploadTooLargeError(f"Upload is {size} bytes; the limit is {max_bytes} bytes")
+
+
+async def store_stream(
+    chunks: AsyncIterator[bytes], filename: Optional[str] = None, default_ext: str = ".pdf",
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> StoredUpload:
+    """
+    Writes chunks to a temp file as they arrive, hashing them on the way, then moves
+    it to its content-addressed name. Raises UploadTooLargeError as soon as the data
+    goes over `max_bytes`; nothing is left on disk then.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The upload body.
+        filename (Optional[str]): Client file name; only its extension is kept.
+        default_ext (str): Extension used when the file name has none.
+        max_bytes (int): Size limit.
+
+    Returns:
+        StoredUpload: Where the content is stored and its hash.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload is over the {max_bytes} byte limit")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+
+        sha256 = digest.hexdigest()
+        path = os.path.join(UPLOAD_DIR, sha256 + _extension(filename, default_ext))
+        deduplicated = os.path.exists(path)
+        if deduplicated:
+            os.remove(tmp_path)
+        else:
+            # Rename is atomic, so concurrent identical uploads still leave one complete file
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    record_cache("upload", deduplicated)
+    return StoredUpload(path=path, sha256=sha256, size=size, deduplicated=deduplicated)
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        yield chunk
+
+
+async def store_upload(file: UploadFile, default_ext: str = ".pdf", max_bytes: int = UPLOAD_MAX_BYTES) -> StoredUpload:
+    """
+    Stores a multipart UploadFile chunk by chunk, instead of reading it into memory.
+    Starlette has already spooled the whole part by then; MultipartLimitMiddleware is
+    what bounds the body while it arrives.
+    """
+    check_size(file.size, max_bytes)
+    return await store_stream(_read_chunks(file), file.filename, default_ext, max_bytes)
+
+
+class MultipartLimitMiddleware:
+    """
+    ASGI middleware that caps multipart request bodies at UPLOAD_MAX_BYTES plus
+    UPLOAD_FORM_OVERHEAD_BYTES. A declared Content-Length over the cap is answered with
+    413 before any of the body is read; a body without one is cut off with 413 as soon
+    as it goes over, while Starlette is still parsing the form.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers") or []) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/"):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body is over the {self.max_bytes} byte upload limit"
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside the form parser; FastAPI passes HTTPExceptions through
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,25 +1,34 @@
+import asyncio
 import base64
+import hashlib
+import time
+from functools import lru_cache
 from typing import Optional, Tuple
+from jinja2 import TemplateError
+from jinja2.sandbox import SandboxedEnvironment
 from sqlalchemy.orm import Session
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from weasyprint import HTML
-import tempfile
-import os
 from dotenv import load_dotenv
-from models import User, Resume, ResumeCustomization
+from database import insert_or_ignore
+from models import Resume, ResumeCustomization, LayoutTemplate
+from resume_models import ResumeExtractionData
 from langchain_core.messages import SystemMessage
+from executors import limited
+from llm_clients import chat_model, model_name
+from pdf_renderer import render_pdf
+from metrics import observe_stage, record_cache, span
+from tokens import TokenUsage
+from image_normalizer import NORMALIZE_VERSION, NormalizedImage, anormalize_image, normalize_image
 
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+VISION_MODEL_NAME = model_name()
 
-# Base chat model (multimodal)
-vision_model = ChatGoogleGenerativeAI(
-    model="models/gemini-2.5-flash",
-    api_key=GEMINI_API_KEY,
-    # you can tune generation params here if you like
-)
+# Base chat model (multimodal), shared with the other LLM features through llm_clients
+vision_model = chat_model()
+
+# Tokens in and out of every vision call (image tokens only when the provider reports usage)
+render_token_usage = TokenUsage("render")
 
 SYSTEM_PROMPT = """You are a resume layout generator.
 You will be given:
@@ -42,38 +51,18 @@ HTML_PROMPT_TMPL = ChatPromptTemplate.from_messages([
      "Now generate the full inline-CSS HTML for an A4 resume that matches the look of the attached image.")
 ])
 
-from weasyprint import HTML, CSS
+def html_to_pdf_bytes(html: str):
+    # Rendered on the warm WeasyPrint pool, with cached results for identical HTML
+    return render_pdf(html)
 
 
-def html_to_pdf_bytes(html: str):
-    css = CSS(string="""
-        @page {
-            size: A4;
-            margin: 1.5cm;
-        }
-        body {
-            margin: 0 auto;
-            box-sizing: border-box;
-        }
-        * {
-            max-width: 100%;
-            box-sizing: border-box;
-        }
-    """)
-    pdf_bytes = HTML(string=html).write_pdf(stylesheets=[css])
-    return pdf_bytes
-
-
-def _encode_image_to_data_uri(image_bytes: bytes, filename: str) -> str:
-    import mimetypes
-    mime, _ = mimetypes.guess_type(filename)
-    mime = mime or "image/png"
-    b64 = base64.b64encode(image_bytes).decode("utf-8")
-    return f"data:{mime};base64,{b64}"
+def _encode_image_to_data_uri(image: NormalizedImage) -> str:
+    b64 = base64.b64encode(image.data).decode("utf-8")
+    return f"data:{image.mime};base64,{b64}"
 
 def _get_resume_json_for_user(
     db: Session,
-    user: User,
+    user_id: int,
     source: str,
     customization_id: Optional[int]
 ) -> Tuple[str, Optional[int]]:
@@ -81,24 +70,24 @@ def _get_resume_json_for_user(
     Returns (resume_json_string, customization_id_used)
     """
     if source == "customized":
-        q = db.query(ResumeCustomization).filter(ResumeCustomization.user_id == user.id)
+        q = db.query(ResumeCustomization).filter(ResumeCustomization.user_id == user_id)
         if customization_id:
             q = q.filter(ResumeCustomization.id == customization_id)
         customization = q.order_by(ResumeCustomization.id.desc()).first()
         if not customization:
             raise ValueError("No customized resume found for this user.")
-        return customization.customized_data, customization.id
+        return customization.customized_json, customization.id
     else:
         # original (latest extracted resume)
         resume = (
             db.query(Resume)
-            .filter(Resume.user_id == user.id)
+            .filter(Resume.user_id == user_id)
             .order_by(Resume.id.desc())
             .first()
         )
         if not resume:
             raise ValueError("No original resume found for this user.")
-        return resume.extracted_data, None
+        return resume.extracted_json, None
     
 import re
 
@@ -114,23 +103,21 @@ def extract_html_only(text: str) -> str:
     # Case 2: already plain HTML
     return text.strip()
 
-def render_html_from_image_and_json(
+def _build_render_messages(
     db: Session,
-    username: str,
-    image_bytes: bytes,
-    filename: str,
-    source: str = "original",
-    customization_id: Optional[int] = None
-) -> dict:
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise ValueError("User not found.")
-
+    user_id: int,
+    image: NormalizedImage,
+    source: str,
+    customization_id: Optional[int]
+) -> Tuple[list, Optional[int]]:
+    """
+    Returns ([system_message, human_message], customization_id_used)
+    """
     resume_json, used_customization_id = _get_resume_json_for_user(
-        db, user, source, customization_id
+        db, user_id, source, customization_id
     )
 
-    data_uri = _encode_image_to_data_uri(image_bytes, filename)
+    data_uri = _encode_image_to_data_uri(image)
 
     # Build prompt messages
     prompt = HTML_PROMPT_TMPL.format_messages(resume_json=resume_json)
@@ -142,9 +129,24 @@ def render_html_from_image_and_json(
             {"type": "image_url", "image_url": data_uri},
         ]
     )
+    return [system_message, human_message], used_customization_id
+
+
+def render_html_from_image_and_json(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    filename: str,
+    source: str = "original",
+    customization_id: Optional[int] = None
+) -> dict:
+    image = normalize_image(image_bytes, filename)
+    messages, used_customization_id = _build_render_messages(db, user_id, image, source, customization_id)
 
     # Call Gemini
-    result = vision_model.invoke([system_message, human_message])
+    with span("llm_render"):
+        result = vision_model.invoke(messages)
+    _record_usage("direct", messages, result)
     html = result.content
     html = extract_html_only(html)
 
@@ -153,3 +155,278 @@ def render_html_from_image_and_json(
         "source": source,
         "customization_id": used_customization_id,
     }
+
+
+async def arender_html_from_image_and_json(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    filename: str,
+    source: str = "original",
+    customization_id: Optional[int] = None
+) -> dict:
+    """
+    Async variant of render_html_from_image_and_json using the model's ainvoke,
+    limited by the llm_render stage.
+    """
+    image = await anormalize_image(image_bytes, filename)
+    messages, used_customization_id = await asyncio.to_thread(
+        _build_render_messages, db, user_id, image, source, customization_id
+    )
+
+    async with limited("llm_render"):
+        with span("llm_render"):
+            result = await vision_model.ainvoke(messages)
+    _record_usage("direct", messages, result)
+    html = extract_html_only(result.content)
+
+    return {
+        "html": html,
+        "source": source,
+        "customization_id": used_customization_id,
+    }
+
+
+def _chunk_text(chunk) -> str:
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    # Multimodal models may return a list of content parts
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def _record_usage(label: str, messages: list, message):
+    prompt_text = "\n".join(_chunk_text(m) for m in messages)
+    render_token_usage.record_message(label, prompt_text, _chunk_text(message), message)
+
+
+async def astream_html_from_image_and_json(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    filename: str,
+    source: str = "original",
+    customization_id: Optional[int] = None
+):
+    """
+    Streaming variant of arender_html_from_image_and_json: yields ("token", text) for
+    every chunk the vision model streams back, then ("html", result) with the same
+    dict the non-streaming call returns.
+    """
+    image = await anormalize_image(image_bytes, filename)
+    messages, used_customization_id = await asyncio.to_thread(
+        _build_render_messages, db, user_id, image, source, customization_id
+    )
+
+    parts = []
+    # Chunks add up to one message carrying the usage metadata of the whole call
+    message = None
+    async with limited("llm_render"):
+        started = time.perf_counter()
+        waited = 0.0
+        async for chunk in vision_model.astream(messages):
+            message = chunk if message is None else message + chunk
+            text = _chunk_text(chunk)
+            if text:
+                parts.append(text)
+                # Not a span(): the consumer's time between chunks is not model time
+                yielded = time.perf_counter()
+                yield "token", text
+                waited += time.perf_counter() - yielded
+        observe_stage("llm_render", time.perf_counter() - started - waited)
+    if message is not None:
+        _record_usage("direct", messages, message)
+
+    yield "html", {
+        "html": extract_html_only("".join(parts)),
+        "source": source,
+        "customization_id": used_customization_id,
+    }
+
+
+# ---------------- Reusable layout templates ----------------
+# The vision model is asked once per layout image for a Jinja2 template; every later
+# render with that image fills the cached template locally, with no model call.
+
+TEMPLATE_SYSTEM_PROMPT = """You are a resume layout template generator.
+You will be given a screenshot/photo of a resume's layout.
+
+Your job:
+- Produce a single complete HTML document (<!DOCTYPE html> ... </html>) for an A4-sized resume that *visually* follows the look & structure of the image.
+- Write it as a Jinja2 template. ALL content must come from the `resume` variable; never copy text from the image.
+- Available fields:
+  resume.name, resume.email, resume.phone,
+  resume.education: list of {degree, institution, start_date, end_date, grade},
+  resume.projects: list of {project_name, description, technologies (list of strings), link},
+  resume.experience: list of {job_title, company, location, start_date, end_date, responsibilities (list of strings)},
+  resume.skills: list of strings,
+  resume.other_info.certifications, resume.other_info.languages, resume.other_info.achievements: lists of strings,
+  resume.other_info.links.linkedin, resume.other_info.links.github, resume.other_info.links.portfolio.
+- Wrap every optional field and section in {% if ... %} so empty data is skipped gracefully, and use {% for %} loops for lists.
+- Use INLINE CSS only (no external CSS, no JS, no external fonts). Optimize for print (A4), small margins (e.g., 1.5cm).
+- Return the template only. No explanations.
+"""
+
+TEMPLATE_HUMAN_PROMPT = "Generate the Jinja2 HTML template for an A4 resume that matches the look of the attached image."
+
+# Part of the template cache key, so prompt, model or image-normalization changes do not reuse stale templates
+TEMPLATE_PROMPT_VERSION = hashlib.sha256(
+    (TEMPLATE_SYSTEM_PROMPT + TEMPLATE_HUMAN_PROMPT + VISION_MODEL_NAME + NORMALIZE_VERSION).encode("utf-8")
+).hexdigest()[:16]
+
+_template_env = SandboxedEnvironment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+_template_locks: dict[str, asyncio.Lock] = {}
+
+
+def _template_cache_key(image_hash: str) -> str:
+    return hashlib.sha256(f"{image_hash}:{TEMPLATE_PROMPT_VERSION}".encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _compile_template(template_text: str):
+    return _template_env.from_string(template_text)
+
+
+def fill_layout_template(template_text: str, resume_json) -> str:
+    """
+    Fills a cached layout template with resume or customization JSON. Missing
+    fields fall back to ResumeExtractionData defaults, so templates never see None lists.
+    """
+    if isinstance(resume_json, dict):
+        resume = ResumeExtractionData.model_validate(resume_json)
+    else:
+        resume = ResumeExtractionData.model_validate_json(resume_json)
+    return _compile_template(template_text).render(resume=resume.model_dump())
+
+
+def _template_messages(image: NormalizedImage) -> list:
+    return [
+        SystemMessage(content=TEMPLATE_SYSTEM_PROMPT),
+        HumanMessage(content=[
+            {"type": "text", "text": TEMPLATE_HUMAN_PROMPT},
+            {"type": "image_url", "image_url": _encode_image_to_data_uri(image)},
+        ]),
+    ]
+
+
+def _validated_template(model_output: str) -> str:
+    template_text = extract_html_only(model_output)
+    try:
+        # Compile and dry-run with an empty resume so broken templates are never cached
+        fill_layout_template(template_text, ResumeExtractionData().model_dump())
+    except TemplateError as e:
+        raise RuntimeError(f"Vision model returned an invalid layout template: {e}")
+    return template_text
+
+
+def _load_template(db: Session, cache_key: str) -> Optional[str]:
+    row = db.get(LayoutTemplate, cache_key)
+    if row is None:
+        return None
+    row.hit_count += 1
+    db.commit()
+    return row.template
+
+
+def _save_template(db: Session, cache_key: str, image_hash: str, template_text: str):
+    # The sync path has no lock: concurrent first renders of one image keep the first template
+    insert_or_ignore(db, LayoutTemplate, {
+        "cache_key": cache_key, "image_hash": image_hash, "template": template_text, "hit_count": 0,
+    }, ["cache_key"])
+    db.commit()
+
+
+def get_layout_template(db: Session, image_bytes: bytes, filename: str) -> Tuple[str, bool]:
+    """
+    Returns (template, cache_hit) for a layout image, asking the vision model only on a miss.
+    """
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    cache_key = _template_cache_key(image_hash)
+    with span("template_lookup"):
+        template_text = _load_template(db, cache_key)
+    record_cache("layout_template", template_text is not None)
+    if template_text is not None:
+        return template_text, True
+
+    messages = _template_messages(normalize_image(image_bytes, filename, image_hash))
+    with span("llm_render_template"):
+        result = vision_model.invoke(messages)
+    _record_usage("template", messages, result)
+    template_text = _validated_template(result.content)
+    _save_template(db, cache_key, image_hash, template_text)
+    return template_text, False
+
+
+async def aget_layout_template(db: Session, image_bytes: bytes, filename: str) -> Tuple[str, bool]:
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    cache_key = _template_cache_key(image_hash)
+    with span("template_lookup"):
+        template_text = await asyncio.to_thread(_load_template, db, cache_key)
+    if template_text is not None:
+        record_cache("layout_template", True)
+        return template_text, True
+
+    # Concurrent first renders of the same image share one model call
+    lock = _template_locks.setdefault(cache_key, asyncio.Lock())
+    try:
+        async with lock:
+            template_text = await asyncio.to_thread(_load_template, db, cache_key)
+            # Waiting for a concurrent render of the same image still saves a model call
+            record_cache("layout_template", template_text is not None)
+            if template_text is not None:
+                return template_text, True
+            messages = _template_messages(await anormalize_image(image_bytes, filename, image_hash))
+            async with limited("llm_render"):
+                with span("llm_render_template"):
+                    result = await vision_model.ainvoke(messages)
+            _record_usage("template", messages, result)
+            template_text = _validated_template(result.content)
+            await asyncio.to_thread(_save_template, db, cache_key, image_hash, template_text)
+    finally:
+        # Also on failure, or every image the model fails on would leave a lock behind.
+        # Only our own lock: a later caller may already have put a new one in its place.
+        if _template_locks.get(cache_key) is lock:
+            del _template_locks[cache_key]
+    return template_text, False
+
+
+def render_html_from_template(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    filename: str,
+    source: str = "original",
+    customization_id: Optional[int] = None
+) -> dict:
+    """
+    Same contract as render_html_from_image_and_json, but fills a cached per-image
+    template locally. Only the first render of a new layout image calls the model.
+    """
+    resume_json, used_customization_id = _get_resume_json_for_user(db, user_id, source, customization_id)
+    template_text, cache_hit = get_layout_template(db, image_bytes, filename)
+    return {
+        "html": fill_layout_template(template_text, resume_json),
+        "source": source,
+        "customization_id": used_customization_id,
+        "template_cache_hit": cache_hit,
+    }
+
+
+async def arender_html_from_template(
+    db: Session,
+    user_id: int,
+    image_bytes: bytes,
+    filename: str,
+    source: str = "original",
+    customization_id: Optional[int] = None
+) -> dict:
+    resume_json, used_customization_id = await asyncio.to_thread(
+        _get_resume_json_for_user, db, user_id, source, customization_id
+    )
+    template_text, cache_hit = await aget_layout_template(db, image_bytes, filename)
+    return {
+        "html": fill_layout_template(template_text, resume_json),
+        "source": source,
+        "customization_id": used_customization_id,
+        "template_cache_hit": cache_hit,
+    }
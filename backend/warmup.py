@@ -0,0 +1,45 @@
+"""
+Optional warm-up of what the backend loads lazily (PDF parser, LLM clients), for
+deployments that would rather pay for it at startup than on the first request.
+
+WARM_UP_ON_STARTUP=background warms up in a thread while requests are already served;
+WARM_UP_ON_STARTUP=blocking finishes before the server accepts requests, so a
+readiness probe only passes once everything is loaded.
+"""
+import importlib
+import os
+import threading
+import time
+
+from llm_clients import warm_up_clients
+
+# ---------------- Config ----------------
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "off")  # "off", "background" or "blocking"
+if WARM_UP_ON_STARTUP not in ("off", "background", "blocking"):
+    raise ValueError(f"Invalid WARM_UP_ON_STARTUP: {WARM_UP_ON_STARTUP}")
+
+# Seconds taken by each step of the last warm-up
+last_warm_up: dict = {}
+
+
+def warm_up() -> dict:
+    """Loads the lazily imported dependencies now; returns the seconds each step took."""
+    steps = {
+        "pypdf": lambda: importlib.import_module("pypdf"),
+        "llm_clients": warm_up_clients,
+    }
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - start, 3)
+    last_warm_up.clear()
+    last_warm_up.update(timings)
+    return timings
+
+
+def warm_up_on_startup():
+    if WARM_UP_ON_STARTUP == "blocking":
+        warm_up()
+    elif WARM_UP_ON_STARTUP == "background":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
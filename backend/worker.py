@@ -0,0 +1,41 @@
+"""
+Standalone job worker. Runs the same handlers as the API's in-process workers,
+so extraction and rendering can be scaled separately from the web tier:
+
+    python worker.py --concurrency 4
+
+Start the API with JOB_API_WORKERS=0 to leave all jobs to these processes.
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from database import engine
+from migrations import upgrade_schema
+from jobs import JobWorker
+import job_handlers  # noqa: F401  (registers handlers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background resume jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of worker threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    upgrade_schema(engine)
+
+    worker = JobWorker(concurrency=args.concurrency)
+    worker.start()
+    logging.info("Job worker started with %s threads", args.concurrency)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    stop.wait()
+
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
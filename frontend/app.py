@@ -1,3 +1,5 @@
+import json
+import time
 import streamlit as st
 import requests
 from streamlit.components.v1 import html as components_html
@@ -9,18 +11,81 @@ st.set_page_config(page_title="Login System", page_icon="🔐")
 st.title("🔐 FastAPI + Streamlit Login Demo")
 
 menu = ["Home", "Register", "Login", "Upload Resume", "Customize Resume",
-        "View Custom Resumes", "Render Resume from Image", "Logout"]
+        "Batch Customize", "View Custom Resumes", "Render Resume from Image", "Logout"]
 choice = st.sidebar.selectbox("Menu", menu)
 
 
 if "logged_in_user" not in st.session_state:
     st.session_state.logged_in_user = None
+if "access_token" not in st.session_state:
+    st.session_state.access_token = None
+
+
+def auth_headers():
+    """Bearer header for the logged-in session (empty when logged out)."""
+    token = st.session_state.access_token
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def logout():
+    if st.session_state.access_token:
+        requests.post(f"{API_URL}/logout", headers=auth_headers())
+    st.session_state.logged_in_user = None
+    st.session_state.access_token = None
+
+
+def run_job(path, data, files=None, timeout=600, poll_interval=1.0):
+    """
+    Submits a background job to the API and polls until it finishes.
+    Returns (True, result) on success or (False, error_message).
+    """
+    res = requests.post(f"{API_URL}/jobs/{path}", files=files, data=data, headers=auth_headers())
+    if res.status_code != 202:
+        return False, res.json().get("detail", "Could not submit job")
+
+    job_id = res.json()["job_id"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = requests.get(f"{API_URL}/jobs/{job_id}", headers=auth_headers()).json()
+        if status.get("status") == "succeeded":
+            return True, requests.get(f"{API_URL}/jobs/{job_id}/result", headers=auth_headers()).json()["result"]
+        if status.get("status") == "failed":
+            return False, status.get("error") or "Job failed"
+        time.sleep(poll_interval)
+    return False, "Timed out waiting for the job to finish"
+
+
+def stream_events(path, data, files=None, timeout=600):
+    """
+    Posts to a server-sent-events endpoint and yields (event, data) pairs as they arrive.
+    """
+    with requests.post(f"{API_URL}/{path}", files=files, data=data, headers=auth_headers(),
+                       stream=True, timeout=timeout) as res:
+        if res.status_code != 200:
+            yield "error", {"detail": res.json().get("detail", "Request failed")}
+            return
+        event = None
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:") and event:
+                yield event, json.loads(line[len("data:"):])
+                event = None
+
+
+UPLOAD_STAGES = {
+    "accepted": "Uploaded, reading PDF...",
+    "parsed": "Text extracted, calling the model...",
+    "extracted": "Structured data extracted, saving...",
+    "saved": "Saved.",
+}
+
 
 if choice == "Home":
     if st.session_state.logged_in_user:
         st.success(f"Welcome, {st.session_state.logged_in_user}!")
         if st.button("Logout"):
-            st.session_state.logged_in_user = None
+            logout()
             st.info("Logged out successfully")
     else:
         st.warning("Please login or register")
@@ -48,6 +113,7 @@ elif choice == "Login":
         res = requests.post(f"{API_URL}/login", data={"username": username, "password": password})
         if res.status_code == 200:
             st.session_state.logged_in_user = res.json()["username"]
+            st.session_state.access_token = res.json()["access_token"]
             st.success(f"Logged in as {st.session_state.logged_in_user}")
             # Redirect to Upload Resume page
             # st.session_state["redirect_page"] = "Upload Resume"
@@ -63,18 +129,46 @@ elif choice == "Upload Resume":
     if uploaded_file is not None:
         if st.button("Upload"):
             files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-            data = {"username": st.session_state.logged_in_user}
-            res = requests.post(f"{API_URL}/upload_resume", files=files, data=data)
-            if res.status_code == 200:
+            extracted, error = None, None
+            with st.status("Extracting resume...", expanded=True) as status:
+                for event, payload in stream_events("upload_resume/stream", {}, files=files):
+                    if event in UPLOAD_STAGES:
+                        status.update(label=UPLOAD_STAGES[event])
+                    if event == "section":
+                        st.write(f"Extracted {payload['section']}")
+                    elif event == "extracted":
+                        extracted = payload["extracted_data"]
+                    elif event == "error":
+                        error = payload["detail"]
+                status.update(label="Failed" if error else "Done", state="error" if error else "complete")
+            if error is None and extracted is not None:
                 st.success("Resume uploaded and processed!")
-                st.json(res.json()["extracted_data"])
+                st.json(extracted)
             else:
-                st.error(res.json().get("detail", "Upload failed"))
+                st.error(error or "Extraction did not finish")
 
 elif choice == "Customize Resume":
     st.subheader("Customize Resume with Job Post")
 
     job_post_text = st.text_area("Paste LinkedIn Job Post Text", height=200)
+    engine = st.radio(
+        "Customization engine",
+        ["LLM", "Local (instant)", "Auto (local, LLM if unsure)"],
+        horizontal=True
+    )
+    mode = {"LLM": "llm", "Local (instant)": "local"}.get(engine, "auto")
+    warm_start = st.checkbox("Start from my most similar past job post when there is a close match", value=False)
+
+    if st.session_state.logged_in_user and job_post_text and st.button("Find similar past job posts"):
+        res = requests.post(f"{API_URL}/similar_customizations", data={"job_post": job_post_text, "k": 5},
+                            headers=auth_headers())
+        if res.status_code == 200 and res.json()["similar"]:
+            for item in res.json()["similar"]:
+                st.write(f"**#{item['customization_id']}** ({item['score']:.0%} similar): {item['job_post_snippet']}...")
+        elif res.status_code == 200:
+            st.info("No past job posts yet.")
+        else:
+            st.error(res.json().get("detail", "Could not search past job posts"))
 
     if st.button("Generate & Save Customized Resume"):
         if not st.session_state.logged_in_user:
@@ -82,17 +176,62 @@ elif choice == "Customize Resume":
         elif not job_post_text:
             st.error("Please provide a job post text.")
         else:
+            with st.spinner("Customizing resume..."):
+                ok, result = run_job(
+                    "customize_resume",
+                    {"job_post": job_post_text, "mode": mode, "warm_start": warm_start}
+                )
+
+            if ok:
+                if result.get("reused"):
+                    st.info("You already tailored this resume to this job post; showing that version.")
+                elif result.get("mode") == "warm_start":
+                    st.success("Saved, starting from the skills of a very similar past job post.")
+                else:
+                    st.success("Customized Resume saved successfully!")
+                st.json(result["customized_resume"])
+            else:
+                st.error(result)
+
+
+elif choice == "Batch Customize":
+    st.subheader("Customize Resume for Many Job Posts")
+
+    batch_text = st.text_area("Paste job posts, separated by a line containing only ---", height=300)
+
+    if st.button("Generate & Save All"):
+        job_posts = [post.strip() for post in batch_text.split("\n---\n") if post.strip()]
+        if not st.session_state.logged_in_user:
+            st.error("Please login first.")
+        elif not job_posts:
+            st.error("Please provide at least one job post.")
+        else:
+            progress = st.progress(0.0, text=f"0 / {len(job_posts)} done")
             res = requests.post(
-                f"{API_URL}/customize_resume",
-                data={"username": st.session_state.logged_in_user, "job_post": job_post_text}
+                f"{API_URL}/customize_resume_batch",
+                data={"job_posts": job_posts},
+                headers=auth_headers(),
+                stream=True
             )
-
-            if res.status_code == 200:
-                data = res.json()
-                st.success("Customized Resume saved successfully!")
-                st.json(data["customized_resume"])
+            if res.status_code != 200:
+                st.error(res.json().get("detail", "Error while customizing resumes"))
             else:
-                st.error(res.json().get("detail", "Error while customizing resume"))
+                done = 0
+                for line in res.iter_lines():
+                    if not line:
+                        continue
+                    item = json.loads(line)
+                    if item["status"] == "done":
+                        st.success(f"Saved {item['saved']} customized resumes, reused {item.get('reused', 0)} "
+                                   f"({item['failed']} failed).")
+                        continue
+                    done += 1
+                    progress.progress(done / len(job_posts), text=f"{done} / {len(job_posts)} done")
+                    with st.expander(f"Job post #{item['index'] + 1}: {job_posts[item['index']][:60]}"):
+                        if item["status"] == "ok":
+                            st.json(item["customized_resume"])
+                        else:
+                            st.error(item["detail"])
 
 
 elif choice == "View Custom Resumes":
@@ -101,19 +240,33 @@ elif choice == "View Custom Resumes":
     if not st.session_state.logged_in_user:
         st.error("Please login first.")
     else:
-        res = requests.get(f"{API_URL}/get_customized_resumes", params={"username": st.session_state.logged_in_user})
+        # Cursors of the pages visited so far; the last one is the page on screen
+        if "view_cursors" not in st.session_state:
+            st.session_state.view_cursors = [None]
+        cursor = st.session_state.view_cursors[-1]
+        params = {"limit": 10} if cursor is None else {"limit": 10, "cursor": cursor}
+        res = requests.get(f"{API_URL}/get_customized_resumes", params=params, headers=auth_headers())
 
         if res.status_code == 200:
             customizations = res.json().get("customizations", [])
+            next_cursor = res.json().get("next_cursor")
             if not customizations:
                 st.info("No customized resumes found.")
             else:
-                for idx, c in enumerate(customizations, start=1):
-                    with st.expander(f"Customization #{idx} (ID: {c['id']})"):
+                for c in customizations:
+                    with st.expander(f"Customization ID: {c['id']} ({c.get('created_at') or 'unknown date'})"):
                         st.write("**Job Post Used:**")
-                        st.text_area("Job Post", c["job_post_text"], height=150)
+                        st.text_area("Job Post", c["job_post_text"], height=150, key=f"post-{c['id']}")
                         st.write("**Customized Resume JSON:**")
                         st.json(c["customized_data"])
+
+            prev_col, next_col = st.columns(2)
+            if len(st.session_state.view_cursors) > 1 and prev_col.button("⬅️ Newer"):
+                st.session_state.view_cursors.pop()
+                st.rerun()
+            if next_cursor and next_col.button("Older ➡️"):
+                st.session_state.view_cursors.append(next_cursor)
+                st.rerun()
         else:
             st.error(res.json().get("detail", "Error while fetching custom resumes"))
 
@@ -132,10 +285,11 @@ elif choice == "Render Resume from Image":
         selected_custom_obj = None
 
         if source_key == "customized":
-            # fetch list of customizations
+            # fetch a lightweight list of customizations (id + snippet only)
             res = requests.get(
                 f"{API_URL}/get_customized_resumes",
-                params={"username": st.session_state.logged_in_user}
+                params={"summary": "true", "limit": 200},
+                headers=auth_headers()
             )
             if res.status_code == 200:
                 customizations = res.json().get("customizations", [])
@@ -143,17 +297,29 @@ elif choice == "Render Resume from Image":
                     st.info("No customized resumes found. Please create one first.")
                 else:
                     options = {
-                        f"#{c['id']} – {(c['job_post_text'][:60] + '...') if len(c['job_post_text']) > 60 else c['job_post_text']}": c
+                        f"#{c['id']} – {(c['job_post_snippet'][:60] + '...') if len(c['job_post_snippet']) > 60 else c['job_post_snippet']}": c
                         for c in customizations
                     }
                     choice_label = st.selectbox("Pick a customization", list(options.keys()))
-                    selected_custom_obj = options[choice_label]
-                    customization_id = selected_custom_obj["id"]
-                    with st.expander("Selected Customized JSON Preview"):
-                        st.json(selected_custom_obj["customized_data"])
+                    customization_id = options[choice_label]["id"]
+                    # Fetch only the selected row's JSON: the first row older than id + 1
+                    detail = requests.get(
+                        f"{API_URL}/get_customized_resumes",
+                        params={"cursor": customization_id + 1, "limit": 1, "fields": "id,customized_data"},
+                        headers=auth_headers()
+                    )
+                    if detail.status_code == 200 and detail.json().get("customizations"):
+                        selected_custom_obj = detail.json()["customizations"][0]
+                        with st.expander("Selected Customized JSON Preview"):
+                            st.json(selected_custom_obj["customized_data"])
             else:
                 st.error(res.json().get("detail", "Failed to load customized resumes."))
 
+        reuse_layout = st.checkbox(
+            "Reuse layout template (only the first render of an image calls the model)",
+            value=True
+        )
+
         uploaded_img = st.file_uploader(
             "Upload a resume screenshot/photo (PNG/JPG)",
             type=["png", "jpg", "jpeg"]
@@ -167,21 +333,35 @@ elif choice == "Render Resume from Image":
             else:
                 files = {"file": (uploaded_img.name, uploaded_img.getvalue(), uploaded_img.type)}
                 data = {
-                    "username": st.session_state.logged_in_user,
-                    "source": source_key
+                    "source": source_key,
+                    "mode": "template" if reuse_layout else "direct"
                 }
                 if customization_id:
                     data["customization_id"] = customization_id
 
-                with st.spinner("Rendering..."):
-                    res = requests.post(
-                        f"{API_URL}/render_resume_from_image",
-                        files=files,
-                        data=data
-                    )
-
-                if res.status_code == 200:
-                    response_data = res.json()
+                ok, response_data, html_so_far = False, None, ""
+                with st.status("Rendering...", expanded=True) as status:
+                    preview = st.empty()
+                    for event, payload in stream_events("render_resume_from_image/stream", data, files=files):
+                        if event == "token":
+                            html_so_far += payload["text"]
+                            preview.code(html_so_far[-2000:], language="html")
+                        elif event == "template":
+                            status.update(label="Filling cached layout..." if payload["cache_hit"]
+                                          else "Generating layout template...")
+                        elif event == "html":
+                            response_data = payload
+                            preview.empty()
+                            status.update(label="HTML ready, converting to PDF...")
+                        elif event == "pdf_ready":
+                            response_data["pdf_url"] = payload["pdf_url"]
+                        elif event == "done":
+                            ok = True
+                        elif event == "error":
+                            response_data = payload["detail"]
+                    status.update(label="Done" if ok else "Failed", state="complete" if ok else "error")
+
+                if ok:
                     html_text = response_data["html"]
                     pdf_url = response_data.get("pdf_url")
 
@@ -206,10 +386,10 @@ elif choice == "Render Resume from Image":
                         )
 
                 else:
-                    st.error(res.json().get("detail", "Rendering failed"))
+                    st.error(response_data)
 
 
 # ---- Logout ----
 elif choice == "Logout":
-    st.session_state.logged_in_user = None
+    logout()
     st.info("Logged out successfully")
\ No newline at end of file